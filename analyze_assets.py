@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Show where the bytes of existing GIF, PNG, APNG and WebP assets go.
+
+Reads each file's container for per-frame byte costs and decodes its
+frames once to find identical and near-identical frames and the regions
+that really changed, then estimates what coalescing, cropping and a global
+palette would save. Nothing is rendered, so it can run over a whole assets
+directory in CI.
+
+    python3 analyze_assets.py spamanvil-promo.gif         # one file
+    python3 analyze_assets.py ASSETS_DIR -v               # with a row per frame
+    python3 analyze_assets.py ASSETS_DIR --json after.json -b before.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from assetgen.analyze import NEAR_TOLERANCE, analyze, asset_paths
+
+
+def kb(n):
+    return f"{n / 1024:.1f} KB"
+
+
+def describe(report, verbose=False):
+    """Return the lines describing *report*."""
+    c = report.container
+    frames = report.frames
+    lines = [f"{report.path}  {c.format} {c.size[0]}x{c.size[1]}  {len(frames)} frame(s)  {kb(report.bytes)}"]
+    if frames:
+        biggest = max(frames, key=lambda f: f.size)
+        lines.append(f"  overhead {kb(c.overhead)}, frames {kb(sum(f.size for f in frames))} "
+                     f"(avg {kb(sum(f.size for f in frames) / len(frames))}, "
+                     f"max {kb(biggest.size)} at frame {biggest.index})")
+    tables = [f for f in frames if f.table]
+    if c.format in ('GIF', 'PNG', 'APNG'):
+        palette = f"global table {c.global_table // 3} entries" if c.global_table else "no global table"
+        if tables:
+            palette += f", {len(tables)} local tables ({kb(sum(f.table for f in tables))})"
+        lines.append(f"  palette: {palette}")
+    colors = f"{report.colors}" if report.colors is not None else "over 65536"
+    lines.append(f"  colors shown: {colors}")
+    if len(frames) > 1:
+        identical, near = report.identical(), report.near_identical()
+        lines.append(f"  identical frames: {len(identical)} ({kb(sum(f.size for f in identical))}); "
+                     f"near-identical (<= {report.near_tolerance}): {len(near)} "
+                     f"({kb(sum(f.size for f in near))})")
+        area = c.size[0] * c.size[1]
+        later = frames[1:]
+        share = lambda values: sum(values) / len(later) / area
+        lines.append(f"  per frame: changed box {share(f.changed_area for f in later):.0%}, "
+                     f"changed pixels {share(f.changed_pixels for f in later):.1%}, "
+                     f"encoded {share(f.rect_area for f in later):.0%} of the frame")
+    savings = report.savings()
+    if any(savings.values()):
+        total = sum(savings.values())
+        parts = ", ".join(f"{name} {kb(n)}" for name, n in savings.items() if n)
+        lines.append(f"  estimated savings: {parts} (up to {kb(total)}, {total / report.bytes:.0%})")
+    if verbose and len(frames) > 1:
+        lines.append(f"  {'frame':>5} {'delay':>6} {'bytes':>8}  {'encoded':<21} {'changed':<21} "
+                     f"{'pixels':>7} {'max':>4}")
+        for f in frames:
+            rect = "{}x{}+{}+{}".format(f.rect[2], f.rect[3], f.rect[0], f.rect[1])
+            if f.changed is None:
+                changed = "-"
+            else:
+                left, top, right, bottom = f.changed
+                changed = f"{right - left}x{bottom - top}+{left}+{top}"
+            lines.append(f"  {f.index:5d} {f.delay:4d}ms {f.size:8d}  {rect:<21} {changed:<21} "
+                         f"{f.changed_pixels:7d} {f.max_diff:4d}")
+    return lines
+
+
+def compare(reports, baseline):
+    """Return lines comparing the sizes in *reports* with a *baseline* JSON report."""
+    before = {entry['name']: entry for entry in baseline}
+    lines = ["Compared with the baseline:"]
+    for report in reports:
+        old = before.get(report.name)
+        if old is None:
+            lines.append(f"  {report.name}: new, {kb(report.bytes)}")
+            continue
+        delta = report.bytes - old['bytes']
+        share = f" ({delta / old['bytes']:+.1%})" if old['bytes'] else ""
+        lines.append(f"  {report.name}: {kb(old['bytes'])} -> {kb(report.bytes)}{share}, "
+                     f"{len(old['frames'])} -> {len(report.frames)} frames")
+    for name in sorted(before.keys() - {r.name for r in reports}):
+        lines.append(f"  {name}: gone (was {kb(before[name]['bytes'])})")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show where the bytes of GIF/PNG/APNG/WebP assets go.")
+    parser.add_argument('paths', nargs='+', help="asset files or directories to scan")
+    parser.add_argument('-v', '--verbose', action='store_true', help="add a row per frame")
+    parser.add_argument(
+        '-n', '--near', type=int, default=NEAR_TOLERANCE,
+        help=f"largest channel change of a near-identical frame (default {NEAR_TOLERANCE})",
+    )
+    parser.add_argument('--json', metavar='PATH', help="also write the full report as JSON to PATH")
+    parser.add_argument('-b', '--baseline', metavar='PATH', help="compare sizes with an earlier JSON report")
+    args = parser.parse_args(argv)
+
+    paths = asset_paths(args.paths)
+    if not paths:
+        parser.error("no GIF, PNG, APNG or WebP files found")
+    start = time.perf_counter()
+    reports, failed = [], 0
+    for path, name in paths:
+        try:
+            report = analyze(path, near_tolerance=args.near, name=name)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}")
+            failed += 1
+            continue
+        reports.append(report)
+        print("\n".join(describe(report, args.verbose)) + "\n")
+
+    total = sum(r.bytes for r in reports)
+    saving = sum(sum(r.savings().values()) for r in reports)
+    print(f"{len(reports)} file(s), {kb(total)}, estimated savings up to {kb(saving)} "
+          f"({time.perf_counter() - start:.2f} s)")
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            print("\n".join([""] + compare(reports, json.load(fp))))
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w') as fp:
+            json.dump([r.as_dict() for r in reports], fp, indent=1)
+            fp.write("\n")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
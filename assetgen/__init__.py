@@ -0,0 +1 @@
+"""Shared rendering helpers for the SpamAnvil asset generators."""
@@ -0,0 +1,336 @@
+"""Where the bytes of an existing GIF, PNG, APNG or WebP asset go.
+
+Two passes over a file, both streaming:
+
+* the container is walked block by block (GIF blocks, PNG chunks, RIFF
+  chunks), which gives every frame's exact byte cost, its encoded
+  rectangle, delay and color tables without decoding any pixels;
+* Pillow decodes the frames one at a time, and each composited frame is
+  compared with the one before it for the region that actually changed.
+  Only the previous frame is kept.
+
+From the two, :func:`analyze` estimates what the usual optimizations would
+save: dropping frames identical to the previous one (coalescing), encoding
+only the changed region of a frame (cropping, assuming bytes scale with
+area) and replacing per-frame color tables with one global palette.
+"""
+
+import os
+import struct
+from collections import namedtuple
+
+from PIL import Image, ImageSequence
+
+from .imagediff import pixel_diff
+
+# File extensions the analyzer reads
+EXTENSIONS = ('.gif', '.png', '.apng', '.webp')
+
+# A frame whose pixels all moved by at most this much counts as near-identical
+NEAR_TOLERANCE = 8
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class Frame:
+    """One encoded frame: its rectangle, delay, byte cost and what changed.
+
+    *rect* is the encoded ``(x, y, width, height)``; :attr:`changed` is the
+    ``(left, top, right, bottom)`` box of pixels that differ from the frame
+    before, or None if nothing does.
+    """
+
+    def __init__(self, index, rect, delay, size, table=0):
+        self.index = index
+        self.rect = rect
+        self.delay = delay
+        self.size = size
+        self.table = table
+        self.changed = None
+        self.changed_pixels = 0
+        self.max_diff = 0
+
+    @property
+    def rect_area(self):
+        return self.rect[2] * self.rect[3]
+
+    @property
+    def changed_area(self):
+        if self.changed is None:
+            return 0
+        left, top, right, bottom = self.changed
+        return (right - left) * (bottom - top)
+
+    def as_dict(self):
+        return {
+            'index': self.index, 'rect': list(self.rect), 'delay': self.delay, 'bytes': self.size,
+            'color_table': self.table, 'changed': list(self.changed) if self.changed else None,
+            'changed_pixels': self.changed_pixels, 'max_diff': self.max_diff,
+        }
+
+
+Container = namedtuple('Container', 'format size frames overhead global_table')
+
+
+# =============================================================================
+# CONTAINERS
+# =============================================================================
+# The readers read every block rather than seeking past it, so a file that
+# ends early raises ValueError("truncated ...") where the data runs out
+# instead of an IndexError or struct.error further on.
+def _read(fp, size, fmt):
+    """Read exactly *size* bytes of a *fmt* file; raises ValueError if it ends first."""
+    data = fp.read(size)
+    if len(data) < size:
+        raise ValueError(f"truncated {fmt}")
+    return data
+
+
+def _gif_subblocks(fp):
+    total = 0
+    while True:
+        length = _read(fp, 1, 'GIF')[0]
+        total += 1 + length
+        if not length:
+            return total
+        _read(fp, length, 'GIF')
+
+
+def read_gif(fp):
+    """Walk a GIF's blocks; returns a :class:`Container`."""
+    header = fp.read(13)
+    if header[:3] != b'GIF':
+        raise ValueError("not a GIF file")
+    if len(header) < 13:
+        raise ValueError("truncated GIF")
+    width, height, packed = struct.unpack('<HHB', header[6:11])
+    global_table = 3 << ((packed & 7) + 1) if packed & 0x80 else 0
+    _read(fp, global_table, 'GIF')
+    overhead = 13 + global_table
+    frames, control = [], None
+    while True:
+        # A GIF ends with its trailer; running out of data first is truncation
+        intro = _read(fp, 1, 'GIF')
+        if intro == b';':
+            overhead += 1
+            break
+        if intro == b'!':
+            label = _read(fp, 1, 'GIF')[0]
+            if label == 0xF9:
+                # Graphic control: block size, packed fields, delay,
+                # transparent index and the terminator
+                block = _read(fp, 6, 'GIF')
+                control = (struct.unpack('<H', block[2:4])[0] * 10, 8)
+            else:
+                overhead += 2 + _gif_subblocks(fp)
+        elif intro == b',':
+            left, top, w, h, packed = struct.unpack('<HHHHB', _read(fp, 9, 'GIF'))
+            table = 3 << ((packed & 7) + 1) if packed & 0x80 else 0
+            _read(fp, table + 1, 'GIF')
+            size = 10 + table + 1 + _gif_subblocks(fp)
+            delay, control_size = control or (0, 0)
+            frames.append(Frame(len(frames), (left, top, w, h), delay, size + control_size, table))
+            control = None
+        else:
+            raise ValueError(f"corrupt GIF: unexpected block {intro!r}")
+    return Container('GIF', (width, height), frames, overhead, global_table)
+
+
+def read_png(fp):
+    """Walk a PNG's or APNG's chunks; returns a :class:`Container`."""
+    if fp.read(8) != PNG_SIGNATURE:
+        raise ValueError("not a PNG file")
+    overhead, frames, size, palette, current, animated = 8, [], None, 0, None, False
+    while True:
+        # A PNG ends with its IEND chunk; running out of data first is truncation
+        length, kind = struct.unpack('>I4s', _read(fp, 8, 'PNG'))
+        cost = 12 + length
+        # The chunk's data and CRC
+        data = _read(fp, length + 4, 'PNG')
+        if kind == b'IHDR':
+            if length < 8:
+                raise ValueError("corrupt PNG: short IHDR chunk")
+            size = struct.unpack('>II', data[:8])
+        elif kind == b'fcTL':
+            if length < 24:
+                raise ValueError("corrupt PNG: short fcTL chunk")
+            w, h, x, y, num, den = struct.unpack('>IIIIHH', data[4:24])
+            current = Frame(len(frames), (x, y, w, h), round(1000 * num / (den or 100)), cost)
+            frames.append(current)
+            continue
+        elif size is None:
+            raise ValueError("corrupt PNG: no IHDR chunk")
+        if kind == b'acTL':
+            animated = True
+        if kind == b'PLTE':
+            palette = length
+        if kind in (b'IDAT', b'fdAT') and (current is not None or not animated):
+            if current is None:
+                # A static PNG, or an APNG whose default image is not a frame
+                current = Frame(len(frames), (0, 0) + tuple(size), 0, 0)
+                frames.append(current)
+            current.size += cost
+        else:
+            overhead += cost
+        if kind == b'IEND':
+            break
+    return Container('APNG' if animated else 'PNG', tuple(size), frames, overhead, palette)
+
+
+def read_webp(fp):
+    """Walk a WebP's RIFF chunks; returns a :class:`Container`."""
+    riff = _read(fp, 12, 'WebP')
+    if riff[:4] != b'RIFF' or riff[8:] != b'WEBP':
+        raise ValueError("not a WebP file")
+    # The RIFF header gives the length of everything after its first 8 bytes
+    end = fp.tell() - 4 + int.from_bytes(riff[4:8], 'little')
+    overhead, frames, size = 12, [], None
+    while True:
+        head = fp.read(8)
+        if not head:
+            if fp.tell() < end:
+                raise ValueError("truncated WebP")
+            break
+        if len(head) < 8:
+            raise ValueError("truncated WebP")
+        kind, length = struct.unpack('<4sI', head)
+        padded = length + (length & 1)
+        data = fp.read(padded)
+        # Tolerate a missing pad byte after the last chunk, nothing more
+        if len(data) < length:
+            raise ValueError("truncated WebP")
+        if len(data) < {b'VP8X': 10, b'ANMF': 16}.get(kind, 0):
+            raise ValueError(f"corrupt WebP: short {kind.decode('latin-1').strip()} chunk")
+        cost = 8 + padded
+        if kind == b'VP8X':
+            size = (int.from_bytes(data[4:7], 'little') + 1, int.from_bytes(data[7:10], 'little') + 1)
+            overhead += cost
+        elif kind == b'ANMF':
+            x, y = 2 * int.from_bytes(data[0:3], 'little'), 2 * int.from_bytes(data[3:6], 'little')
+            w, h = int.from_bytes(data[6:9], 'little') + 1, int.from_bytes(data[9:12], 'little') + 1
+            frames.append(Frame(len(frames), (x, y, w, h), int.from_bytes(data[12:15], 'little'), cost))
+        elif kind in (b'VP8 ', b'VP8L'):
+            frames.append(Frame(len(frames), (0, 0) + (size or (0, 0)), 0, cost))
+        else:
+            overhead += cost
+    if size is None and frames:
+        with Image.open(fp) as img:
+            size = img.size
+        frames[0].rect = (0, 0) + size
+    return Container('WebP', size, frames, overhead, 0)
+
+
+READERS = {b'GIF': read_gif, PNG_SIGNATURE[:3]: read_png, b'RIF': read_webp}
+
+
+def read_container(path):
+    """Walk *path*'s container with the reader for its signature."""
+    with open(path, 'rb') as fp:
+        reader = READERS.get(fp.read(3))
+        if reader is None:
+            raise ValueError("not a GIF, PNG or WebP file")
+        fp.seek(0)
+        return reader(fp)
+
+
+# =============================================================================
+# ANALYSIS
+# =============================================================================
+class Report:
+    """The analysis of one file; see :func:`analyze`."""
+
+    def __init__(self, path, container, colors, near_tolerance, name=None):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.container = container
+        self.colors = colors
+        self.near_tolerance = near_tolerance
+        self.bytes = os.path.getsize(path)
+
+    @property
+    def frames(self):
+        return self.container.frames
+
+    def identical(self):
+        """Frames that show exactly what the frame before them showed."""
+        return [f for f in self.frames[1:] if f.changed is None]
+
+    def near_identical(self):
+        """Frames whose every pixel moved by at most the near tolerance."""
+        return [f for f in self.frames[1:] if f.changed is not None and f.max_diff <= self.near_tolerance]
+
+    def savings(self):
+        """Estimated bytes saved by coalescing, cropping and a global palette."""
+        coalesce = sum(f.size for f in self.identical())
+        crop = 0
+        for f in self.frames[1:]:
+            if f.changed is not None and f.rect_area:
+                crop += int(f.size * max(0.0, 1 - f.changed_area / f.rect_area))
+        # Local color tables all go; without a global table one of them
+        # becomes it
+        tables = [f.table for f in self.frames]
+        palette = sum(tables) - (0 if self.container.global_table else max(tables, default=0))
+        return {'coalescing': coalesce, 'cropping': crop, 'global palette': palette}
+
+    def as_dict(self):
+        c = self.container
+        return {
+            'path': self.path, 'name': self.name, 'format': c.format, 'size': list(c.size),
+            'bytes': self.bytes, 'overhead': c.overhead, 'global_table': c.global_table,
+            'colors': self.colors,
+            'identical': [f.index for f in self.identical()],
+            'near_identical': [f.index for f in self.near_identical()],
+            'savings': self.savings(), 'frames': [f.as_dict() for f in self.frames],
+        }
+
+
+def _colors(img, seen):
+    # getcolors gives up (None) past maxcolors; true-color frames then
+    # report the cap rather than an exact count
+    colors = img.getcolors(1 << 16)
+    if colors is None:
+        return False
+    seen.update(color for _, color in colors)
+    return True
+
+
+def analyze(path, near_tolerance=NEAR_TOLERANCE, name=None):
+    """Analyze the asset at *path*; returns a :class:`Report` called *name*."""
+    container = read_container(path)
+    previous, seen, exact = None, set(), True
+    with Image.open(path) as img:
+        frames = ImageSequence.Iterator(img) if getattr(img, 'is_animated', False) else [img]
+        for frame, record in zip(frames, container.frames):
+            shown = frame.convert('RGB')
+            exact = _colors(shown, seen) and exact
+            if previous is None:
+                record.changed = (0, 0) + shown.size
+                record.changed_pixels = shown.width * shown.height
+            else:
+                diff = pixel_diff(shown, previous)
+                record.changed = diff.getbbox()
+                if record.changed is not None:
+                    record.max_diff = diff.getextrema()[1]
+                    region = diff.crop(record.changed)
+                    record.changed_pixels = region.width * region.height - region.histogram()[0]
+            previous = shown
+    colors = len(seen) if exact else None
+    return Report(path, container, colors, near_tolerance, name)
+
+
+def asset_paths(paths):
+    """Expand *paths* (files or directories) into ``(path, name)`` pairs, sorted.
+
+    A file found in a directory is named by its path relative to that
+    directory, so reports of two output directories line up by name.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                found += [(os.path.join(root, n), os.path.relpath(os.path.join(root, n), path))
+                          for n in names if n.lower().endswith(EXTENSIONS) and not n.startswith('.')]
+        else:
+            found.append((path, os.path.basename(path)))
+    return sorted(found)
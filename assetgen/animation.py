@@ -0,0 +1,100 @@
+"""Encode one rendered frame stream into several animation formats.
+
+Frames are rendered once and handed to every encoder through
+:func:`assetgen.parallel.broadcast`, so the GIF, APNG and WebP writers run
+side by side on their own threads, each lagging the renderer by a few
+frames at most. With a global *palette*, frames are quantized once for the
+GIF and APNG writers; the WebP writers get the full-colour frames.
+"""
+
+import io
+from functools import partial
+
+from .gif import write_gif
+from .apng import write_apng
+from .palette import quantize
+from .parallel import broadcast, threaded_map
+from .webp import webp_available, write_webp
+
+# format -> (label, file name suffix)
+FORMATS = {
+    'gif': ("GIF", ".gif"),
+    'apng': ("APNG", ".apng"),
+    'webp': ("WebP lossy", ".webp"),
+    'webp-lossless': ("WebP lossless", "-lossless.webp"),
+}
+
+# Lossy WebP quality (Pillow's default). Lossy pays off on the animated
+# banner's gradients but not on the promo's flat fills and text, where
+# lossless is less than half the size, so the lossy output falls back to
+# lossless whenever that comes out smaller.
+WEBP_QUALITY = 80
+
+
+def available_formats():
+    """The formats this Pillow build can write."""
+    return [fmt for fmt in FORMATS if fmt in ('gif', 'apng') or webp_available()]
+
+
+def output_names(stem, formats=None):
+    """Return ``{format: file name}`` for outputs named after *stem*."""
+    return {fmt: stem + FORMATS[fmt][1] for fmt in (formats or available_formats())}
+
+
+def _with_indexed(palette, frame):
+    return frame, frame if frame.mode == 'P' else quantize(frame, palette)
+
+
+def _encode_picked(index, encode, pairs):
+    return encode(pair[index] for pair in pairs)
+
+
+def _encode(fmt, fp, duration, palette, frames):
+    if fmt == 'gif':
+        return write_gif(fp, frames, duration, palette=palette)
+    if fmt == 'apng':
+        return write_apng(fp, frames, duration, palette=palette)
+    if fmt == 'webp':
+        return write_webp(fp, frames, duration, lossless=False, quality=WEBP_QUALITY, fallback=True)
+    if fmt == 'webp-lossless':
+        return write_webp(fp, frames, duration, lossless=True)
+    raise ValueError(f"unknown animation format {fmt!r}")
+
+
+def encode_animation(frames, duration, outputs, palette=None, jobs=1):
+    """Encode *frames* once into every ``{format: path or file}`` of *outputs*.
+
+    Returns ``{format: (writer, seconds)}``, where seconds is the time that
+    encoder spent working rather than waiting for frames.
+    """
+    consumers = []
+    if palette is not None:
+        frames = threaded_map(partial(_with_indexed, palette), frames, jobs=jobs)
+    for fmt, fp in outputs.items():
+        encode = partial(_encode, fmt, fp, duration, palette if fmt in ('gif', 'apng') else None)
+        if palette is not None:
+            index = 1 if fmt in ('gif', 'apng') else 0
+            encode = partial(_encode_picked, index, encode)
+        consumers.append(encode)
+    return dict(zip(outputs, broadcast(frames, consumers)))
+
+
+def animation_bytes(frames, duration, formats=('gif',), palette=None, jobs=1):
+    """Encode *frames* in memory; returns ``{format: bytes}``."""
+    buffers = {fmt: io.BytesIO() for fmt in formats}
+    encode_animation(frames, duration, buffers, palette=palette, jobs=jobs)
+    return {fmt: buf.getvalue() for fmt, buf in buffers.items()}
+
+
+def comparison(results, reference='gif'):
+    """Return one line per format with its size relative to *reference*."""
+    base = results[reference][0].bytes_written if reference in results else None
+    lines = []
+    for fmt, (writer, seconds) in results.items():
+        size = writer.bytes_written
+        share = f"{size / base:6.0%}" if base else ""
+        # The lossy WebP writer wrote lossless because it was smaller
+        label = "WebP fallback" if fmt == 'webp' and writer.lossless else FORMATS[fmt][0]
+        lines.append(f"{label:<14} {size / 1024:7.0f} KB {share}  {seconds:6.2f} s  "
+                     f"({writer.frames} frames)")
+    return lines
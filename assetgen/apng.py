@@ -0,0 +1,193 @@
+"""Streaming animated PNG writer.
+
+Like :mod:`assetgen.gif`, frames are encoded as they arrive: identical
+frames are coalesced into a longer delay and a changed frame is written as
+the bounding box of its changed pixels, replacing that region of the
+previous frame (dispose ``NONE``, blend ``SOURCE``). Pillow's own APNG
+writer keeps every frame until the end; this one keeps two.
+
+Each frame's pixel data is compressed by Pillow's PNG encoder and its IDAT
+stream re-wrapped as APNG frame data. With a global *palette* the file is
+8-bit indexed with a single PLTE, otherwise truecolor RGB. The frame count
+in ``acTL`` is only known at the end, so the output must be seekable.
+
+Delays are kept in milliseconds, rounded on the running total like the GIF
+writer's centiseconds.
+"""
+
+import io
+import struct
+import zlib
+
+from PIL import Image, ImageChops
+
+from .instrument import profiler
+from .palette import quantize
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# fcTL dispose_op / blend_op
+DISPOSE_NONE = 0
+BLEND_SOURCE = 0
+
+
+def _chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+
+def _idat_stream(region, compress_level):
+    """Compress *region* with Pillow's PNG encoder and return its zlib stream.
+
+    Pillow packs the rows of a palette image with 16 colors or fewer into
+    1, 2 or 4 bits; ``bits=8`` keeps them at the 8 bits the IHDR declares.
+    """
+    buf = io.BytesIO()
+    options = {'bits': 8} if region.mode == 'P' else {}
+    region.save(buf, 'PNG', compress_level=compress_level, **options)
+    data = buf.getvalue()
+    pos, stream = len(PNG_SIGNATURE), []
+    while pos < len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        if kind == b'IDAT':
+            stream.append(data[pos + 8:pos + 8 + length])
+        pos += 12 + length
+    return b''.join(stream)
+
+
+class ApngWriter:
+    """Write an animated PNG one frame at a time.
+
+    Usage::
+
+        with ApngWriter(path, (width, height), duration=83) as apng:
+            for frame in frames:
+                apng.add(frame)
+    """
+
+    def __init__(self, fp, size, duration, loop=0, palette=None, compress_level=9):
+        self._own_fp = isinstance(fp, (str, bytes)) or hasattr(fp, '__fspath__')
+        self.fp = open(fp, 'wb') if self._own_fp else fp
+        self.size = tuple(size)
+        self.duration = duration
+        # num_plays 0 loops forever; a GIF-style loop=None plays once
+        self.plays = 1 if loop is None else loop
+        self.palette = palette
+        self.compress_level = compress_level
+        self.frames_in = 0
+        self.frames = 0
+        self.bytes_written = 0
+        self.pixels_encoded = 0
+        self._sequence = 0
+        self._elapsed = 0.0
+        self._previous = None
+        self._pending = None
+        self._closed = False
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, data):
+        self.fp.write(data)
+        self.bytes_written += len(data)
+
+    def _write_header(self):
+        width, height = self.size
+        color_type = 2 if self.palette is None else 3
+        self._write(PNG_SIGNATURE)
+        self._write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+        # Frame count placeholder, patched in close()
+        self._actl_offset = self.fp.tell()
+        self._write(_chunk(b'acTL', struct.pack('>II', 0, self.plays)))
+        if self.palette is not None:
+            self._write(_chunk(b'PLTE', bytes(self.palette.getpalette()[:256 * 3])))
+
+    def add(self, frame, duration=None):
+        """Queue *frame* to be shown for *duration* ms (may be fractional)."""
+        if frame.size != self.size:
+            raise ValueError(f"frame size {frame.size} does not match APNG size {self.size}")
+        if duration is None:
+            duration = self.duration
+        if self.palette is None:
+            frame = frame.convert('RGB') if frame.mode != 'RGB' else frame
+            key = frame
+        else:
+            if frame.mode != 'P':
+                frame = quantize(frame, self.palette)
+            key = Image.frombytes('L', frame.size, frame.tobytes())
+        self.frames_in += 1
+
+        bbox = (0, 0) + self.size
+        if self._previous is not None:
+            with profiler.stage('encoding', 'diff'):
+                bbox = ImageChops.difference(self._previous, key).getbbox()
+            if bbox is None:
+                self._pending[2] += duration
+                return
+
+        self._flush()
+        self._pending = [frame.crop(bbox), bbox, duration]
+        self._previous = key
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        region, bbox, duration = self._pending
+        self._pending = None
+        with profiler.stage('encoding', 'write frame'):
+            start, self._elapsed = self._elapsed, self._elapsed + duration
+            delay = round(self._elapsed) - round(start)
+            fctl = struct.pack('>IIIIIHHBB', self._sequence, region.width, region.height,
+                               bbox[0], bbox[1], delay, 1000, DISPOSE_NONE, BLEND_SOURCE)
+            self._write(_chunk(b'fcTL', fctl))
+            self._sequence += 1
+            if self.palette is not None:
+                region.putpalette(self.palette.getpalette())
+            stream = _idat_stream(region, self.compress_level)
+            if self.frames == 0:
+                # The first frame doubles as the default image.
+                self._write(_chunk(b'IDAT', stream))
+            else:
+                self._write(_chunk(b'fdAT', struct.pack('>I', self._sequence) + stream))
+                self._sequence += 1
+            self.frames += 1
+            self.pixels_encoded += region.width * region.height
+
+    def summary(self):
+        """Return a one-line description of what the writer produced."""
+        total = self.frames_in * self.size[0] * self.size[1]
+        share = self.pixels_encoded / total if total else 0
+        return (f"{self.frames_in} frames -> {self.frames} APNG frames, "
+                f"{share:.0%} of pixels encoded, {self.bytes_written / 1024:.0f} KB")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        self._write(_chunk(b'IEND', b''))
+        end = self.fp.tell()
+        self.fp.seek(self._actl_offset)
+        self.fp.write(_chunk(b'acTL', struct.pack('>II', self.frames, self.plays)))
+        self.fp.seek(end)
+        if self._own_fp:
+            self.fp.close()
+
+
+def write_apng(fp, frames, duration, loop=0, palette=None, compress_level=9):
+    """Stream *frames* (any iterable of images) into an animated PNG.
+
+    Returns the finished :class:`ApngWriter` for its frame and byte counts.
+    """
+    frames = iter(frames)
+    first = next(frames)
+    with ApngWriter(fp, first.size, duration, loop=loop, palette=palette,
+                    compress_level=compress_level) as apng:
+        apng.add(first)
+        for frame in frames:
+            apng.add(frame)
+    return apng
@@ -0,0 +1,216 @@
+"""Fit an asset into a byte budget at the best quality that fits.
+
+The frames are rendered once and every trial re-encodes them with one
+:class:`Setting`: a lower frame rate (keeping every *step*-th frame), a
+smaller palette with or without dithering, a *threshold* below which a
+pixel's change from the previous frame is dropped (so near-identical frames
+coalesce and delta boxes shrink) and, for WebP, a lossy quality. Each
+trial's output is decoded again and scored by its PSNR against the
+rendered frames at every original frame time, so dropped frames count
+against it as what the viewer actually sees.
+
+Trials run on threads: quantizing, encoding and decoding are Pillow calls
+that release the GIL, and the frames are shared rather than copied into
+worker processes.
+"""
+
+import io
+from collections import namedtuple
+from functools import partial
+from itertools import product
+
+from PIL import Image, ImageSequence
+
+from .imagediff import mse, pixel_diff, psnr
+from .palette import PALETTE_COLORS, build_palette, quantize
+from .parallel import threaded_map
+from .pngopt import optimize_png
+from .gif import write_gif
+from .webp import write_webp
+
+FORMATS = ('gif', 'webp', 'png')
+
+# Frames sampled for a trial's palette
+PALETTE_SAMPLES = 8
+
+
+class Setting(namedtuple('Setting', 'step colors dither threshold quality')):
+    """One combination of encoder settings; see the module docstring."""
+
+    __slots__ = ()
+
+    def __new__(cls, step=1, colors=PALETTE_COLORS, dither=False, threshold=0, quality=None):
+        return super().__new__(cls, step, colors, dither, threshold, quality)
+
+    def describe(self):
+        parts = []
+        if self.step > 1:
+            parts.append(f"1/{self.step} fps")
+        if self.quality is not None:
+            parts.append(f"q{self.quality}")
+        elif self.colors:
+            parts.append(f"{self.colors} colors" + (" dithered" if self.dither else ""))
+        else:
+            parts.append("true color")
+        if self.threshold:
+            parts.append(f"hold <={self.threshold}")
+        return ", ".join(parts)
+
+
+Trial = namedtuple('Trial', 'setting size psnr data')
+
+
+def default_settings(fmt, animated=True):
+    """The settings searched for *fmt* by default, from best to worst quality."""
+    steps = (1, 2, 3) if animated else (1,)
+    thresholds = (0, 6, 16) if animated else (0,)
+    if fmt == 'webp':
+        # libwebp skips unchanged areas itself, so holding small changes
+        # buys little for a slow encode
+        return [Setting(step, None, False, 0, quality)
+                for step, quality in product(steps, (90, 80, 65, 50, 35))]
+    colors = (PALETTE_COLORS, 128, 64, 32)
+    if fmt == 'png':
+        return [Setting(1, None)] + [Setting(1, c, dither) for c, dither in product(colors, (False, True))]
+    return [Setting(step, c, dither, threshold)
+            for step, c, dither, threshold in product(steps, colors, (False, True), thresholds)]
+
+
+def hold_small_changes(frames, threshold):
+    """Yield *frames* with pixels that changed by at most *threshold* kept from the frame before."""
+    shown = None
+    for frame in frames:
+        frame = frame.convert('RGB')
+        if shown is not None and threshold:
+            moved = pixel_diff(frame, shown).point(lambda v: 255 if v > threshold else 0)
+            held = shown.copy()
+            held.paste(frame, mask=moved)
+            frame = held
+        shown = frame
+        yield frame
+
+
+def sample_palette(frames, colors, constants=()):
+    """Build a *colors*-entry palette from *constants* and a sample of *frames*."""
+    step = max(1, len(frames) // PALETTE_SAMPLES)
+    return build_palette(frames[::step], constants, min(colors, PALETTE_COLORS))
+
+
+def has_alpha(img):
+    return 'A' in img.getbands() or 'transparency' in img.info
+
+
+def encode_png(img, setting, palette=None, constants=()):
+    """Encode *img* as PNG with *setting*, keeping its alpha; returns the bytes.
+
+    Opaque images are quantized onto *palette* (built if None); images with
+    alpha get an RGBA palette of their own, since the shared palettes are RGB.
+    The result is then encoded losslessly the way the build writes PNGs
+    (:func:`assetgen.pngopt.optimize_png`), unless Pillow's encoding of the
+    palette image is smaller.
+    """
+    mode = 'RGBA' if has_alpha(img) else 'RGB'
+    img = img.convert(mode)
+    if setting.colors:
+        dither = Image.Dither.FLOYDSTEINBERG if setting.dither else Image.Dither.NONE
+        if mode == 'RGBA':
+            img = img.quantize(min(setting.colors, PALETTE_COLORS), method=Image.Quantize.FASTOCTREE,
+                               dither=dither)
+        else:
+            if palette is None:
+                palette = sample_palette([img], setting.colors, constants)
+            img = quantize(img, palette, dither=setting.dither)
+    # Given a palette image, optimize_png would drop the alpha of an RGBA
+    # palette; trials already run on threads
+    data = optimize_png(img.convert(mode), jobs=1).data
+    if img.mode == 'P':
+        buf = io.BytesIO()
+        img.save(buf, 'PNG', optimize=True)
+        data = min(data, buf.getvalue(), key=len)
+    return data
+
+
+def encode(frames, duration, fmt, setting, constants=(), palette=None):
+    """Encode *frames* (shown *duration* ms each) with *setting*; returns the bytes.
+
+    *palette* is the setting's palette if already built from *frames*.
+    """
+    if fmt == 'png':
+        return encode_png(frames[0], setting, palette, constants)
+    if setting.colors and fmt != 'webp' and palette is None:
+        palette = sample_palette(frames, setting.colors, constants)
+    frames = frames[::setting.step]
+    buf = io.BytesIO()
+    frames = list(hold_small_changes(frames, setting.threshold))
+    duration *= setting.step
+    if fmt == 'webp':
+        write_webp(buf, frames, duration, lossless=False, quality=setting.quality)
+    elif fmt == 'gif':
+        write_gif(buf, (quantize(f, palette, dither=setting.dither) for f in frames), duration,
+                  palette=palette)
+    else:
+        raise ValueError(f"unknown format {fmt!r}")
+    return buf.getvalue()
+
+
+def decode(data, count, duration, mode='RGB'):
+    """Decode *data* into the *count* frames shown every *duration* ms, in *mode*."""
+    duration = duration or 1
+    with Image.open(io.BytesIO(data)) as img:
+        shown, ends, elapsed = [], [], 0
+        for frame in ImageSequence.Iterator(img):
+            shown.append(frame.convert(mode))
+            elapsed += frame.info.get('duration', duration) or duration
+            ends.append(elapsed)
+    frames, i = [], 0
+    for f in range(count):
+        # Sample the middle of each frame: GIF delays are whole
+        # centiseconds, so frame boundaries drift by a few ms
+        t = (f + 0.5) * duration
+        while i < len(ends) - 1 and ends[i] <= t:
+            i += 1
+        frames.append(shown[i])
+    return frames
+
+
+def trial(frames, duration, fmt, palettes, setting):
+    """Encode *frames* with *setting* and score the result; returns a :class:`Trial`.
+
+    *palettes* maps palette sizes to palettes built from *frames*.
+    """
+    data = encode(frames, duration, fmt, setting, palette=palettes.get(setting.colors))
+    # Alpha counts towards the error, so a setting that loses it scores low
+    decoded = decode(data, len(frames), duration, 'RGBA' if has_alpha(frames[0]) else 'RGB')
+    error = sum(mse(a, b) for a, b in zip(frames, decoded)) / len(frames)
+    return Trial(setting, len(data), psnr(error), data)
+
+
+def search(frames, duration, fmt, settings=None, constants=(), jobs=1):
+    """Yield a :class:`Trial` per setting, trying them on *jobs* threads.
+
+    *frames* are the rendered frames, held in memory and reused by every
+    trial; *duration* is their display time in ms (ignored for PNG).
+    """
+    frames = list(frames)
+    if settings is None:
+        settings = default_settings(fmt, animated=len(frames) > 1)
+    palettes = {}
+    if fmt != 'webp' and not has_alpha(frames[0]):
+        for colors in dict.fromkeys(s.colors for s in settings if s.colors):
+            palettes[colors] = sample_palette(frames, colors, constants)
+    yield from threaded_map(partial(trial, frames, duration, fmt, palettes), settings, jobs=jobs)
+
+
+def best_within(trials, budget):
+    """The highest-quality trial of at most *budget* bytes (smallest on ties), or None."""
+    fitting = [t for t in trials if t.size <= budget]
+    return max(fitting, key=lambda t: (t.psnr, -t.size), default=None)
+
+
+def frontier(trials):
+    """The trials no other trial beats on both size and quality, smallest first."""
+    curve = []
+    for t in sorted(trials, key=lambda t: (t.size, -t.psnr)):
+        if not curve or t.psnr > curve[-1].psnr:
+            curve.append(t)
+    return curve
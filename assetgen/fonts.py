@@ -0,0 +1,68 @@
+"""Font registry and text-metrics cache.
+
+Fonts are resolved and loaded once per (size, bold) per process, and text
+layout is measured once per (text, font), so frame loops can ask for the
+same font and the same string's bbox on every frame for free.
+"""
+
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Candidate fonts in order of preference; a pair is (regular, bold). The
+# macOS system fonts come first; the DejaVu and Liberation fonts shipped by
+# most Linux distributions let headless builds render real type instead of
+# Pillow's bitmap default.
+FONT_PATHS = (
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/System/Library/Fonts/SFNSDisplay.ttf",
+    ("/Library/Fonts/Arial.ttf", "/Library/Fonts/Arial Bold.ttf"),
+    "/System/Library/Fonts/SFCompact.ttf",
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+     "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+     "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf"),
+)
+
+TextLayout = namedtuple('TextLayout', 'bbox width height advance')
+
+
+def font_paths(bold=False):
+    """Return the candidate font files, in order of preference."""
+    return [path[bold] if isinstance(path, tuple) else path for path in FONT_PATHS]
+
+
+@lru_cache(maxsize=64)
+def get_font(size, bold=False):
+    """Return the first usable system font at *size*, or Pillow's default."""
+    for path in font_paths(bold):
+        if os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size, index=1 if bold and path.endswith('.ttc') else 0)
+            except Exception:
+                try:
+                    return ImageFont.truetype(path, size)
+                except Exception:
+                    continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1024)
+def text_layout(text, font):
+    """Measure *text* in *font* once.
+
+    Returns a :class:`TextLayout` with the bbox relative to the draw origin
+    (as ``ImageDraw.textbbox((0, 0), ...)`` would), its width and height,
+    and the advance width used to place following text.
+    """
+    bbox = font.getbbox(text)
+    return TextLayout(bbox, bbox[2] - bbox[0], bbox[3] - bbox[1], font.getlength(text))
+
+
+def text_bbox(xy, text, font):
+    """Return the bbox of *text* drawn at *xy*, from the layout cache."""
+    x, y = xy
+    left, top, right, bottom = text_layout(text, font).bbox
+    return (left + x, top + y, right + x, bottom + y)
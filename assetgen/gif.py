@@ -0,0 +1,209 @@
+"""Streaming animated GIF writer.
+
+Frames are quantized and LZW-encoded as they arrive, so memory stays at a
+couple of frames regardless of the animation's length. Pillow's
+``save_all`` path, by contrast, needs every frame up front.
+
+Consecutive identical frames are coalesced into one frame with a longer
+delay, and a frame that differs from its predecessor is encoded as just the
+bounding box of the changed pixels, drawn over the previous frame (disposal
+1) with the unchanged pixels inside the box marked transparent. Only the
+previous frame and the one waiting to be encoded are kept.
+
+With a global *palette* (see :mod:`assetgen.palette`) the file carries one
+color table, frames are compared by palette index, and index 255 is the
+shared transparent slot. Frames may arrive already quantized (``P`` mode)
+or as RGB, in which case :func:`write_gif` quantizes them on a thread pool.
+
+GIF delays are in centiseconds; frame times are accumulated in
+milliseconds and rounded on the running total, so a 12 fps animation keeps
+its real length instead of drifting to 80 ms per frame.
+"""
+
+import struct
+from functools import partial
+
+from PIL import Image, ImageChops, GifImagePlugin
+
+from .instrument import profiler
+from .palette import PALETTE_COLORS, quantize
+from .parallel import threaded_map
+
+
+class GifWriter:
+    """Write an animated GIF one frame at a time.
+
+    Usage::
+
+        with GifWriter(path, (width, height), duration=83) as gif:
+            for frame in frames:
+                gif.add(frame)
+    """
+
+    # Graphic control extension disposal method: leave the frame in place.
+    DISPOSAL_KEEP = 1
+
+    def __init__(self, fp, size, duration, loop=0, coalesce=True, delta=True, palette=None):
+        self._own_fp = isinstance(fp, (str, bytes)) or hasattr(fp, '__fspath__')
+        self.fp = open(fp, 'wb') if self._own_fp else fp
+        self.size = tuple(size)
+        self.duration = duration
+        self.loop = loop
+        self.coalesce = coalesce
+        self.delta = delta
+        self.palette = palette
+        self.frames_in = 0
+        self.frames = 0
+        self.bytes_written = 0
+        self.pixels_encoded = 0
+        self._elapsed = 0.0
+        self._previous = None
+        self._pending = None
+        self._closed = False
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, data):
+        self.fp.write(data)
+        self.bytes_written += len(data)
+
+    def _write_header(self):
+        width, height = self.size
+        if self.palette is None:
+            # Logical screen descriptor without a global color table; every
+            # frame carries its own.
+            self._write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0, 0, 0))
+        else:
+            # 256-entry global color table (flag 0x80, size bits 0x07).
+            table = bytes(self.palette.getpalette()[:PALETTE_COLORS * 3])
+            table = table.ljust(256 * 3, b'\0')
+            self._write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xF7, 0, 0) + table)
+        if self.loop is not None:
+            self._write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', self.loop) + b'\x00')
+
+    def add(self, frame, duration=None):
+        """Queue *frame* to be shown for *duration* ms (may be fractional)."""
+        if frame.size != self.size:
+            raise ValueError(f"frame size {frame.size} does not match GIF size {self.size}")
+        if duration is None:
+            duration = self.duration
+        if self.palette is None:
+            frame = frame.convert('RGB') if frame.mode != 'RGB' else frame
+            key = frame
+        else:
+            if frame.mode != 'P':
+                frame = quantize(frame, self.palette)
+            # Compare raw palette indices rather than palette colors.
+            key = Image.frombytes('L', frame.size, frame.tobytes())
+        self.frames_in += 1
+
+        full = (0, 0) + self.size
+        bbox, changed = full, None
+        if self._previous is not None and (self.coalesce or self.delta):
+            with profiler.stage('encoding', 'diff'):
+                diff = ImageChops.difference(self._previous, key)
+                bbox = diff.getbbox()
+            if bbox is None and self.coalesce:
+                # Identical to the previous frame: just show that one longer.
+                self._pending[2] += duration
+                return
+            if not self.delta:
+                bbox = full
+            elif bbox is None:
+                # Nothing changed but coalescing is off: a single
+                # transparent pixel carries the delay.
+                bbox = (0, 0, 1, 1)
+                changed = Image.new('L', (1, 1), 0)
+            else:
+                changed = _changed_mask(diff.crop(bbox))
+
+        self._flush()
+        # Always a copy: _flush() pastes the transparent index into it, and
+        # the frame itself may be shared with other encoders
+        region = frame.crop(bbox)
+        self._pending = [region, bbox[:2], duration, changed]
+        self._previous = key
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        region, offset, duration, changed = self._pending
+        self._pending = None
+        with profiler.stage('encoding', 'write frame'):
+            start, self._elapsed = self._elapsed, self._elapsed + duration
+            centiseconds = round(self._elapsed / 10) - round(start / 10)
+            params = {
+                'duration': centiseconds * 10,
+                'disposal': self.DISPOSAL_KEEP,
+                'include_color_table': self.palette is None,
+            }
+            if self.palette is not None:
+                if changed is not None:
+                    region.paste(PALETTE_COLORS, mask=ImageChops.invert(changed))
+                    params['transparency'] = PALETTE_COLORS
+            elif changed is None:
+                region = region.convert('P', palette=Image.Palette.ADAPTIVE)
+            else:
+                # Keep one palette slot free for "unchanged" pixels.
+                region = region.convert('P', palette=Image.Palette.ADAPTIVE, colors=255)
+                palette = region.getpalette()
+                transparency = len(palette) // 3
+                region.putpalette(palette + [0, 0, 0])
+                region.paste(transparency, mask=ImageChops.invert(changed))
+                params['transparency'] = transparency
+            for chunk in GifImagePlugin.getdata(region, offset, **params):
+                self._write(chunk)
+            self.frames += 1
+            self.pixels_encoded += region.width * region.height
+
+    def summary(self):
+        """Return a one-line description of what the writer produced."""
+        total = self.frames_in * self.size[0] * self.size[1]
+        share = self.pixels_encoded / total if total else 0
+        return (f"{self.frames_in} frames -> {self.frames} GIF frames, "
+                f"{share:.0%} of pixels encoded, {self.bytes_written / 1024:.0f} KB")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        self._write(b';')
+        if self._own_fp:
+            self.fp.close()
+
+
+def _changed_mask(diff):
+    """Return a mask that is 255 wherever any channel of *diff* is non-zero."""
+    if diff.mode != 'L':
+        r, g, b = diff.split()
+        diff = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    return diff.point(lambda v: 255 if v else 0)
+
+
+def _to_palette(palette, frame):
+    return frame if frame.mode == 'P' else quantize(frame, palette)
+
+
+def write_gif(fp, frames, duration, loop=0, coalesce=True, delta=True, palette=None, jobs=1):
+    """Stream *frames* (any iterable of images) into a GIF.
+
+    With a global *palette*, RGB frames are quantized against it on *jobs*
+    threads ahead of the encoder. Returns the finished :class:`GifWriter`
+    for its frame and byte counts.
+    """
+    if palette is not None:
+        frames = threaded_map(partial(_to_palette, palette), frames, jobs=jobs)
+    frames = iter(frames)
+    first = next(frames)
+    with GifWriter(fp, first.size, duration, loop=loop, coalesce=coalesce, delta=delta,
+                   palette=palette) as gif:
+        gif.add(first)
+        for frame in frames:
+            gif.add(frame)
+    return gif
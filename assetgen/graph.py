@@ -0,0 +1,105 @@
+"""A small build graph: tasks that run once the tasks they depend on are done.
+
+Each :class:`Task` names the tasks it depends on and is called with their
+results, in the order it lists them. :func:`run_graph` starts every task
+whose dependencies have finished on a process pool, so independent assets
+build side by side and the wall time approaches the longest dependency
+chain instead of the sum of all tasks. With one job the tasks run
+in-process, in dependency order.
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .parallel import resolve_jobs
+
+# *run* is called as ``run(*results_of_deps)``; it must be picklable (a
+# module-level function or a ``functools.partial`` of one) to run in a
+# worker process
+Task = namedtuple('Task', 'name run deps', defaults=((),))
+
+
+def topological_order(tasks):
+    """Return *tasks* ordered so each comes after its dependencies.
+
+    Ties keep the order of *tasks*, so listing the slowest tasks first
+    starts them first. Raises ValueError for duplicate names, unknown
+    dependencies and cycles.
+    """
+    by_name = {}
+    for task in tasks:
+        if task.name in by_name:
+            raise ValueError(f"duplicate task {task.name!r}")
+        by_name[task.name] = task
+    for task in tasks:
+        unknown = [d for d in task.deps if d not in by_name]
+        if unknown:
+            raise ValueError(f"task {task.name!r} depends on unknown {', '.join(map(repr, unknown))}")
+
+    order, state = [], {}
+
+    def visit(task, path):
+        if state.get(task.name) == 'done':
+            return
+        if state.get(task.name) == 'visiting':
+            raise ValueError(f"dependency cycle: {' -> '.join(path + [task.name])}")
+        state[task.name] = 'visiting'
+        for dep in task.deps:
+            visit(by_name[dep], path + [task.name])
+        state[task.name] = 'done'
+        order.append(task)
+
+    for task in tasks:
+        visit(task, [])
+    return order
+
+
+def _timed(run, args):
+    start = time.perf_counter()
+    result = run(*args)
+    return result, time.perf_counter() - start
+
+
+def run_graph(tasks, jobs=1):
+    """Run *tasks* on *jobs* processes; yield ``(task, result, seconds)`` as each finishes.
+
+    A task starts as soon as all its dependencies have finished; ready
+    tasks start in the order of *tasks*. The first exception raised by a
+    task is re-raised once the tasks already running have finished.
+    """
+    order = topological_order(tasks)
+    jobs = min(resolve_jobs(jobs), len(order))
+    results = {}
+    if jobs <= 1:
+        for task in order:
+            result, seconds = _timed(task.run, [results[d] for d in task.deps])
+            results[task.name] = result
+            yield task, result, seconds
+        return
+
+    waiting, running = list(order), {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while waiting or running:
+            for task in [t for t in waiting if all(d in results for d in t.deps)]:
+                waiting.remove(task)
+                running[pool.submit(_timed, task.run, [results[d] for d in task.deps])] = task
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                result, seconds = future.result()
+                results[task.name] = result
+                yield task, result, seconds
+
+
+def critical_path(tasks, seconds):
+    """The chain of dependent tasks that took longest, given each task's *seconds*.
+
+    Returns ``(names, total_seconds)``, first task first; this is the
+    shortest wall time any number of workers could build *tasks* in.
+    """
+    longest = {}
+    for task in topological_order(tasks):
+        before = max((longest[d] for d in task.deps), key=lambda chain: chain[1], default=([], 0.0))
+        longest[task.name] = (before[0] + [task.name], before[1] + seconds.get(task.name, 0.0))
+    return max(longest.values(), key=lambda chain: chain[1], default=([], 0.0))
@@ -0,0 +1,97 @@
+"""Pixel and perceptual image comparison.
+
+Everything runs through Pillow's C image operations, so comparing a frame
+costs a few whole-image passes rather than a Python loop over pixels.
+
+The pixel diff is the largest channel difference per pixel; a frame may
+allow a share of pixels above a tolerance. The perceptual diff compares
+luma after a small blur, so isolated antialiasing changes along an edge
+score low while a moved or recoloured shape scores high.
+"""
+
+import math
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+# PSNR reported for identical images, which have none
+PSNR_IDENTICAL = 100.0
+
+
+class Diff:
+    """How far an image is from its reference."""
+
+    def __init__(self, size, max_diff, over, perceptual, diff):
+        self.size = size
+        self.max_diff = max_diff
+        self.over = over
+        self.perceptual = perceptual
+        self.diff = diff
+
+    @property
+    def over_share(self):
+        return self.over / (self.size[0] * self.size[1])
+
+    def passes(self, max_share=0.0, perceptual=None):
+        """True if the share of pixels over tolerance and the perceptual diff are within limits."""
+        if self.over_share > max_share:
+            return False
+        return perceptual is None or self.perceptual <= perceptual
+
+    def describe(self):
+        return (f"max diff {self.max_diff}, {self.over} px over tolerance ({self.over_share:.3%}), "
+                f"perceptual {self.perceptual}")
+
+
+def pixel_diff(a, b):
+    """Return the per-pixel maximum channel difference of *a* and *b* as an 'L' image."""
+    channels = ImageChops.difference(a.convert('RGB'), b.convert('RGB')).split()
+    return ImageChops.lighter(ImageChops.lighter(channels[0], channels[1]), channels[2])
+
+
+def perceptual_diff(a, b, radius=1):
+    """Return the largest luma difference of *a* and *b* after a *radius* box blur."""
+    blur = ImageFilter.BoxBlur(radius)
+    return ImageChops.difference(a.convert('L').filter(blur), b.convert('L').filter(blur)).getextrema()[1]
+
+
+def compare(image, reference, tolerance=0):
+    """Compare *image* with *reference*; pixels differing by more than *tolerance* count as over."""
+    if image.size != reference.size:
+        raise ValueError(f"size {image.size} does not match reference size {reference.size}")
+    diff = pixel_diff(image, reference)
+    max_diff = diff.getextrema()[1]
+    if max_diff == 0:
+        return Diff(image.size, 0, 0, 0, diff)
+    over = sum(diff.histogram()[tolerance + 1:])
+    return Diff(image.size, max_diff, over, perceptual_diff(image, reference), diff)
+
+
+def mse(a, b):
+    """Return the mean squared channel difference of *a* and *b*.
+
+    They are compared as RGB, or if either has an alpha band as RGB
+    premultiplied by alpha plus alpha, so the color under fully transparent
+    pixels does not count.
+    """
+    mode = 'RGBa' if 'A' in a.getbands() + b.getbands() else 'RGB'
+    hist = ImageChops.difference(a.convert(mode), b.convert(mode)).histogram()
+    # The histogram is a 256-bin channel per band, back to back
+    total = sum(count * (i % 256) ** 2 for i, count in enumerate(hist) if count)
+    return total / (a.width * a.height * len(mode))
+
+
+def psnr(error):
+    """Return the PSNR in dB of a mean squared error of 8-bit channels."""
+    return 10 * math.log10(255 ** 2 / error) if error else PSNR_IDENTICAL
+
+
+def heatmap(result, reference, gain=8):
+    """Render *result*'s pixel diff as a heatmap over a dimmed copy of *reference*.
+
+    Differences are amplified by *gain* so a 1-level change is still visible.
+    """
+    heat = ImageOps.colorize(result.diff.point(lambda v: min(255, v * gain)),
+                             black=(0, 0, 0), white=(255, 255, 0), mid=(255, 0, 0))
+    base = reference.convert('L').point(lambda v: v // 3).convert('RGB')
+    mask = result.diff.point(lambda v: 255 if v else 0)
+    return Image.composite(heat, base, mask)
@@ -0,0 +1,171 @@
+"""Optional per-stage profiling for the asset generators.
+
+Rendering code wraps its stages (background, glow, shapes, text,
+conversion, quantization, encoding) in ``profiler.stage(...)``, each
+rendered animation frame in a ``frame`` stage and each output in
+``profiler.asset(...)``. While the profiler is disabled (the default) a
+stage is a shared no-op context manager, so the hooks cost next to nothing. Once enabled, every stage becomes a
+timed event attributed to the asset being built, and the collected events
+can be written out as a JSON report or a Chrome trace (load it in
+``chrome://tracing`` or https://ui.perfetto.dev).
+
+Stages nest; the report's stage totals are self time, so a glow drawn
+while building a background plate counts as glow, not background.
+Events are only collected in the process that enabled the profiler, so
+profile with frame rendering in-process (``--jobs 1``).
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from .memory import peak_rss
+
+_NULL = nullcontext()
+
+
+class Profiler:
+    """Collects timed stage events, grouped by asset."""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_allocations = False
+        self.events = []
+        self.assets = {}
+        self._asset = None
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self, trace_allocations=True):
+        """Start collecting events (and Python allocations via tracemalloc)."""
+        self.enabled = True
+        self.trace_allocations = trace_allocations
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, stage, name=None, **args):
+        """Time the enclosed block as *stage*, labelled *name* in the trace."""
+        if not self.enabled:
+            return _NULL
+        return self._event(stage, name or stage, args)
+
+    @contextmanager
+    def _event(self, stage, name, args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {
+                'stage': stage, 'name': name, 'asset': self._asset,
+                'start': start - self._origin, 'dur': end - start,
+                'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    @contextmanager
+    def asset(self, name):
+        """Attribute the stages inside the block to asset *name*."""
+        if not self.enabled:
+            yield
+            return
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+        self._asset = name
+        try:
+            with self._event('asset', name, {}):
+                yield
+        finally:
+            self._asset = None
+            self.assets[name] = {
+                'alloc_peak': tracemalloc.get_traced_memory()[1] if self.trace_allocations else None,
+                'peak_rss': peak_rss(),
+            }
+
+    # -------------------------------------------------------------------------
+    # Output
+    # -------------------------------------------------------------------------
+    def _self_times(self):
+        """Yield ``(event, self_ns)``: each event's duration minus its children's."""
+        by_thread = defaultdict(list)
+        for event in self.events:
+            by_thread[event['pid'], event['tid']].append(event)
+        for events in by_thread.values():
+            events.sort(key=lambda e: (e['start'], -e['dur']))
+            child_time = defaultdict(int)
+            stack = []
+            for event in events:
+                while stack and stack[-1]['start'] + stack[-1]['dur'] <= event['start']:
+                    stack.pop()
+                if stack:
+                    child_time[id(stack[-1])] += event['dur']
+                stack.append(event)
+            for event in events:
+                yield event, event['dur'] - child_time[id(event)]
+
+    def report(self):
+        """Summarize the events per asset and per stage, in seconds."""
+        def bucket():
+            return {'count': 0, 'total': 0.0, 'max': 0.0}
+
+        assets = defaultdict(lambda: {'seconds': 0.0, 'frames': 0, 'stages': defaultdict(bucket)})
+        totals = defaultdict(bucket)
+        for event, self_ns in self._self_times():
+            entry = assets[event['asset'] or '(none)']
+            if event['stage'] == 'asset':
+                entry['seconds'] = event['dur'] / 1e9
+                continue
+            if event['stage'] == 'frame':
+                entry['frames'] += 1
+                continue
+            seconds = self_ns / 1e9
+            for stats in (entry['stages'][event['stage']], totals[event['stage']]):
+                stats['count'] += 1
+                stats['total'] += seconds
+                stats['max'] = max(stats['max'], seconds)
+
+        def finish(stages):
+            for stats in stages.values():
+                stats['mean'] = stats['total'] / stats['count']
+            return dict(sorted(stages.items(), key=lambda kv: -kv[1]['total']))
+
+        for name, entry in assets.items():
+            entry['stages'] = finish(entry['stages'])
+            entry.update(self.assets.get(name, {}))
+        return {'assets': dict(assets), 'stages': finish(totals), 'peak_rss': peak_rss()}
+
+    def chrome_trace(self):
+        """Return the events in Chrome's trace event format."""
+        events = [{
+            'name': e['name'], 'cat': e['stage'], 'ph': 'X',
+            'ts': e['start'] / 1000, 'dur': e['dur'] / 1000,
+            'pid': e['pid'], 'tid': e['tid'],
+            'args': dict(e['args'], asset=e['asset']),
+        } for e in self.events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, directory, prefix):
+        """Write ``<prefix>-profile.json`` and ``<prefix>-trace.json``; returns both paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = (os.path.join(directory, f"{prefix}-profile.json"),
+                 os.path.join(directory, f"{prefix}-trace.json"))
+        for path, data in zip(paths, (self.report(), self.chrome_trace())):
+            with open(path, 'w') as fp:
+                json.dump(data, fp, indent=1)
+                fp.write("\n")
+        return paths
+
+    def summary(self):
+        """Return one line per stage with its share of the profiled time."""
+        stages = self.report()['stages']
+        total = sum(s['total'] for s in stages.values()) or 1
+        return [f"{name:<13} {s['total'] * 1000:8.1f} ms  {s['total'] / total:6.1%}  ({s['count']} calls)"
+                for name, s in stages.items()]
+
+
+profiler = Profiler()
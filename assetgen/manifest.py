@@ -0,0 +1,220 @@
+"""Content-hash build manifest for incremental asset builds.
+
+Each output is keyed by a fingerprint of everything that determines its
+pixels: the source of the functions and modules that render it, its
+parameters, the font files in use and the Pillow version. The manifest
+records the fingerprint each output was last built with, so a rerun only
+rebuilds outputs whose fingerprint changed or whose file is missing.
+Outputs and the manifest itself are written to a temporary file and moved
+into place, so an interrupted build never leaves a truncated asset behind.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+
+import PIL
+
+from .fonts import font_paths
+
+MANIFEST_NAME = ".assetgen-manifest.json"
+
+
+@lru_cache(maxsize=None)
+def file_digest(path):
+    """Return the SHA-256 of the file at *path* (hashed once per process)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fonts_digest():
+    """Hash the regular and bold font files :func:`get_font` would pick."""
+    parts = []
+    for bold in (False, True):
+        path = next((p for p in font_paths(bold) if os.path.exists(p)), None)
+        parts.append(f"{path}:{file_digest(path)}" if path else "default")
+    return "|".join(parts)
+
+
+def module_constants(module):
+    """Return a module's upper-case constants as sorted ``(name, value)`` pairs."""
+    return tuple(sorted(
+        (name, value) for name, value in vars(module).items()
+        if name.isupper() and isinstance(value, (int, float, str, tuple))
+    ))
+
+
+def _code_names(code):
+    """Yield the global names *code* and the functions nested in it refer to."""
+    yield from code.co_names
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _code_names(const)
+
+
+def code_deps(deps):
+    """Expand function *deps* with the module-level code and constants they use.
+
+    Follows, transitively, the names each function refers to in its own
+    module: functions defined there are added to the returned deps, and
+    upper-case constants are returned as sorted ``(name, value)`` pairs, so
+    an output's fingerprint changes with exactly the code and constants
+    that render it. Modules in *deps* are kept as they are.
+    """
+    found, constants = [], {}
+    pending = list(deps)
+    while pending:
+        dep = pending.pop(0)
+        if any(dep is seen for seen in found):
+            continue
+        found.append(dep)
+        func = inspect.unwrap(dep) if callable(dep) else dep
+        if not inspect.isfunction(func):
+            continue
+        namespace = func.__globals__
+        for name in _code_names(func.__code__):
+            value = namespace.get(name)
+            if inspect.isfunction(inspect.unwrap(value) if callable(value) else value):
+                if getattr(value, '__module__', None) == func.__module__:
+                    pending.append(value)
+            elif name.isupper() and isinstance(value, (int, float, str, tuple, dict)):
+                constants[name] = value
+    return tuple(found), tuple(sorted(constants.items()))
+
+
+def fingerprint(deps, params=None):
+    """Fingerprint an output rendered by *deps* (functions or modules) with *params*."""
+    digest = hashlib.sha256()
+    for dep in deps:
+        digest.update(inspect.getsource(dep).encode())
+    digest.update(repr(params).encode())
+    digest.update(fonts_digest().encode())
+    digest.update(PIL.__version__.encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _umask():
+    # The umask can only be read by setting it
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+@contextmanager
+def atomic_path(path):
+    """Yield a temporary path next to *path*; move it into place on success.
+
+    The temporary file keeps *path*'s extension so Pillow can infer the
+    format from it. ``mkstemp`` makes it owner-only, so before the move it
+    gets the mode a plainly created file would have.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=os.path.splitext(name)[1], dir=directory)
+    os.close(fd)
+    try:
+        yield tmp
+        os.chmod(tmp, 0o666 & ~_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class Manifest:
+    """The fingerprints of the outputs in *directory*.
+
+    With *force* every output is considered stale. Without *autosave* the
+    manifest is never written; a build worker uses that to hand its new
+    entries to the process that owns the manifest (see :meth:`merge`).
+    """
+
+    def __init__(self, directory, force=False, name=MANIFEST_NAME, autosave=True):
+        self.directory = directory
+        self.path = os.path.join(directory, name)
+        self.force = force
+        self.autosave = autosave
+        self.built = []
+        self.skipped = []
+        # What each rebuilt output's write() returned, if anything
+        self.results = {}
+        try:
+            with open(self.path) as fp:
+                self.entries = json.load(fp)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_fresh(self, output, key):
+        """True if *output* exists and was built with fingerprint *key*."""
+        return (not self.force
+                and self.entries.get(output) == key
+                and os.path.exists(os.path.join(self.directory, output)))
+
+    def build(self, output, key, write):
+        """Rebuild *output* if stale by calling ``write(tmp_path)``.
+
+        Returns True if the output was rebuilt; a result *write* returns
+        is kept in :attr:`results`. The manifest is saved after every
+        rebuilt output, so an interrupted run keeps its progress.
+        """
+        if self.is_fresh(output, key):
+            self.skipped.append(output)
+            return False
+        with atomic_path(os.path.join(self.directory, output)) as tmp:
+            result = write(tmp)
+        if result is not None:
+            self.results[output] = result
+        self.entries[output] = key
+        self.built.append(output)
+        if self.autosave:
+            self.save()
+        return True
+
+    def build_group(self, outputs, key, write):
+        """Rebuild *outputs* together, by one ``write(tmp_paths)`` call, if any is stale.
+
+        For outputs that come from the same render, like one animation in
+        several formats. *tmp_paths* lists a temporary path per output, in
+        order; they all move into place only if *write* succeeds.
+        """
+        outputs = list(outputs)
+        if all(self.is_fresh(output, key) for output in outputs):
+            self.skipped.extend(outputs)
+            return False
+        with ExitStack() as stack:
+            tmps = [stack.enter_context(atomic_path(os.path.join(self.directory, output)))
+                    for output in outputs]
+            write(tmps)
+        for output in outputs:
+            self.entries[output] = key
+        self.built.extend(outputs)
+        if self.autosave:
+            self.save()
+        return True
+
+    def new_entries(self):
+        """The fingerprints of the outputs rebuilt so far."""
+        return {output: self.entries[output] for output in self.built if output in self.entries}
+
+    def merge(self, built, skipped, entries, results=None):
+        """Record outputs another manifest of this directory built and skipped, and save."""
+        self.built.extend(built)
+        self.skipped.extend(skipped)
+        self.results.update(results or {})
+        if entries:
+            self.entries.update(entries)
+            self.save()
+
+    def save(self):
+        with atomic_path(self.path) as tmp:
+            with open(tmp, 'w') as fp:
+                json.dump(self.entries, fp, indent=2, sort_keys=True)
+                fp.write("\n")
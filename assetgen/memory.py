@@ -0,0 +1,35 @@
+"""Process memory reporting."""
+
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss(children=False):
+    """Return this process's peak resident set size in bytes, or None.
+
+    With *children*, return the largest peak of the child processes that
+    have finished and been waited for, such as the workers of a closed
+    process pool (0 if there were none).
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_peak_rss():
+    """Return the peak RSS of this process, and of its largest worker if any, as a short string."""
+    peak = peak_rss()
+    if peak is None:
+        return "n/a"
+    text = f"{peak / (1024 * 1024):.0f} MB (main process)"
+    workers = peak_rss(children=True)
+    if workers:
+        text += f", {workers / (1024 * 1024):.0f} MB (largest worker process)"
+    return text
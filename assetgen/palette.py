@@ -0,0 +1,72 @@
+"""One global GIF palette per animation.
+
+Every color in the generators comes from a small set of module constants
+plus gradients and anti-aliasing, so a single 255-color palette built from
+those constants and a sample of frames covers the whole animation. Frames
+quantized against it share one global color table: no per-frame median cut,
+no palette flicker and no local color tables in the file.
+"""
+
+from PIL import Image
+
+from .instrument import profiler
+from .parallel import render_selected
+
+# Index 255 is left out of the palette so the GIF writer can use it for
+# "unchanged" pixels.
+PALETTE_COLORS = 255
+
+
+def build_palette(frames, constants=(), colors=PALETTE_COLORS):
+    """Return a ``P`` image whose palette covers *constants* and *frames*.
+
+    *constants* are always included verbatim; the remaining slots come from
+    a median cut over the sample *frames*.
+    """
+    fixed = list(dict.fromkeys(tuple(c[:3]) for c in constants))[:colors]
+    frames = [f.convert('RGB') for f in frames]
+    entries = list(fixed)
+    if frames:
+        width = max(f.width for f in frames)
+        sheet = Image.new('RGB', (width, sum(f.height for f in frames)))
+        y = 0
+        for f in frames:
+            sheet.paste(f, (0, y))
+            y += f.height
+        cut = sheet.quantize(max(1, colors - len(entries)), method=Image.Quantize.MEDIANCUT)
+        flat = cut.getpalette()
+        for i in range(0, len(flat), 3):
+            color = tuple(flat[i:i + 3])
+            if len(entries) >= colors:
+                break
+            if color not in entries:
+                entries.append(color)
+
+    palette = Image.new('P', (1, 1))
+    palette.putpalette([v for color in entries for v in color])
+    return palette
+
+
+def palette_bytes(palette):
+    """Return the palette of a ``P`` image as packed RGB bytes."""
+    return bytes(palette.getpalette())
+
+
+def quantize(frame, palette, dither=False):
+    """Map *frame* onto *palette* with Pillow's cached nearest-color lookup."""
+    with profiler.stage('quantization'):
+        return frame.convert('RGB').quantize(
+            palette=palette,
+            dither=Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE,
+        )
+
+
+def sample_palette(render, count, constants=(), samples=8, jobs=1):
+    """Build a global palette from *constants* and *samples* rendered frames.
+
+    *render* and *jobs* are as for :func:`assetgen.parallel.render_frames`.
+    """
+    step = max(1, count // samples)
+    indices = list(range(0, count, step))[:samples]
+    frames = render_selected(render, indices, jobs=jobs)
+    return build_palette(frames, constants)
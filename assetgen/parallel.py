@@ -0,0 +1,180 @@
+"""Process-pool frame rendering.
+
+Animation frames depend only on their index, so they can be rendered in
+worker processes and collected back in index order. Fonts, plates and other
+per-process caches warm up once per worker and are reused for every frame
+that worker renders.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+# Upper bound on frames per task; together with the in-flight window this
+# keeps the number of rendered-but-unconsumed frames proportional to the
+# worker count rather than to the animation's length.
+MAX_CHUNK = 4
+
+
+def resolve_jobs(jobs):
+    """Map a ``--jobs`` value to a worker count (0 or None = one per CPU)."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def render_frames(render, count, jobs=1, initializer=None, initargs=()):
+    """Yield ``render(i)`` for ``i in range(count)``, in index order.
+
+    *render* must be picklable (a module-level function or a
+    ``functools.partial`` of one) when *jobs* is greater than one. The
+    result is the same whichever path renders it. Only ``jobs + 1`` chunks
+    are in flight at once, so a slow consumer such as a streaming encoder
+    bounds memory instead of letting finished frames pile up.
+    """
+    jobs = min(resolve_jobs(jobs), count)
+    if jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for i in range(count):
+            yield render(i)
+        return
+
+    # Contiguous chunks keep consecutive frames, which share plates and
+    # sprites, on the same worker.
+    chunksize = max(1, min(MAX_CHUNK, count // (jobs * 4)))
+    starts = iter(range(0, count, chunksize))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer,
+                             initargs=initargs) as pool:
+        pending = deque()
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                stop = min(start + chunksize, count)
+                pending.append(pool.submit(_render_chunk, render, start, stop))
+
+        for _ in range(jobs + 1):
+            submit_next()
+        while pending:
+            chunk = pending.popleft().result()
+            submit_next()
+            yield from chunk
+
+
+def _render_chunk(render, start, stop):
+    return [render(i) for i in range(start, stop)]
+
+
+def render_selected(render, indices, jobs=1):
+    """Like :func:`render_frames`, but yield ``render(i)`` for ``i in indices``."""
+    return render_frames(partial(_pick, render, tuple(indices)), len(indices), jobs=jobs)
+
+
+def _pick(render, indices, i):
+    return render(indices[i])
+
+
+def threaded_map(fn, items, jobs=1):
+    """Yield ``fn(item)`` for each of *items* in order, using *jobs* threads.
+
+    Meant for Pillow operations that release the GIL (quantization,
+    encoding). Like :func:`render_frames`, only a small window of results
+    is held at a time, and *items* is consumed lazily.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+
+        def submit_next():
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                return
+
+        for _ in range(jobs * 2):
+            submit_next()
+        while pending:
+            result = pending.popleft().result()
+            submit_next()
+            yield result
+
+
+_DONE = object()
+
+
+def broadcast(items, consumers, window=4):
+    """Feed every item of *items* to each of *consumers*, each on its own thread.
+
+    Each consumer is called as ``consumer(iterable)`` and sees all items in
+    order; it may stop early. *items* is consumed once, and each consumer
+    lags at most *window* items behind it, so a fast producer cannot pile
+    up frames for a slow encoder. Returns ``[(result, busy_seconds), ...]``
+    in consumer order, where busy time excludes time spent waiting for the
+    next item. The first exception raised by a consumer is re-raised.
+
+    Every consumer gets the same objects, so consumers must not modify the
+    items they are given; an encoder that edits a frame works on a copy.
+    """
+    queues = [queue.Queue(window) for _ in consumers]
+    finished = [threading.Event() for _ in consumers]
+    results = [None] * len(consumers)
+    errors = []
+
+    def run(i, consumer):
+        waited = 0.0
+
+        def feed():
+            nonlocal waited
+            while True:
+                start = time.perf_counter()
+                item = queues[i].get()
+                waited += time.perf_counter() - start
+                if item is _DONE:
+                    return
+                yield item
+
+        start = time.perf_counter()
+        try:
+            result = consumer(feed())
+            results[i] = (result, time.perf_counter() - start - waited)
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            finished[i].set()
+
+    def put(i, item):
+        while not finished[i].is_set():
+            try:
+                queues[i].put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    threads = [threading.Thread(target=run, args=(i, consumer), daemon=True)
+               for i, consumer in enumerate(consumers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in items:
+            if errors:
+                break
+            for i in range(len(consumers)):
+                put(i, item)
+    finally:
+        for i in range(len(consumers)):
+            put(i, _DONE)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return results
@@ -0,0 +1,134 @@
+"""Background plates: gradient + grid + radial glow rendered once and reused.
+
+A plate is keyed by every parameter that affects its pixels. Frames take a
+copy of the cached plate instead of redrawing the gradient, the grid lines
+and the glow, and an LRU bound keeps animated glow fades from growing the
+cache without limit.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+from .gradients import gradient
+from .instrument import profiler
+
+# Value of Image.radial_gradient() at distance 128 from its centre.
+_RADIAL_EDGE = 181
+
+# Glow intensities are snapped to this step so a fade maps onto a handful
+# of plates instead of one per frame.
+INTENSITY_STEP = 0.005
+
+
+def quantize_intensity(intensity):
+    """Snap *intensity* to the plate cache's intensity grid."""
+    return round(round(intensity / INTENSITY_STEP) * INTENSITY_STEP, 6)
+
+
+@lru_cache(maxsize=64)
+def glow_mask(radius, intensity, cap=80):
+    """Return a 2r x 2r alpha mask with a quadratic falloff from the centre.
+
+    This is the closed form of the old concentric-ellipse loop: a pixel at
+    distance d gets ``intensity * 255 * (1 - d / radius) ** 2``, clamped to
+    *cap*, and nothing outside the radius.
+    """
+    lut = []
+    for v in range(256):
+        if v >= _RADIAL_EDGE:
+            lut.append(0)
+        else:
+            lut.append(min(cap, int(intensity * 255 * (1 - v / _RADIAL_EDGE) ** 2)))
+    dist = Image.radial_gradient('L').resize((2 * radius, 2 * radius), Image.BILINEAR)
+    return dist.point(lut)
+
+
+@lru_cache(maxsize=16)
+def ring_glow(radius, color, intensity, cap=80, step=3):
+    """Return the top-left quadrant of a glow drawn as concentric ellipses.
+
+    Rings are *step* pixels apart, from *radius* inwards, each filled with
+    the alpha of the quadratic falloff at its radius. The quadrant is
+    ``radius + 1`` pixels square and includes the centre row and column;
+    the full glow is it mirrored about both axes, which is pixel-identical
+    to drawing the whole ellipses.
+    """
+    quadrant = Image.new('RGBA', (radius + 1, radius + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(quadrant)
+    for r in range(radius, 0, -step):
+        alpha = min(int(intensity * 255 * (1 - r / radius) ** 2), cap)
+        draw.ellipse([radius - r, radius - r, radius + r, radius + r], fill=(*color, alpha))
+    return quadrant
+
+
+def apply_glow(img, cx, cy, radius, color, intensity, cap=80):
+    """Blend a radial glow of *color* into *img* in place."""
+    if radius <= 0 or intensity <= 0:
+        return
+    mask = glow_mask(radius, intensity, cap)
+    img.paste(color[:3], (cx - radius, cy - radius, cx + radius, cy + radius), mask)
+
+
+class PlateCache:
+    """LRU cache of rendered background plates."""
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._plates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """Return a copy of the plate for *key*, calling *build()* on a miss."""
+        plate = self._plates.get(key)
+        if plate is None:
+            self.misses += 1
+            plate = build()
+            self._plates[key] = plate
+            if len(self._plates) > self.maxsize:
+                self._plates.popitem(last=False)
+        else:
+            self.hits += 1
+            self._plates.move_to_end(key)
+        return plate.copy()
+
+    def clear(self):
+        self._plates.clear()
+
+    def __len__(self):
+        return len(self._plates)
+
+
+plates = PlateCache()
+
+
+def background_plate(size, stops, grid=None, glow=None, mode='RGB'):
+    """Return a copy of a gradient plate with optional grid lines and glow.
+
+    *grid* is ``(spacing, color)`` and *glow* is
+    ``(cx, cy, radius, color, intensity)``; the glow intensity is quantized
+    before it becomes part of the cache key.
+    """
+    if glow is not None:
+        cx, cy, radius, color, intensity = glow
+        glow = (cx, cy, radius, tuple(color), quantize_intensity(intensity))
+    key = (tuple(size), tuple(map(tuple, stops)), grid, glow, mode)
+
+    def build():
+        img = gradient(size, stops, mode=mode)
+        if grid is not None:
+            spacing, color = grid
+            draw = ImageDraw.Draw(img)
+            width, height = size
+            for gx in range(0, width, spacing):
+                draw.line([(gx, 0), (gx, height)], fill=color, width=1)
+            for gy in range(0, height, spacing):
+                draw.line([(0, gy), (width, gy)], fill=color, width=1)
+        if glow is not None:
+            with profiler.stage('glow'):
+                apply_glow(img, *glow)
+        return img
+
+    return plates.get(key, build)
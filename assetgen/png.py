@@ -0,0 +1,143 @@
+"""Streaming PNG writer.
+
+Pillow can only save a PNG from a whole image. :class:`PngWriter` takes the
+image as a series of full-width tiles, top to bottom, and compresses each
+one as it arrives, so writing a very large output needs memory for a tile
+rather than for the picture.
+
+Every row uses one PNG filter, computed for a whole tile at once with
+``ImageChops.subtract_modulo``: ``Up`` (each byte minus the byte above it)
+by default, since the scenes are mostly vertical gradients and flat fills,
+for which it leaves long runs of zeros, or ``Sub`` (minus the pixel to the
+left) or none. Only the last row of the previous tile is kept to filter
+the next tile's first row.
+"""
+
+import struct
+import zlib
+
+from PIL import Image, ImageChops
+
+from .apng import PNG_SIGNATURE, _chunk
+from .instrument import profiler
+
+# PNG colour types by Pillow mode
+COLOR_TYPES = {'L': 0, 'RGB': 2, 'RGBA': 6}
+
+FILTER_NONE = 0
+FILTER_SUB = 1
+FILTER_UP = 2
+
+# Compressed bytes collected before an IDAT chunk is written
+IDAT_SIZE = 1 << 16
+
+
+class PngWriter:
+    """Write a PNG one tile of rows at a time.
+
+    Usage::
+
+        with PngWriter(path, (width, height)) as png:
+            for tile in tiles:
+                png.add(tile)
+    """
+
+    def __init__(self, fp, size, mode='RGB', compress_level=6, filter_type=FILTER_UP,
+                 strategy=zlib.Z_DEFAULT_STRATEGY):
+        if mode not in COLOR_TYPES:
+            raise ValueError(f"unsupported PNG mode {mode!r}")
+        if filter_type not in (FILTER_NONE, FILTER_SUB, FILTER_UP):
+            raise ValueError(f"unsupported PNG filter {filter_type!r}")
+        self._own_fp = isinstance(fp, (str, bytes)) or hasattr(fp, '__fspath__')
+        self.fp = open(fp, 'wb') if self._own_fp else fp
+        self.size = tuple(size)
+        self.mode = mode
+        self.filter_type = filter_type
+        self.rows = 0
+        self.bytes_written = 0
+        self._compressor = zlib.compressobj(compress_level, zlib.DEFLATED, zlib.MAX_WBITS,
+                                            zlib.DEF_MEM_LEVEL, strategy)
+        self._pending = []
+        self._pending_size = 0
+        self._previous = Image.new(mode, (self.size[0], 1))
+        self._closed = False
+        width, height = self.size
+        self._write(PNG_SIGNATURE)
+        self._write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, COLOR_TYPES[mode], 0, 0, 0)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, data):
+        self.fp.write(data)
+        self.bytes_written += len(data)
+
+    def _queue(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= IDAT_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._write(_chunk(b'IDAT', b''.join(self._pending)))
+            self._pending, self._pending_size = [], 0
+
+    def add(self, tile):
+        """Append *tile*, a full-width image of the next rows."""
+        if tile.width != self.size[0]:
+            raise ValueError(f"tile width {tile.width} does not match PNG width {self.size[0]}")
+        if self.rows + tile.height > self.size[1]:
+            raise ValueError("tiles run past the bottom of the PNG")
+        tile = tile.convert(self.mode) if tile.mode != self.mode else tile
+        with profiler.stage('encoding', 'png tile'):
+            filtered = self._filter(tile).tobytes()
+            stride = len(filtered) // tile.height
+            marker = bytes([self.filter_type])
+            rows = b''.join(marker + filtered[i:i + stride] for i in range(0, len(filtered), stride))
+            self._queue(self._compressor.compress(rows))
+            self._previous = tile.crop((0, tile.height - 1, tile.width, tile.height))
+            self.rows += tile.height
+
+    def _filter(self, tile):
+        if self.filter_type == FILTER_NONE:
+            return tile
+        # The pixel each byte is predicted from: above, or to the left
+        # (zero past the edge)
+        predictor = Image.new(self.mode, tile.size)
+        if self.filter_type == FILTER_UP:
+            predictor.paste(self._previous, (0, 0))
+            predictor.paste(tile.crop((0, 0, tile.width, tile.height - 1)), (0, 1))
+        else:
+            predictor.paste(tile.crop((0, 0, tile.width - 1, tile.height)), (1, 0))
+        return ImageChops.subtract_modulo(tile, predictor)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self.rows != self.size[1]:
+                raise ValueError(f"PNG closed after {self.rows} of {self.size[1]} rows")
+            self._queue(self._compressor.flush())
+            self._flush()
+            self._write(_chunk(b'IEND', b''))
+        finally:
+            if self._own_fp:
+                self.fp.close()
+
+
+def write_png(fp, size, tiles, mode='RGB', compress_level=6, **options):
+    """Stream *tiles* (full-width images, top to bottom) into a PNG of *size*.
+
+    *options* (``filter_type``, ``strategy``) go to :class:`PngWriter`.
+    Returns the finished :class:`PngWriter` for its byte count.
+    """
+    with PngWriter(fp, size, mode=mode, compress_level=compress_level, **options) as png:
+        for tile in tiles:
+            png.add(tile)
+    return png
@@ -0,0 +1,116 @@
+"""Pick the smallest lossless PNG encoding of an image.
+
+:func:`optimize_png` encodes the image every way in :data:`ENCODINGS` (or
+those given): Pillow's encoder, which picks a filter per row, and
+:class:`assetgen.png.PngWriter` with one filter for every row, each at
+zlib's best level with the default and the ``Z_FILTERED`` strategies, plus
+an exact palette PNG when the image has at most 256 colors. Every
+candidate is decoded again and kept only if it shows exactly the source
+pixels; the smallest wins. Candidates encode on threads, since zlib and
+Pillow's encoder release the GIL.
+
+For the scenes' gradients and flat fills, no filter at all usually beats
+the per-row choice: the rows repeat, and deflate finds them whole.
+"""
+
+import io
+import zlib
+from collections import namedtuple
+from functools import partial
+
+from PIL import Image
+
+from .parallel import threaded_map
+from .png import FILTER_NONE, FILTER_SUB, FILTER_UP, write_png
+
+# PNG allows 256 palette entries
+PALETTE_MAX = 256
+
+FILTER_NAMES = {None: "adaptive filter", FILTER_NONE: "no filter", FILTER_SUB: "Sub filter",
+                FILTER_UP: "Up filter"}
+STRATEGY_NAMES = {zlib.Z_DEFAULT_STRATEGY: "default", zlib.Z_FILTERED: "filtered"}
+
+
+class Encoding(namedtuple('Encoding', 'level filter_type strategy palette')):
+    """One way to encode a PNG: zlib *level* and *strategy* (None for
+    Pillow's defaults), a *filter_type* for every row (None lets Pillow
+    choose per row) and whether to write an exact *palette* image.
+    """
+
+    __slots__ = ()
+
+    def describe(self):
+        if self == DEFAULT_ENCODING:
+            return "Pillow's defaults"
+        kind = "palette" if self.palette else FILTER_NAMES[self.filter_type]
+        return (f"{kind}, level {self.level}, "
+                f"{STRATEGY_NAMES[self.strategy]} strategy")
+
+
+# What a plain ``img.save(path, "PNG")`` writes
+DEFAULT_ENCODING = Encoding(None, None, None, False)
+
+ENCODINGS = tuple(
+    Encoding(9, filter_type, strategy, False)
+    for filter_type in (None, FILTER_NONE, FILTER_SUB, FILTER_UP)
+    for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+) + (Encoding(9, None, zlib.Z_DEFAULT_STRATEGY, True),)
+
+
+class OptimizedPng(namedtuple('OptimizedPng', 'data encoding baseline tried')):
+    """The smallest encoding found: its *data* and :class:`Encoding`, the
+    size Pillow's default settings give (*baseline*) and the number of
+    lossless candidates *tried*.
+    """
+
+    __slots__ = ()
+
+    def summary(self):
+        size = len(self.data)
+        return (f"PNG {self.baseline / 1024:.1f} KB -> {size / 1024:.1f} KB "
+                f"({size / self.baseline - 1:+.0%}), {self.encoding.describe()}")
+
+
+def encode(img, encoding):
+    """Encode *img* as PNG with *encoding*; returns the bytes, or None if it does not apply."""
+    if encoding.palette:
+        colors = img.getcolors(PALETTE_MAX) if img.mode == 'RGB' else None
+        if colors is None:
+            return None
+        # With a box per color, median cut maps every color to itself
+        img = img.quantize(len(colors), method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    buf = io.BytesIO()
+    if encoding.filter_type is None:
+        options = {'compress_level': encoding.level, 'compress_type': encoding.strategy}
+        img.save(buf, 'PNG', **{name: value for name, value in options.items() if value is not None})
+    else:
+        write_png(buf, img.size, [img], mode=img.mode, compress_level=encoding.level,
+                  filter_type=encoding.filter_type, strategy=encoding.strategy)
+    return buf.getvalue()
+
+
+def lossless(data, img):
+    """True if the PNG *data* decodes to exactly the pixels of *img*."""
+    with Image.open(io.BytesIO(data)) as decoded:
+        return decoded.convert(img.mode).tobytes() == img.tobytes()
+
+
+def _candidate(img, encoding):
+    data = encode(img, encoding)
+    if data is None or not lossless(data, img):
+        return None
+    return encoding, data
+
+
+def optimize_png(img, encodings=ENCODINGS, jobs=0):
+    """Return the smallest lossless PNG of *img* among *encodings*, as an :class:`OptimizedPng`.
+
+    Pillow's default encoding is always a candidate, so the result is
+    never larger than a plain ``img.save(path, "PNG")``.
+    """
+    if img.mode not in ('RGB', 'RGBA', 'L'):
+        img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+    encodings = (DEFAULT_ENCODING,) + tuple(e for e in encodings if e != DEFAULT_ENCODING)
+    results = dict(r for r in threaded_map(partial(_candidate, img), encodings, jobs=jobs) if r is not None)
+    encoding = min(results, key=lambda e: len(results[e]))
+    return OptimizedPng(results[encoding], encoding, len(results[DEFAULT_ENCODING]), len(results))
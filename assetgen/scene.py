@@ -0,0 +1,459 @@
+"""Resolution-independent scenes for the static assets.
+
+A scene is laid out once in design units (the asset's 1x size) as a list of
+nodes in paint order. Rendering maps design units to pixels with one scale
+per output and walks the node list once, painting every requested size as
+it goes. Fonts, text metrics, gradients and glow masks are shared across
+sizes through the package caches, so an extra size costs only its
+rasterization.
+
+Coordinates and lengths scale as ``int(v * scale)``, the same rounding the
+hand-written renderers used; line widths never drop below one pixel.
+
+Translucent nodes are drawn on an overlay covering only their bounding box,
+which is then blended into the canvas in place, so a pill or a glow costs
+its own area rather than a full-canvas composite.
+
+A canvas may cover just a *region* of its output, so a very large output
+can be rendered as a series of horizontal tiles (:meth:`Scene.tiles`).
+Nodes paint in output coordinates shifted by the region's origin and
+Pillow clips whatever falls outside, so a glow or a line of text crossing
+a tile edge comes out whole on both sides without any overlap.
+"""
+
+from collections import namedtuple
+from functools import partial
+
+from PIL import Image, ImageDraw
+
+from .fonts import get_font, text_layout
+from .gradients import gradient
+from .instrument import profiler
+from .parallel import render_selected
+from .plates import apply_glow, ring_glow
+
+
+class Canvas:
+    """One output of a scene: the image being painted and its scale.
+
+    *size* is the whole output's size; the image covers *region* of it
+    (default: all of it). :meth:`x`, :meth:`y` and :meth:`box` map design
+    units to pixel coordinates in the image.
+    """
+
+    def __init__(self, size, scale, region=None):
+        self.size = size
+        self.scale = scale
+        self.region = tuple(region) if region else (0, 0) + tuple(size)
+        self.img = None
+        self.draw = None
+
+    @property
+    def origin(self):
+        return self.region[:2]
+
+    def px(self, v):
+        return int(v * self.scale)
+
+    def x(self, v):
+        return int(v * self.scale) - self.region[0]
+
+    def y(self, v):
+        return int(v * self.scale) - self.region[1]
+
+    def width(self, w):
+        return max(1, int(w * self.scale))
+
+    def box(self, box):
+        return [self.x(box[0]), self.y(box[1]), self.x(box[2]), self.y(box[3])]
+
+    def set_image(self, img):
+        self.img = img
+        self.draw = ImageDraw.Draw(img)
+
+    def clip(self, box):
+        """Clip the inclusive pixel *box* to the canvas; returns ``(x0, y0, x1, y1)`` or None."""
+        x0, y0 = max(0, box[0]), max(0, box[1])
+        x1, y1 = min(self.img.width, box[2] + 1), min(self.img.height, box[3] + 1)
+        return (x0, y0, x1, y1) if x0 < x1 and y0 < y1 else None
+
+    def overlay(self, box):
+        """Return a transparent overlay covering the clipped *box*, or None if it is off-canvas.
+
+        Draw on it in canvas coordinates minus ``overlay.origin``.
+        """
+        region = self.clip(box)
+        if region is None:
+            return None
+        overlay = Image.new('RGBA', (region[2] - region[0], region[3] - region[1]), (0, 0, 0, 0))
+        overlay.origin = region[:2]
+        return overlay
+
+    def composite(self, overlay, origin=None):
+        """Blend *overlay* into the canvas in place at *origin* (default ``overlay.origin``).
+
+        The overlay may hang off the canvas; only the part on it is blended.
+        """
+        x, y = overlay.origin if origin is None else origin
+        region = self.clip((x, y, x + overlay.width - 1, y + overlay.height - 1))
+        if region is None:
+            return
+        if region != (x, y, x + overlay.width, y + overlay.height):
+            overlay = overlay.crop((region[0] - x, region[1] - y, region[2] - x, region[3] - y))
+        if self.img.mode == 'RGBA':
+            self.img.alpha_composite(overlay, dest=region[:2])
+        else:
+            self.img.paste(overlay, region[:2], overlay)
+        self.draw = ImageDraw.Draw(self.img)
+
+
+class Scene:
+    """A list of nodes laid out in a *width* x *height* design space."""
+
+    def __init__(self, width, height, mode='RGB'):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.nodes = []
+        self.shared = 0
+
+    def add(self, node):
+        self.nodes.append(node)
+        return node
+
+    def size(self, scale):
+        return (round(self.width * scale), round(self.height * scale))
+
+    def mark_shared(self):
+        """Mark the nodes added so far as shared by every variant of the scene.
+
+        Localized variants of a scene start with the same nodes (background,
+        glows, artwork) and differ only in the text painted over them;
+        :meth:`render_shared` renders that common start once so each variant
+        can be painted over a copy of it.
+        """
+        self.shared = len(self.nodes)
+
+    def _paint(self, canvases, nodes):
+        for node in nodes:
+            for canvas in canvases:
+                with profiler.stage(node.stage, type(node).__name__):
+                    node.paint(canvas)
+
+    def render(self, scales, base=None):
+        """Render the scene once per scale in a single pass over the nodes.
+
+        With *base*, one image per scale from :meth:`render_shared`, the
+        shared nodes are skipped and the rest paint over copies of it.
+        """
+        canvases = [Canvas(self.size(scale), scale) for scale in scales]
+        nodes = self.nodes
+        if base is not None:
+            for canvas, img in zip(canvases, base):
+                canvas.set_image(img.copy())
+            nodes = nodes[self.shared:]
+        self._paint(canvases, nodes)
+        with profiler.stage('conversion'):
+            return [canvas.img.convert(self.mode) for canvas in canvases]
+
+    def render_shared(self, scales):
+        """Render only the shared nodes, one image per scale, for :meth:`render`'s *base*."""
+        canvases = [Canvas(self.size(scale), scale) for scale in scales]
+        self._paint(canvases, self.nodes[:self.shared])
+        return [canvas.img for canvas in canvases]
+
+    def render_sizes(self, widths, base=None):
+        """Render the scene at each output width; returns ``{width: image}``.
+
+        *base* is an optional ``{width: image}`` of the shared nodes.
+        """
+        widths = list(widths)
+        base = None if base is None else [base[w] for w in widths]
+        return dict(zip(widths, self.render([w / self.width for w in widths], base)))
+
+    def render_region(self, scale, region):
+        """Render only *region* ``(x0, y0, x1, y1)`` of the output at *scale*."""
+        canvas = Canvas(self.size(scale), scale, region)
+        for node in self.nodes:
+            with profiler.stage(node.stage, type(node).__name__):
+                node.paint(canvas)
+        with profiler.stage('conversion'):
+            return canvas.img.convert(self.mode)
+
+    def tile(self, scale, tile_height, index):
+        """Render horizontal tile *index*, *tile_height* rows high, of the output at *scale*."""
+        width, height = self.size(scale)
+        top = index * tile_height
+        return self.render_region(scale, (0, top, width, min(height, top + tile_height)))
+
+    def tiles(self, scale, tile_height=256, jobs=1):
+        """Yield the output at *scale* as full-width tiles, top to bottom.
+
+        Tiles are rendered across *jobs* processes (see
+        :func:`assetgen.parallel.render_selected`); memory is bounded by a
+        few tiles, whatever the output's height.
+        """
+        count = -(-self.size(scale)[1] // tile_height)
+        yield from render_selected(partial(self.tile, scale, tile_height), range(count), jobs=jobs)
+
+
+# =============================================================================
+# NODES
+# =============================================================================
+class Gradient:
+    """Fill the canvas with a vertical gradient (always the first node)."""
+
+    stage = 'background'
+
+    def __init__(self, stops, mode='RGB'):
+        self.stops = stops
+        self.mode = mode
+
+    def paint(self, canvas):
+        canvas.set_image(gradient(canvas.size, self.stops, mode=self.mode, box=canvas.region))
+
+
+class Grid:
+    """Faint grid lines composited over the canvas.
+
+    *spacing* is in output pixels: the grid is a texture, not layout, and
+    stays one hairline every *spacing* pixels at every scale.
+    """
+
+    stage = 'background'
+
+    def __init__(self, spacing, color):
+        self.spacing = spacing
+        self.color = color
+
+    def paint(self, canvas):
+        # One row strip per horizontal line and one column strip per
+        # vertical line; the columns are transparent where they cross a
+        # row, so every grid pixel is blended exactly once.
+        x0, y0, x1, y1 = canvas.region
+        spacing = self.spacing
+        rows = range(-(-y0 // spacing) * spacing, y1, spacing)
+        row = Image.new('RGBA', (x1 - x0, 1), self.color)
+        column = Image.new('RGBA', (1, y1 - y0), self.color)
+        for gy in rows:
+            column.putpixel((0, gy - y0), (0, 0, 0, 0))
+        for gx in range(-(-x0 // spacing) * spacing, x1, spacing):
+            canvas.composite(column, (gx - x0, 0))
+        for gy in rows:
+            canvas.composite(row, (0, gy - y0))
+
+
+class Glow:
+    """A radial glow of *color* centred on (*cx*, *cy*).
+
+    By default it is blended with the closed-form glow mask. With *rings*
+    it is drawn the old way instead, as concentric ellipses *rings* pixels
+    apart (see :func:`assetgen.plates.ring_glow`).
+    """
+
+    stage = 'glow'
+
+    def __init__(self, cx, cy, radius, color, intensity, cap=80, rings=None):
+        self.cx, self.cy, self.radius = cx, cy, radius
+        self.color = color
+        self.intensity = intensity
+        self.cap = cap
+        self.rings = rings
+
+    def paint(self, canvas):
+        cx, cy, radius = canvas.x(self.cx), canvas.y(self.cy), canvas.px(self.radius)
+        if self.rings is None:
+            apply_glow(canvas.img, cx, cy, radius, self.color, self.intensity, self.cap)
+            return
+        if radius <= 0:
+            return
+        if canvas.region != (0, 0) + tuple(canvas.size):
+            # A tile: draw only the part of the rings that falls on it, so
+            # memory follows the tile rather than the glow's size
+            glow = canvas.overlay([cx - radius, cy - radius, cx + radius, cy + radius])
+            if glow is None:
+                return
+            gd = ImageDraw.Draw(glow)
+            cx, cy = cx - glow.origin[0], cy - glow.origin[1]
+            for r in range(radius, 0, -self.rings):
+                alpha = min(int(self.intensity * 255 * (1 - r / radius) ** 2), self.cap)
+                gd.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(*self.color, alpha))
+            canvas.composite(glow)
+            return
+        # The rings are symmetric about both axes: draw the top-left
+        # quadrant (centre row and column included) and blend it mirrored
+        # into the other three, leaving the shared axes out of those.
+        quadrant = ring_glow(radius, self.color, self.intensity, self.cap, self.rings)
+        flipped = quadrant.transpose(Image.FLIP_LEFT_RIGHT)
+        canvas.composite(quadrant, (cx - radius, cy - radius))
+        canvas.composite(flipped.crop((1, 0, radius + 1, radius + 1)), (cx + 1, cy - radius))
+        canvas.composite(quadrant.transpose(Image.FLIP_TOP_BOTTOM).crop((0, 1, radius + 1, radius + 1)),
+                         (cx - radius, cy + 1))
+        canvas.composite(flipped.transpose(Image.FLIP_TOP_BOTTOM).crop((1, 1, radius + 1, radius + 1)),
+                         (cx + 1, cy + 1))
+
+
+class Shape:
+    """A drawing function called as ``fn(draw, x, y, size, *args)`` in pixels."""
+
+    stage = 'shapes'
+
+    def __init__(self, fn, cx, cy, size, *args):
+        self.fn = fn
+        self.cx, self.cy, self.size = cx, cy, size
+        self.args = args
+
+    def paint(self, canvas):
+        self.fn(canvas.draw, canvas.x(self.cx), canvas.y(self.cy), canvas.px(self.size), *self.args)
+
+
+class Text:
+    """Text in a font of design *size*.
+
+    With ``align='center'`` *x* is the centre, resolved against the text's
+    width in the font actually used at each scale.
+    """
+
+    stage = 'text'
+
+    def __init__(self, x, y, text, size, fill, bold=False, align='left'):
+        self.x, self.y = x, y
+        self.text = text
+        self.size = size
+        self.fill = fill
+        self.bold = bold
+        self.align = align
+
+    def font(self, scale=1):
+        return get_font(int(self.size * scale), bold=self.bold)
+
+    def layout(self, scale=1):
+        return text_layout(self.text, self.font(scale))
+
+    def paint(self, canvas):
+        font = self.font(canvas.scale)
+        x = canvas.px(self.x)
+        if self.align == 'center':
+            x = (2 * x - text_layout(self.text, font).width) // 2
+        canvas.draw.text((x - canvas.origin[0], canvas.y(self.y)), self.text, font=font, fill=self.fill)
+
+
+class Line:
+    stage = 'shapes'
+
+    def __init__(self, points, fill, width=1):
+        self.points = points
+        self.fill = fill
+        self.width = width
+
+    def paint(self, canvas):
+        points = [(canvas.x(x), canvas.y(y)) for x, y in self.points]
+        canvas.draw.line(points, fill=self.fill, width=canvas.width(self.width))
+
+
+class Rect:
+    """A (rounded) rectangle; translucent fills go through an overlay."""
+
+    stage = 'shapes'
+
+    def __init__(self, box, radius=0, fill=None, outline=None, width=1):
+        self.box = box
+        self.radius = radius
+        self.fill = fill
+        self.outline = outline
+        self.width = width
+
+    def paint(self, canvas):
+        rounded_rectangle(canvas, canvas.box(self.box), canvas.px(self.radius), self.fill, self.outline,
+                          canvas.width(self.width))
+
+
+def rounded_rectangle(canvas, box, radius, fill, outline, width):
+    """Draw a rounded rectangle at the pixel *box*; a translucent *fill* is blended through an overlay."""
+    if fill is not None and len(fill) == 4:
+        overlay = canvas.overlay(box)
+        if overlay is not None:
+            x, y = overlay.origin
+            ImageDraw.Draw(overlay).rounded_rectangle(
+                [box[0] - x, box[1] - y, box[2] - x, box[3] - y], radius=radius, fill=fill)
+            canvas.composite(overlay)
+        fill = None
+    if fill is not None or outline is not None:
+        canvas.draw.rounded_rectangle(box, radius=radius, fill=fill, outline=outline, width=width)
+
+
+class Pill(namedtuple('Pill', 'text size color fill outline bold radius', defaults=(None, None, False, 0))):
+    """One label of a :class:`PillRow`: text of design *size* in *color*,
+    boxed with *fill* and *outline* (both None for bare text).
+    """
+
+    __slots__ = ()
+
+    @property
+    def boxed(self):
+        return self.fill is not None or self.outline is not None
+
+
+class PillRow:
+    """Labels in rounded boxes, left to right from (*x*, *y*), *gap* apart.
+
+    Each box is sized from its label in the font used at each scale, with
+    its text *inset* from the top-left corner and the box *extra* larger
+    than the text, all in design units; laying the row out at 1x and
+    scaling it would let wider text at other sizes run into the padding.
+    Bare text has no horizontal padding and lines up with the boxed text.
+    With *below*, another row, *y* is a gap under the bottom of that row's
+    last box instead.
+    """
+
+    stage = 'text'
+
+    def __init__(self, x, y, pills, gap=10, inset=(8, 4), extra=(16, 10), below=None):
+        self.x, self.y = x, y
+        self.pills = pills
+        self.gap = gap
+        self.inset = inset
+        self.extra = extra
+        self.below = below
+
+    def layout(self, scale):
+        """Return ``[(pill, font, x, width, height)]`` in pixels of the output at *scale*."""
+        x = int(self.x * scale)
+        boxes = []
+        for pill in self.pills:
+            font = get_font(int(pill.size * scale), bold=pill.bold)
+            bbox = text_layout(pill.text, font).bbox
+            w = bbox[2] - bbox[0] + (int(self.extra[0] * scale) if pill.boxed else 0)
+            h = bbox[3] - bbox[1] + int(self.extra[1] * scale)
+            boxes.append((pill, font, x, w, h))
+            x += w + int(self.gap * scale)
+        return boxes
+
+    def top(self, scale):
+        if self.below is None:
+            return int(self.y * scale)
+        below = [h for pill, _, _, _, h in self.below.layout(scale) if pill.boxed]
+        return self.below.top(scale) + below[-1] + int(self.y * scale)
+
+    def paint(self, canvas):
+        x0, y0 = canvas.origin
+        top = self.top(canvas.scale)
+        for pill, font, x, w, h in self.layout(canvas.scale):
+            if pill.boxed:
+                rounded_rectangle(canvas, [x - x0, top - y0, x + w - x0, top + h - y0],
+                                  canvas.px(pill.radius), pill.fill, pill.outline, 1)
+                x += canvas.px(self.inset[0])
+            canvas.draw.text((x - x0, top + canvas.px(self.inset[1]) - y0), pill.text, font=font,
+                             fill=pill.color)
+
+
+class Dot:
+    stage = 'shapes'
+
+    def __init__(self, cx, cy, r, fill):
+        self.cx, self.cy, self.r = cx, cy, r
+        self.fill = fill
+
+    def paint(self, canvas):
+        cx, cy, r = canvas.x(self.cx), canvas.y(self.cy), canvas.px(self.r)
+        canvas.draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=self.fill)
@@ -0,0 +1,41 @@
+"""Contact sheets: many frames laid out in one grid image.
+
+A sheet shows an animation's timing at a glance, one labelled cell per
+frame, without encoding the animation.
+"""
+
+import math
+
+from PIL import Image, ImageDraw
+
+from .fonts import get_font, text_layout
+
+SHEET_BG = (40, 40, 48)
+LABEL_COLOR = (200, 200, 210)
+LABEL_SIZE = 12
+
+
+def contact_sheet(images, columns=6, labels=None, gap=6, background=SHEET_BG):
+    """Lay *images* (all the same size) out row by row, *columns* per row.
+
+    *labels*, one per image, are written under each cell. Returns an RGB
+    image.
+    """
+    images = list(images)
+    if not images:
+        raise ValueError("a contact sheet needs at least one image")
+    width, height = images[0].size
+    columns = max(1, min(columns, len(images)))
+    rows = math.ceil(len(images) / columns)
+    font = get_font(LABEL_SIZE)
+    label_h = text_layout("0", font).height + gap if labels else 0
+    cell_w, cell_h = width + gap, height + label_h + gap
+    sheet = Image.new('RGB', (columns * cell_w + gap, rows * cell_h + gap), background)
+    draw = ImageDraw.Draw(sheet)
+    for i, img in enumerate(images):
+        x = gap + (i % columns) * cell_w
+        y = gap + (i // columns) * cell_h
+        sheet.paste(img.convert('RGB'), (x, y))
+        if labels:
+            draw.text((x, y + height + gap // 2), labels[i], font=font, fill=LABEL_COLOR)
+    return sheet
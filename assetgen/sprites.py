@@ -0,0 +1,96 @@
+"""Pre-rendered sprites for elements that only move between frames.
+
+An element (the anvil, a spark, a pill, a line of text) is rasterized once
+per distinct look into an RGBA sprite and then blitted at its animated
+position, so per-frame work is a handful of pastes instead of redrawing
+vector primitives.
+"""
+
+from collections import OrderedDict, namedtuple
+
+from PIL import Image, ImageDraw
+
+from .fonts import text_layout
+
+
+class Sprite(namedtuple('Sprite', 'image anchor')):
+    """An RGBA image plus the offset of its anchor point inside it."""
+
+    __slots__ = ()
+
+    def paste(self, img, x, y):
+        """Composite the sprite onto *img* with its anchor at (x, y)."""
+        ax, ay = self.anchor
+        img.paste(self.image, (x - ax, y - ay), self.image)
+
+
+def rasterize(draw_fn, extent, supersample=1):
+    """Render *draw_fn* into a trimmed sprite.
+
+    *draw_fn(draw, x, y, k)* must paint the element anchored at (x, y) with
+    all lengths multiplied by *k*. *extent* is a generous
+    ``(left, top, right, bottom)`` box around the anchor at k = 1. With
+    *supersample* > 1 the element is drawn k times larger and reduced with
+    a Lanczos filter, which anti-aliases shapes ImageDraw draws hard-edged.
+    """
+    k = supersample
+    left, top, right, bottom = extent
+    canvas = Image.new('RGBA', ((right - left) * k, (bottom - top) * k), (0, 0, 0, 0))
+    draw_fn(ImageDraw.Draw(canvas), -left * k, -top * k, k)
+    if k > 1:
+        canvas = canvas.resize((right - left, bottom - top), Image.LANCZOS)
+    anchor = (-left, -top)
+    bbox = canvas.getbbox()
+    if bbox is None:
+        return Sprite(canvas.crop((0, 0, 1, 1)), anchor)
+    return Sprite(canvas.crop(bbox), (anchor[0] - bbox[0], anchor[1] - bbox[1]))
+
+
+def render_text(text, font, color):
+    """Render *text* as a sprite anchored at its ``draw.text`` origin.
+
+    The glyph coverage becomes the sprite's alpha over a solid *color*, so
+    pasting it blends exactly like drawing the text in place.
+    """
+    left, top, right, bottom = text_layout(text, font).bbox
+    size = (max(1, right - left), max(1, bottom - top))
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+    image = Image.new('RGBA', size, tuple(color[:3]) + (255,))
+    image.putalpha(mask)
+    return Sprite(image, (-left, -top))
+
+
+class SpriteCache:
+    """LRU cache of rendered sprites."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._sprites = OrderedDict()
+
+    def get(self, key, build):
+        """Return the sprite for *key*, calling *build()* on a miss."""
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = build()
+            self._sprites[key] = sprite
+            if len(self._sprites) > self.maxsize:
+                self._sprites.popitem(last=False)
+        else:
+            self._sprites.move_to_end(key)
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
+
+    def __len__(self):
+        return len(self._sprites)
+
+
+sprites = SpriteCache()
+
+
+def text_sprite(text, font, color):
+    """Return the cached sprite for *text* in *font* and *color*."""
+    color = tuple(color[:3])
+    return sprites.get(('text', text, font, color), lambda: render_text(text, font, color))
@@ -0,0 +1,56 @@
+"""Per-locale string tables for the assets' text.
+
+Each locale is a JSON file ``locales/<locale>.json`` with one object per
+asset family (``"banner"``, ``"promo"``), mapping string keys to their
+translation. Keys a locale leaves out fall back to the script's English
+defaults; unknown keys are an error, so a typo does not silently render
+English.
+"""
+
+import json
+import os
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "locales")
+
+# The locale of the defaults in the scripts
+DEFAULT_LOCALE = 'en'
+
+
+class Strings(dict):
+    """A locale's strings by key.
+
+    Hashable, so it can key the render caches; two locales with the same
+    strings render the same pixels.
+    """
+
+    def __init__(self, locale, table):
+        super().__init__(table)
+        self.locale = locale
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __repr__(self):
+        return f"Strings({self.locale!r}, {dict(self)!r})"
+
+
+def available_locales(directory=LOCALES_DIR):
+    """The locales that have a string table in *directory*."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith('.json'))
+
+
+def load_strings(locale, section, defaults, directory=LOCALES_DIR):
+    """Return *section*'s strings for *locale*, falling back to *defaults*."""
+    if locale == DEFAULT_LOCALE:
+        return Strings(locale, defaults)
+    path = os.path.join(directory, f"{locale}.json")
+    with open(path, encoding='utf-8') as fp:
+        table = json.load(fp).get(section, {})
+    unknown = sorted(set(table) - set(defaults))
+    if unknown:
+        raise ValueError(f"{path}: unknown {section} strings: {', '.join(unknown)}")
+    return Strings(locale, {**defaults, **table})
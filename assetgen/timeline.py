@@ -0,0 +1,207 @@
+"""Declarative keyframe timelines for the animated assets.
+
+An animation is a list of layers in paint order. Each layer is visible over
+a time interval and has properties that are either constants or tracks of
+eased keyframes. The timeline evaluates every property for every frame in
+one pass, which tells the renderer exactly which layers change on a given
+frame and which frames are identical to the one before.
+"""
+
+import math
+from collections import namedtuple
+
+from .instrument import profiler
+
+
+def linear(t):
+    return min(1, max(0, t))
+
+
+def ease_out(t):
+    return 1 - (1 - min(1, max(0, t))) ** 3
+
+
+def ease_in_out(t):
+    t = min(1, max(0, t))
+    return 4 * t * t * t if t < 0.5 else 1 - pow(-2 * t + 2, 3) / 2
+
+
+Keyframe = namedtuple('Keyframe', 'time value easing')
+
+
+class Track:
+    """A property animated through keyframes.
+
+    Keyframes are ``(time, value)`` or ``(time, value, easing)``; the easing
+    of a keyframe shapes the segment that ends at it. Before the first
+    keyframe the value holds at the first value, after the last at the last.
+    *cast* (e.g. ``int``) is applied to every value, so frames whose
+    properties cast to the same value compare equal.
+    """
+
+    def __init__(self, *keyframes, cast=None):
+        if not keyframes:
+            raise ValueError("a track needs at least one keyframe")
+        self.keyframes = [Keyframe(k[0], k[1], k[2] if len(k) > 2 else linear)
+                          for k in sorted(keyframes, key=lambda k: k[0])]
+        self.cast = cast
+
+    def value(self, t):
+        keys = self.keyframes
+        if t <= keys[0].time:
+            value = keys[0].value
+        elif t >= keys[-1].time:
+            value = keys[-1].value
+        else:
+            for a, b in zip(keys, keys[1:]):
+                if t < b.time:
+                    value = a.value + (b.value - a.value) * b.easing((t - a.time) / (b.time - a.time))
+                    break
+        return self.cast(value) if self.cast else value
+
+
+class Procedural:
+    """A property computed by ``fn(t)``; assumed to change on every frame."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def value(self, t):
+        return self.fn(t)
+
+
+class Layer:
+    """One element of an animation.
+
+    The layer is visible from *start* (inclusive) or *after* (exclusive) up
+    to *end* (exclusive). *paint(img, **props)* draws it and returns the
+    canvas; a background layer ignores the incoming canvas (``None`` for
+    the first layer) and returns a new one. Keyword *props* are constants or
+    :class:`Track`/:class:`Procedural` values. *stage* is the profiling
+    stage its painting is reported under. A *shared* layer looks the same
+    in every localized variant of the animation (see
+    :meth:`Timeline.shared_key`).
+    """
+
+    def __init__(self, name, paint, start=0.0, end=math.inf, after=None, stage='shapes',
+                 shared=False, **props):
+        self.name = name
+        self.paint = paint
+        self.stage = stage
+        self.shared = shared
+        self.start = start if after is None else after
+        self.inclusive = after is None
+        self.end = end
+        self.props = props
+
+    def visible(self, t):
+        after_start = t >= self.start if self.inclusive else t > self.start
+        return after_start and t < self.end
+
+    def state(self, t):
+        """Return the layer's properties at *t* as a tuple of pairs, or None."""
+        if not self.visible(t):
+            return None
+        return tuple(
+            (key, value.value(t) if isinstance(value, (Track, Procedural)) else value)
+            for key, value in sorted(self.props.items())
+        )
+
+
+class Timeline:
+    """An ordered set of layers sampled at a fixed frame rate."""
+
+    def __init__(self, duration, fps, layers):
+        self.duration = duration
+        self.fps = fps
+        self.frames = int(round(duration * fps))
+        self.layers = list(layers)
+        names = [layer.name for layer in self.layers]
+        if len(set(names)) != len(names):
+            raise ValueError("layer names must be unique")
+        self._table = None
+
+    def time(self, f):
+        return f / self.fps
+
+    @property
+    def table(self):
+        """Per-frame layer states: ``table[f][i]`` is layer i's state or None."""
+        if self._table is None:
+            self._table = [
+                tuple(layer.state(self.time(f)) for layer in self.layers)
+                for f in range(self.frames)
+            ]
+        return self._table
+
+    def frame(self, f):
+        """Yield ``(layer, props)`` for the layers visible on frame *f*."""
+        for layer, state in zip(self.layers, self.table[f]):
+            if state is not None:
+                yield layer, dict(state)
+
+    def render(self, f, base=None):
+        """Paint frame *f* and return the canvas.
+
+        With *base*, an image of the frame's shared layers (see
+        :meth:`render_shared`), those layers are skipped and the rest paint
+        over *base* itself.
+        """
+        layers = list(self.frame(f))
+        img = None
+        if base is not None:
+            layers = layers[len(self.shared_key(f)):]
+            img = base
+        with profiler.stage('frame', f"frame {f}"):
+            for layer, props in layers:
+                with profiler.stage(layer.stage, layer.name):
+                    img = layer.paint(img, **props)
+        return img
+
+    def shared_key(self, f):
+        """A key for the shared layers that open frame *f*, or ``()`` if it has none.
+
+        Every variant of the animation whose layers agree on this key
+        paints the same image with them, so it can be rendered once and
+        reused as the *base* of :meth:`render`.
+        """
+        key = []
+        for layer, state in zip(self.layers, self.table[f]):
+            if state is None:
+                continue
+            if not layer.shared:
+                break
+            key.append((layer.name, state))
+        return tuple(key)
+
+    def render_shared(self, f):
+        """Paint only the shared layers that open frame *f*."""
+        img = None
+        for layer, props in list(self.frame(f))[:len(self.shared_key(f))]:
+            with profiler.stage(layer.stage, layer.name):
+                img = layer.paint(img, **props)
+        return img
+
+    def frame_key(self, f):
+        """A hashable key that is equal for frames that render identically."""
+        return self.table[f]
+
+    def changed_layers(self, f):
+        """Names of the layers whose state differs from frame ``f - 1``."""
+        if f == 0:
+            return [layer.name for layer, state in zip(self.layers, self.table[0]) if state is not None]
+        previous, current = self.table[f - 1], self.table[f]
+        return [layer.name for layer, a, b in zip(self.layers, previous, current) if a != b]
+
+    def static_layers(self, start, stop):
+        """Names of the layers visible and unchanged over frames [start, stop)."""
+        rows = self.table[start:stop]
+        return [
+            layer.name for i, layer in enumerate(self.layers)
+            if rows[0][i] is not None and all(row[i] == rows[0][i] for row in rows)
+        ]
+
+    def distinct_frames(self):
+        """Return the indices of frames that differ from their predecessor."""
+        table = self.table
+        return [f for f in range(self.frames) if f == 0 or table[f] != table[f - 1]]
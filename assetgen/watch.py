@@ -0,0 +1,135 @@
+"""Poll source files for changes and reload the modules they belong to.
+
+Watch mode keeps one process alive between builds, so fonts, text layouts
+and background plates stay loaded while the code that uses them changes.
+Files are polled by modification time and size, which needs nothing beyond
+the standard library and sees every editor's way of saving a file.
+
+A changed module is reloaded together with every loaded module that
+imports from it, dependencies first, so ``from .x import y`` names pick up
+the new code. Modules nothing changed in keep their state and caches.
+"""
+
+import fnmatch
+import importlib
+import os
+import sys
+import time
+import types
+
+# Files watch mode reacts to
+PATTERNS = ('*.py', '*.json')
+
+
+def snapshot(paths, patterns=PATTERNS):
+    """Return ``{file: (mtime_ns, size)}`` for *paths* and the matching files under them."""
+    state = {}
+    for path in paths:
+        if os.path.isdir(path):
+            files = (os.path.join(root, name) for root, dirs, names in os.walk(path)
+                     for name in names if any(fnmatch.fnmatch(name, p) for p in patterns))
+        else:
+            files = [path]
+        for name in files:
+            try:
+                st = os.stat(name)
+            except OSError:
+                continue
+            state[os.path.abspath(name)] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+class Watcher:
+    """Report files under *paths* that were added, changed or removed.
+
+    *interval* is the polling period in seconds.
+    """
+
+    def __init__(self, paths, patterns=PATTERNS, interval=0.2):
+        self.paths = list(paths)
+        self.patterns = patterns
+        self.interval = interval
+        self._state = snapshot(self.paths, patterns)
+
+    def poll(self):
+        """Return the files that changed since the last poll, sorted."""
+        state = snapshot(self.paths, self.patterns)
+        changed = sorted(path for path in state.keys() | self._state.keys()
+                         if state.get(path) != self._state.get(path))
+        self._state = state
+        return changed
+
+    def wait(self):
+        """Block until files change and stay unchanged for one interval; return them.
+
+        Waiting for the files to settle turns an editor's save (often a
+        write, a rename and a metadata update) into one rebuild.
+        """
+        changed = set()
+        while True:
+            time.sleep(self.interval)
+            batch = self.poll()
+            if batch:
+                changed.update(batch)
+            elif changed:
+                return sorted(changed)
+
+
+def _module_file(module):
+    path = getattr(module, '__file__', None)
+    return os.path.abspath(path) if path else None
+
+
+def _imports_from(module, names):
+    """The names in *names* of modules *module* imports or imports from."""
+    found = set()
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType) and value.__name__ in names:
+            found.add(value.__name__)
+        owner = getattr(value, '__module__', None) or type(value).__module__
+        if owner in names:
+            found.add(owner)
+    found.discard(module.__name__)
+    return found
+
+
+def _under(path, roots):
+    return path is not None and any(path == root or path.startswith(root + os.sep) for root in roots)
+
+
+def reload_modules(paths, roots):
+    """Reload the modules defined in *paths* and the modules that import from them.
+
+    Only modules loaded from files under *roots* are considered. Returns
+    the reloaded modules in the order they were reloaded, dependencies
+    first. ``__main__`` (and any other alias of a module) is never
+    reloaded, so code that should follow edits must be imported under its
+    own name.
+    """
+    paths = {os.path.abspath(path) for path in paths}
+    roots = [os.path.abspath(root) for root in roots]
+    modules = {name: module for name, module in list(sys.modules.items())
+               if name == module.__name__ != '__main__' and _under(_module_file(module), roots)}
+    deps = {name: _imports_from(module, modules.keys()) for name, module in modules.items()}
+
+    # Everything that depends, directly or not, on a changed module
+    stale = {name for name, module in modules.items() if _module_file(module) in paths}
+    grew = True
+    while grew:
+        dependents = {name for name, uses in deps.items() if uses & stale} - stale
+        stale |= dependents
+        grew = bool(dependents)
+
+    reloaded, done = [], set()
+
+    def visit(name, active=()):
+        if name in done or name in active:
+            return
+        for dep in sorted(deps[name] & stale):
+            visit(dep, active + (name,))
+        done.add(name)
+        reloaded.append(importlib.reload(modules[name]))
+
+    for name in sorted(stale):
+        visit(name)
+    return reloaded
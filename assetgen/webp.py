@@ -0,0 +1,136 @@
+"""Animated WebP writer.
+
+libwebp's animation encoder is only reachable through Pillow's
+``save_all``, which wants every frame at once, so this writer keeps the
+*distinct* frames as they arrive: identical consecutive frames are
+coalesced into one frame with a longer duration, the same way the GIF and
+APNG writers do it, and the encoder runs on :meth:`WebpWriter.close`.
+Memory is therefore one RGB frame per distinct frame rather than a couple
+of frames. libwebp does its own sub-frame rectangles and keyframe choice.
+
+Durations are kept in milliseconds, rounded on the running total.
+"""
+
+import io
+
+from PIL import ImageChops, features
+
+from .instrument import profiler
+
+
+def webp_available():
+    """True if Pillow was built with WebP animation support."""
+    return bool(features.check('webp'))
+
+
+class WebpWriter:
+    """Collect frames and write them as an animated WebP on close.
+
+    *lossless* selects VP8L; otherwise frames are VP8 at *quality*.
+    *method* trades encoder speed for size (0-6). With *fallback*, a lossy
+    animation that comes out larger than the lossless one is written
+    lossless instead; :attr:`lossless` then tells which was written.
+    *loop* is 0 to loop forever and None to play once, as for the GIF and
+    APNG writers.
+    """
+
+    def __init__(self, fp, size, duration, loop=0, lossless=True, quality=80, method=4, fallback=False):
+        self.fp = fp
+        self.size = tuple(size)
+        self.duration = duration
+        # The WebP loop count is the number of plays, 0 for forever
+        self.loop = 1 if loop is None else loop
+        self.lossless = lossless
+        self.quality = quality
+        self.method = method
+        self.fallback = fallback
+        self.frames_in = 0
+        self.frames = 0
+        self.bytes_written = 0
+        self._frames = []
+        self._durations = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, frame, duration=None):
+        """Queue *frame* to be shown for *duration* ms (may be fractional)."""
+        if frame.size != self.size:
+            raise ValueError(f"frame size {frame.size} does not match WebP size {self.size}")
+        if duration is None:
+            duration = self.duration
+        frame = frame.convert('RGB') if frame.mode != 'RGB' else frame
+        self.frames_in += 1
+        if self._frames:
+            with profiler.stage('encoding', 'diff'):
+                same = ImageChops.difference(self._frames[-1], frame).getbbox() is None
+            if same:
+                self._durations[-1] += duration
+                return
+        self._frames.append(frame)
+        self._durations.append(duration)
+        self.frames += 1
+
+    def summary(self):
+        """Return a one-line description of what the writer produced."""
+        kind = "lossless" if self.lossless else f"lossy q{self.quality}"
+        return (f"{self.frames_in} frames -> {self.frames} WebP frames ({kind}), "
+                f"{self.bytes_written / 1024:.0f} KB")
+
+    def _encode(self, first, rest, durations, lossless):
+        buf = io.BytesIO()
+        # minimize_size lets libwebp pick keyframes and sub-frame blending for
+        # the smallest file, at about the same encoding time here
+        first.save(buf, 'WEBP', save_all=True, append_images=rest, duration=durations,
+                   loop=self.loop, lossless=lossless, quality=self.quality, method=self.method,
+                   minimize_size=True)
+        return buf.getvalue()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if not self._frames:
+            return
+        # Millisecond durations rounded on the running total
+        durations, elapsed = [], 0.0
+        for duration in self._durations:
+            durations.append(round(elapsed + duration) - round(elapsed))
+            elapsed += duration
+        # Pillow keeps the save options on the image itself, and frames may
+        # be shared with another writer saving on another thread
+        first, rest = self._frames[0].copy(), self._frames[1:]
+        own_fp = isinstance(self.fp, (str, bytes)) or hasattr(self.fp, '__fspath__')
+        with profiler.stage('encoding', 'webp'):
+            data = self._encode(first, rest, durations, self.lossless)
+            if self.fallback and not self.lossless:
+                lossless = self._encode(first, rest, durations, True)
+                if len(lossless) < len(data):
+                    data, self.lossless = lossless, True
+        fp = open(self.fp, 'wb') if own_fp else self.fp
+        try:
+            fp.write(data)
+            self.bytes_written = len(data)
+        finally:
+            if own_fp:
+                fp.close()
+        self._frames = []
+
+
+def write_webp(fp, frames, duration, loop=0, lossless=True, quality=80, method=4, fallback=False):
+    """Write *frames* (any iterable of images) as an animated WebP.
+
+    Returns the finished :class:`WebpWriter` for its frame and byte counts.
+    """
+    frames = iter(frames)
+    first = next(frames)
+    with WebpWriter(fp, first.size, duration, loop=loop, lossless=lossless,
+                    quality=quality, method=method, fallback=fallback) as webp:
+        webp.add(first)
+        for frame in frames:
+            webp.add(frame)
+    return webp
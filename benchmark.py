@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Benchmark the SpamAnvil asset renderers against a stored baseline.
+
+Every case runs in its own subprocess, so its peak RSS is its own and its
+caches start cold. Each repeat clears the rendering caches first, so the
+timings are for a cold render, not a cache hit.
+
+    python3 benchmark.py                 # run everything, compare to baseline
+    python3 benchmark.py banner promo    # only cases whose name contains these
+    python3 benchmark.py --save          # record the results as the baseline
+
+The committed benchmark-baseline.json was recorded on a one-CPU Linux
+machine rendering with the DejaVu fonts. Output bytes compare anywhere the
+fonts match, but timings and peak RSS only compare on the machine that
+recorded them. So CI records its own baseline: a job on the main branch
+runs ``benchmark.py --save -b main-baseline.json`` and keeps the file as
+an artifact, and pull request jobs fetch it and run ``benchmark.py -b
+main-baseline.json``, failing on a regression. Re-record the committed
+baseline with ``--save`` when a change makes an asset intentionally
+slower or larger.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+
+from PIL import Image
+
+import assetgen.plates
+import assetgen.sprites
+from assetgen.animation import available_formats, encode_animation
+from assetgen.gif import write_gif
+from assetgen.gradients import gradient
+from assetgen.memory import peak_rss
+from assetgen.palette import sample_palette
+from assetgen.plates import apply_glow
+from create_assets import (BG_DARK, BG_MID, BLUE, animated_banner_palette, create_animated_banner,
+                           create_banner, create_banners, create_icon, create_icons, write_banner_tiled)
+from create_promo_gif import FPS, PROMO_COLORS, TOTAL_FRAMES, generate_frame, promo_frames
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-baseline.json")
+
+# Metrics compared against the baseline; all of them are "lower is better"
+REGRESSION_METRICS = ('seconds', 'bytes', 'peak_rss')
+
+# Timings of a few milliseconds jitter by more than any threshold; a case
+# must also be this much slower to count as a regression
+MIN_SECONDS_REGRESSION = 0.01
+
+
+# =============================================================================
+# CASES
+# =============================================================================
+def png_bytes(img):
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getbuffer().nbytes
+
+
+def case_gradient(scale):
+    img = gradient((772 * scale, 250 * scale), (BG_DARK, BG_MID))
+    return 1, None, img
+
+
+def case_glow(scale):
+    img = Image.new('RGB', (772 * scale, 250 * scale), BG_DARK)
+    apply_glow(img, 131 * scale, 125 * scale, 225 * scale, BLUE, 0.15, cap=60)
+    return 1, None, img
+
+
+def case_icon(scale):
+    return 1, None, create_icon(128 * scale)
+
+
+def case_banner(scale):
+    return 1, None, create_banner(772 * scale)
+
+
+def case_banner_tiled(scale):
+    buf = io.BytesIO()
+    png = write_banner_tiled(buf, 772 * scale)
+    return 1, png.bytes_written, None
+
+
+def case_animated_banner_frames(scale):
+    frames, _ = create_animated_banner(772 * scale, 250 * scale)
+    count = sum(1 for _ in frames)
+    return count, None, None
+
+
+def case_promo_frames():
+    for f in range(TOTAL_FRAMES):
+        generate_frame(f)
+    return TOTAL_FRAMES, None, None
+
+
+def case_icons_pipeline():
+    icons = create_icons()
+    return 1, sum(png_bytes(img) for img in icons.values()), None
+
+
+def case_banners_pipeline():
+    banners = create_banners()
+    return 1, sum(png_bytes(img) for img in banners.values()), None
+
+
+def case_animated_banner_gif(scale):
+    width, height = 772 * scale, 250 * scale
+    palette = animated_banner_palette(width, height)
+    frames, duration = create_animated_banner(width, height)
+    buf = io.BytesIO()
+    gif = write_gif(buf, frames, duration, palette=palette)
+    return gif.frames_in, buf.getbuffer().nbytes, None
+
+
+def case_animated_banner_formats(scale):
+    width, height = 772 * scale, 250 * scale
+    palette = animated_banner_palette(width, height)
+    frames, duration = create_animated_banner(width, height)
+    outputs = {fmt: io.BytesIO() for fmt in available_formats()}
+    results = encode_animation(frames, duration, outputs, palette=palette)
+    return results['gif'][0].frames_in, sum(buf.getbuffer().nbytes for buf in outputs.values()), None
+
+
+def case_promo_gif():
+    palette = sample_palette(generate_frame, TOTAL_FRAMES, PROMO_COLORS)
+    buf = io.BytesIO()
+    gif = write_gif(buf, promo_frames(), 1000 / FPS, palette=palette)
+    return gif.frames_in, buf.getbuffer().nbytes, None
+
+
+# name -> function returning (frames, output bytes, image)
+CASES = {
+    'gradient-1x': partial(case_gradient, 1),
+    'gradient-2x': partial(case_gradient, 2),
+    'glow-1x': partial(case_glow, 1),
+    'glow-2x': partial(case_glow, 2),
+    'icon-1x': partial(case_icon, 1),
+    'icon-2x': partial(case_icon, 2),
+    'banner-1x': partial(case_banner, 1),
+    'banner-2x': partial(case_banner, 2),
+    'banner-tiled-4x': partial(case_banner_tiled, 4),
+    'animated-banner-frames-1x': partial(case_animated_banner_frames, 1),
+    'animated-banner-frames-2x': partial(case_animated_banner_frames, 2),
+    'promo-frames-1x': case_promo_frames,
+    'icons-pipeline': case_icons_pipeline,
+    'banners-pipeline': case_banners_pipeline,
+    'animated-banner-gif-1x': partial(case_animated_banner_gif, 1),
+    'animated-banner-gif-2x': partial(case_animated_banner_gif, 2),
+    'animated-banner-formats-1x': partial(case_animated_banner_formats, 1),
+    'promo-gif-1x': case_promo_gif,
+}
+
+
+def clear_caches():
+    """Empty every rendering cache, so the next repeat renders cold."""
+    modules = [m for name, m in sys.modules.items()
+               if name.startswith('assetgen.') or name in ('create_assets', 'create_promo_gif')]
+    for module in modules:
+        for obj in list(vars(module).values()):
+            if hasattr(obj, 'cache_clear'):
+                obj.cache_clear()
+            elif isinstance(obj, (assetgen.plates.PlateCache, assetgen.sprites.SpriteCache)):
+                obj.clear()
+
+
+def run_case(name, repeat):
+    """Run one case *repeat* times in this process and return its metrics.
+
+    Everything a case uses is imported with this module, so no repeat
+    pays for imports.
+    """
+    fn = CASES[name]
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            clear_caches()
+            start = time.perf_counter()
+            frames, nbytes, img = fn()
+            times.append(time.perf_counter() - start)
+    if nbytes is None and img is not None:
+        nbytes = png_bytes(img)
+    best = min(times)
+    return {
+        'seconds': round(best, 4),
+        'median': round(statistics.median(times), 4),
+        'frames': frames,
+        'fps': round(frames / best, 1) if best else None,
+        'bytes': nbytes,
+        'peak_rss': peak_rss(),
+    }
+
+
+def run_isolated(name, repeat):
+    """Run one case in a fresh interpreter; returns its metrics."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--case', name, '--repeat', str(repeat)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark case {name} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+def regressions(name, result, baseline, threshold):
+    """Return the metrics of *result* that exceed *baseline* by more than *threshold*."""
+    found = []
+    for metric in REGRESSION_METRICS:
+        old, new = baseline.get(metric), result.get(metric)
+        if metric == 'seconds' and new is not None and old and new - old < MIN_SECONDS_REGRESSION:
+            continue
+        if old and new is not None and new > old * (1 + threshold):
+            found.append(f"{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return found
+
+
+def format_row(name, result, baseline):
+    def change(metric):
+        old = baseline.get(metric) if baseline else None
+        if not old or result.get(metric) is None:
+            return ""
+        return f" ({(result[metric] / old - 1) * 100:+.0f}%)"
+
+    fps = f"{result['fps']:.1f} fps" if result['frames'] > 1 else ""
+    size = f"{result['bytes'] / 1024:.0f} KB" if result['bytes'] else ""
+    peak = f"{result['peak_rss'] / (1024 * 1024):.0f} MB" if result['peak_rss'] else "n/a"
+    return (f"  {name:<28} {result['seconds'] * 1000:9.1f} ms{change('seconds'):<7} "
+            f"{fps:>11} {size:>7}{change('bytes'):<7} {peak:>6}{change('peak_rss')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SpamAnvil asset renderers.")
+    parser.add_argument('patterns', nargs='*', help="only run cases whose name contains one of these")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument('-b', '--baseline', default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument('-s', '--save', action='store_true', help="save the results as the new baseline")
+    parser.add_argument(
+        '-t', '--threshold', type=float, default=0.2,
+        help="fail when a metric exceeds its baseline by more than this fraction (default 0.2)",
+    )
+    parser.add_argument('-l', '--list', action='store_true', help="list the cases and exit")
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.repeat)))
+        return 0
+
+    names = [n for n in CASES if not args.patterns or any(p in n for p in args.patterns)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    try:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+    except (OSError, ValueError):
+        baseline = {}
+
+    print(f"Benchmarking {len(names)} cases ({args.repeat} runs each)...")
+    results, failures = {}, []
+    for name in names:
+        result = results[name] = run_isolated(name, args.repeat)
+        print(format_row(name, result, baseline.get(name)))
+        if name in baseline:
+            failures += regressions(name, result, baseline[name], args.threshold)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as fp:
+            json.dump(baseline, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    if failures and not args.save:
+        print(f"\n{len(failures)} regression(s) past {args.threshold:.0%}:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Check the SpamAnvil renderers against stored golden frames.
+
+Renders the icons, the static banners and every frame of the animated
+banner and the promo, and compares each image with its golden copy. A
+frame that differs past the tolerances fails the run and gets a heatmap of
+its differences in the diff directory.
+
+    python3 check_golden.py --update        # record the current output as golden
+    python3 check_golden.py                 # check everything
+    python3 check_golden.py promo -F 0-23   # only some cases and frames
+    python3 check_golden.py -t 2 -m 0.001   # allow small antialiasing drift
+
+Golden frames depend on the fonts found on the machine, so record them
+where they will be checked; the run warns when fonts or Pillow changed
+since they were recorded.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+
+import PIL
+from PIL import Image
+
+from assetgen.imagediff import compare, heatmap
+from assetgen.manifest import fonts_digest
+from create_assets import BANNER_FRAMES
+from create_promo_gif import TOTAL_FRAMES as PROMO_FRAMES
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+META_NAME = "golden.json"
+
+
+# =============================================================================
+# CASES
+# =============================================================================
+def case_icon(size, frames, jobs):
+    from create_assets import create_icon
+    yield 0, create_icon(size)
+
+
+def case_banner(width, frames, jobs):
+    from create_assets import create_banner
+    yield 0, create_banner(width)
+
+
+def case_animated_banner(width, frames, jobs):
+    from create_assets import create_animated_banner, render_banner_frame
+    height = width * 250 // 772
+    if frames is not None:
+        for f in frames:
+            yield f, render_banner_frame(width, height, f)
+        return
+    images, _ = create_animated_banner(width, height, jobs=jobs)
+    yield from enumerate(images)
+
+
+def case_promo(_, frames, jobs):
+    from create_promo_gif import generate_frame, promo_frames
+    if frames is not None:
+        for f in frames:
+            yield f, generate_frame(f)
+        return
+    yield from enumerate(promo_frames(jobs=jobs))
+
+
+# name -> (function, argument, frame count or None for a still); functions
+# yield (frame index, image) and, for animations, render only the requested
+# frames when given a list of them
+CASES = {
+    'icon-256': (case_icon, 256, None),
+    'icon-128': (case_icon, 128, None),
+    'banner-772x250': (case_banner, 772, None),
+    'banner-1544x500': (case_banner, 1544, None),
+    'animated-banner': (case_animated_banner, 772, BANNER_FRAMES),
+    'promo': (case_promo, None, PROMO_FRAMES),
+}
+
+
+def parse_frames(spec):
+    """Parse ``"0,5,10-20"`` into a sorted list of frame indices."""
+    frames = set()
+    for part in spec.split(','):
+        first, _, last = part.partition('-')
+        try:
+            first, last = int(first), int(last or first)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad frame range {part!r}") from None
+        if last < first:
+            raise argparse.ArgumentTypeError(
+                f"empty frame range {part!r}: the end must not come before the start")
+        frames.update(range(first, last + 1))
+    return sorted(frames)
+
+
+def check_frames(frames, count):
+    """Raise ValueError unless every index in *frames* is one of *count* frames."""
+    out_of_range = [f for f in frames if not 0 <= f < count]
+    if out_of_range:
+        shown = ", ".join(map(str, out_of_range[:5])) + (", ..." if len(out_of_range) > 5 else "")
+        raise ValueError(f"frames out of range 0-{count - 1}: {shown}")
+
+
+def golden_path(directory, case, f):
+    return os.path.join(directory, case, f"{f:03d}.png")
+
+
+# =============================================================================
+# CHECK / UPDATE
+# =============================================================================
+def record(name, images, directory):
+    """Store *images* as the golden frames of case *name*; returns the count."""
+    os.makedirs(os.path.join(directory, name), exist_ok=True)
+    count = 0
+    for f, img in images:
+        img.save(golden_path(directory, name, f), "PNG", compress_level=1)
+        count += 1
+    return count
+
+
+def check(name, images, directory, diff_dir, args):
+    """Compare *images* with the golden frames of case *name*; returns ``(count, failures)``."""
+    count, failures = 0, []
+    for f, img in images:
+        count += 1
+        path = golden_path(directory, name, f)
+        if not os.path.exists(path):
+            failures.append(f"{name} frame {f}: no golden frame (record it with --update)")
+            continue
+        with Image.open(path) as golden:
+            golden.load()
+        if golden.size != img.size:
+            failures.append(f"{name} frame {f}: size {img.size}, golden {golden.size}")
+            continue
+        result = compare(img, golden, tolerance=args.tolerance)
+        if result.max_diff and not result.passes(args.max_share, args.perceptual):
+            os.makedirs(diff_dir, exist_ok=True)
+            diff_path = os.path.join(diff_dir, f"{name}-{f:03d}.png")
+            heatmap(result, golden).save(diff_path)
+            failures.append(f"{name} frame {f}: {result.describe()} -> {diff_path}")
+    return count, failures
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, META_NAME)) as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def current_meta():
+    return {'fonts': fonts_digest(), 'pillow': PIL.__version__}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the SpamAnvil renderers against golden frames.")
+    parser.add_argument('patterns', nargs='*', help="only check cases whose name contains one of these")
+    parser.add_argument('-u', '--update', action='store_true', help="record the rendered frames as golden")
+    parser.add_argument('-F', '--frames', type=parse_frames, help="only these frames, e.g. 0,5,10-20")
+    parser.add_argument(
+        '-t', '--tolerance', type=int, default=0,
+        help="per-pixel channel difference that still counts as equal (default 0)",
+    )
+    parser.add_argument(
+        '-m', '--max-share', type=float, default=0.0,
+        help="fraction of pixels allowed over the tolerance (default 0)",
+    )
+    parser.add_argument(
+        '-P', '--perceptual', type=int,
+        help="largest allowed luma difference after a 1px blur (default: not checked)",
+    )
+    parser.add_argument('-g', '--golden-dir', default=GOLDEN_DIR, help="golden frame directory")
+    parser.add_argument('-d', '--diff-dir', help="heatmap directory (default: GOLDEN_DIR/diff)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="render animations across N processes")
+    parser.add_argument('-l', '--list', action='store_true', help="list the cases and exit")
+    args = parser.parse_args()
+
+    names = [n for n in CASES if not args.patterns or any(p in n for p in args.patterns)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if args.frames is not None:
+        # Stills have one frame and ignore --frames; check the animations
+        # before rendering anything
+        for name in names:
+            count = CASES[name][2]
+            try:
+                if count is not None:
+                    check_frames(args.frames, count)
+            except ValueError as e:
+                parser.error(f"{name}: {e}")
+    diff_dir = args.diff_dir or os.path.join(args.golden_dir, "diff")
+
+    if args.update:
+        os.makedirs(args.golden_dir, exist_ok=True)
+        with open(os.path.join(args.golden_dir, META_NAME), 'w') as fp:
+            json.dump(current_meta(), fp, indent=2, sort_keys=True)
+            fp.write("\n")
+    else:
+        meta = read_meta(args.golden_dir)
+        for key, value in current_meta().items():
+            if meta.get(key) not in (None, value):
+                print(f"warning: {key} changed since the golden frames were recorded")
+        shutil.rmtree(diff_dir, ignore_errors=True)
+
+    failures = []
+    for name in names:
+        fn, arg, _ = CASES[name]
+        start = time.perf_counter()
+        # The renderers report progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            images = fn(arg, args.frames, args.jobs)
+            if args.update:
+                count, failed = record(name, images, args.golden_dir), []
+            else:
+                count, failed = check(name, images, args.golden_dir, diff_dir, args)
+        status = "recorded" if args.update else f"{count - len(failed)} ok, {len(failed)} failed"
+        print(f"  {name:<18} {count:4d} frames  {status:<20} {time.perf_counter() - start:6.2f} s")
+        failures += failed
+
+    if failures:
+        print(f"\n{len(failures)} frame(s) differ from golden:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
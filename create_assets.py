@@ -1,13 +1,43 @@
 #!/usr/bin/env python3
 """Generate SpamAnvil WordPress.org assets: icon + banner (static & animated)."""
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from functools import lru_cache, partial
+import argparse
+import contextlib
+import importlib
+import io
 import math
 import os
+import sys
+import time
+import traceback
+
+import assetgen.fonts
+import assetgen.gradients
+import assetgen.plates
+import assetgen.png
+import assetgen.pngopt
+import create_promo_gif
+from assetgen.animation import animation_bytes, available_formats, comparison, encode_animation, output_names
+from assetgen.fonts import get_font, text_bbox, text_layout
+from assetgen.graph import Task, critical_path, run_graph
+from assetgen.instrument import profiler
+from assetgen.manifest import Manifest, code_deps, fingerprint
+from assetgen.memory import format_peak_rss
+from assetgen.palette import sample_palette
+from assetgen.parallel import render_selected, resolve_jobs
+from assetgen.plates import PlateCache, background_plate, quantize_intensity
+from assetgen.png import write_png
+from assetgen.pngopt import optimize_png
+from assetgen.scene import Dot, Glow, Gradient, Grid, Line, Pill, PillRow, Rect, Scene, Shape, Text
+from assetgen.sprites import rasterize, sprites, text_sprite
+from assetgen.strings import DEFAULT_LOCALE, Strings, available_locales, load_strings
+from assetgen.timeline import Layer, Timeline, Track, ease_out
+from assetgen.watch import Watcher, reload_modules
 
 BASE_DIR = "/Users/alexandreamato/Amato Dropbox/Alexandre Amato/Projects/Informatica/Software/llm_anti_spam"
 ASSETS_DIR = os.path.join(BASE_DIR, "svn-spamanvil", "assets")
-os.makedirs(ASSETS_DIR, exist_ok=True)
 
 # Colors
 BG_DARK = (18, 20, 36)
@@ -25,43 +55,35 @@ ORANGE = (255, 160, 40)
 RED = (220, 60, 70)
 CYAN = (0, 190, 210)
 PURPLE = (140, 80, 240)
+SPARK_YELLOW = (255, 200, 60)
 
+# Sparks around the anvil: offset from its centre, size, color (at scale 1)
+BANNER_SPARKS = (
+    (-30, -50, 8, ORANGE),
+    (50, -55, 6, BLUE),
+    (-10, -65, 10, SPARK_YELLOW),
+    (30, -40, 5, CYAN),
+)
 
-def get_font(size, bold=False):
-    font_paths = [
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/System/Library/Fonts/SFNSDisplay.ttf",
-        "/Library/Fonts/Arial Bold.ttf" if bold else "/Library/Fonts/Arial.ttf",
-    ]
-    for path in font_paths:
-        if os.path.exists(path):
-            try:
-                return ImageFont.truetype(path, size, index=1 if bold and path.endswith('.ttc') else 0)
-            except Exception:
-                try:
-                    return ImageFont.truetype(path, size)
-                except Exception:
-                    continue
-    return ImageFont.load_default()
-
-
-def draw_gradient(draw, width, height, color_top, color_bottom):
-    for y in range(height):
-        r = int(color_top[0] + (color_bottom[0] - color_top[0]) * y / height)
-        g = int(color_top[1] + (color_bottom[1] - color_top[1]) * y / height)
-        b = int(color_top[2] + (color_bottom[2] - color_top[2]) * y / height)
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-
-def draw_radial_glow(img, cx, cy, radius, color, intensity=0.3):
-    """Draw a subtle radial glow effect."""
-    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    od = ImageDraw.Draw(overlay)
-    for r in range(radius, 0, -2):
-        alpha = int(intensity * 255 * (1 - r / radius) ** 2)
-        alpha = min(alpha, 80)
-        od.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(*color, alpha))
-    img.paste(Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB'), (0, 0))
+# Banner text in English; locales/<locale>.json translates it per locale
+BANNER_STRINGS = {
+    'subtitle': "AI-Powered Anti-Spam for WordPress",
+    'free_models': "Free Models",
+    'free_badge': "100% FREE",
+    'no_subscription': "No subscription. Bring your own API key.",
+    'cta_subtitle': "Free AI Anti-Spam for WordPress",
+}
+ENGLISH = Strings(DEFAULT_LOCALE, BANNER_STRINGS)
+
+
+def banner_strings(locale=DEFAULT_LOCALE):
+    """Return the banner strings for *locale*."""
+    return load_strings(locale, 'banner', BANNER_STRINGS)
+
+
+# Output sizes of the static assets; each scene renders all of them at once
+ICON_SIZES = (256, 128)
+BANNER_WIDTHS = (772, 1544)
 
 
 def draw_anvil(draw, cx, cy, size, steel=STEEL, dark=STEEL_DARK, light=STEEL_LIGHT):
@@ -148,24 +170,104 @@ def draw_spark(draw, cx, cy, size, color=ORANGE):
     draw.polygon(points, fill=color)
 
 
+# =============================================================================
+# SPRITES
+# =============================================================================
+def anvil_sprite(size, supersample=1):
+    """Return the cached anvil sprite, anchored at the anvil's centre."""
+    return sprites.get(('anvil', size, supersample), lambda: rasterize(
+        lambda draw, x, y, k: draw_anvil(draw, x, y, size * k),
+        (-2 * size - 4, -size - 4, size + 4, size + 4), supersample,
+    ))
+
+
+def spark_sprite(size, color, supersample=1):
+    """Return the cached spark sprite, anchored at the spark's centre."""
+    return sprites.get(('spark', size, color, supersample), lambda: rasterize(
+        lambda draw, x, y, k: draw_spark(draw, x, y, size * k, color),
+        (-size - 2, -size - 2, size + 2, size + 2), supersample,
+    ))
+
+
+def pill_size(label, font, scale):
+    """Return the ``(width, height)`` of a feature pill, from its top-left to its bottom-right corner."""
+    bbox = text_layout(label, font).bbox
+    return bbox[2] - bbox[0] + int(16 * scale), bbox[3] - bbox[1] + int(10 * scale)
+
+
+def pill_sprite(label, color, font, scale):
+    """Return the cached feature pill sprite, anchored at its top-left corner."""
+    def build():
+        pw, ph = pill_size(label, font, scale)
+        # Dark fill blended with color (no alpha on RGB)
+        pill_fill = (color[0] // 5, color[1] // 5, color[2] // 5)
+
+        def paint(draw, x, y, k):
+            draw.rounded_rectangle([x, y, x + pw, y + ph], radius=int(4 * scale),
+                                   fill=pill_fill, outline=color, width=1)
+            draw.text((x + int(8 * scale), y + int(4 * scale)), label, font=font, fill=WHITE)
+
+        return rasterize(paint, (0, 0, pw + 1, ph + 1))
+
+    return sprites.get(('pill', label, color, font, scale), build)
+
+
+def badge_size(text, font, scale):
+    """Return the ``(width, height)`` of the badge, from its top-left to its bottom-right corner."""
+    bbox = text_layout(text, font).bbox
+    return bbox[2] - bbox[0] + int(16 * scale), bbox[3] - bbox[1] + int(8 * scale)
+
+
+def badge_sprite(text, font, scale):
+    """Return the cached "100% FREE" badge sprite, anchored at its top-left corner."""
+    def build():
+        badge_w, badge_h = badge_size(text, font, scale)
+
+        def paint(draw, x, y, k):
+            draw.rounded_rectangle([x, y, x + badge_w, y + badge_h], radius=int(3 * scale), fill=GREEN)
+            draw.text((x + int(8 * scale), y + int(3 * scale)), text, font=font, fill=BG_DARK)
+
+        return rasterize(paint, (0, 0, badge_w + 1, badge_h + 1))
+
+    return sprites.get(('badge', text, font, scale), build)
+
+
+def button_sprite(text, font, scale):
+    """Return the cached CTA button sprite, anchored at the label's text origin."""
+    def build():
+        layout = text_layout(text, font)
+        pad = int(10 * scale)
+
+        def paint(draw, x, y, k):
+            draw.rounded_rectangle(
+                [x - pad * 2, y - pad, x + layout.width + pad * 2, y + layout.height + pad],
+                radius=int(6 * scale), fill=BLUE
+            )
+            draw.text((x, y), text, font=font, fill=WHITE)
+
+        return rasterize(paint, (-pad * 2, -pad, layout.width + pad * 2 + 1, layout.bbox[3] + pad + 1))
+
+    return sprites.get(('button', text, font, scale), build)
+
+
 # =============================================================================
 # ICON
 # =============================================================================
-def create_icon(size):
-    """Create the plugin icon at given size."""
-    img = Image.new('RGB', (size, size), BG_DARK)
-    draw = ImageDraw.Draw(img)
+@lru_cache(maxsize=None)
+def icon_scene():
+    """Lay out the plugin icon in a 256x256 design space."""
+    size = 256
+    scene = Scene(size, size)
 
     # Gradient background
-    draw_gradient(draw, size, size, BG_DARK, BG_MID)
+    scene.add(Gradient((BG_DARK, BG_MID)))
 
     # Subtle radial glow behind anvil
-    draw_radial_glow(img, size // 2, size // 2, size // 2, BLUE, intensity=0.2)
-    draw = ImageDraw.Draw(img)
+    scene.add(Glow(size // 2, size // 2, size // 2, BLUE, intensity=0.2))
 
     # Anvil centered
     anvil_size = size // 4
-    draw_anvil(draw, size // 2 + anvil_size // 6, size * 9 // 16, anvil_size)
+    scene.add(Shape(draw_anvil, size // 2 + anvil_size // 6, size * 9 // 16, anvil_size))
 
     # Sparks above anvil (impact effect)
     spark_positions = [
@@ -175,449 +277,742 @@ def create_icon(size):
         (size // 2 + size // 8, size * 2 // 5, size // 22, (*CYAN,)),
     ]
     for sx, sy, ss, sc in spark_positions:
-        draw_spark(draw, sx, sy, ss, sc)
+        scene.add(Shape(draw_spark, sx, sy, ss, sc))
 
     # Subtle border ring
     border_pad = size // 32
-    draw.rounded_rectangle(
-        [border_pad, border_pad, size - border_pad, size - border_pad],
-        radius=size // 8, outline=(*BLUE, 80), width=2
-    )
+    scene.add(Rect([border_pad, border_pad, size - border_pad, size - border_pad],
+                   radius=size // 8, outline=(*BLUE, 80), width=2))
 
     # "SA" text above anvil (small, subtle)
-    font_sa = get_font(size // 5, bold=True)
-    text = "SA"
-    bbox = draw.textbbox((0, 0), text, font=font_sa)
-    tw = bbox[2] - bbox[0]
-    draw.text(((size - tw) // 2, size // 10), text, font=font_sa, fill=WHITE)
+    scene.add(Text(size // 2, size // 10, "SA", size // 5, WHITE, bold=True, align='center'))
+
+    return scene
 
-    return img
+
+def create_icons(sizes=ICON_SIZES):
+    """Render the icon at every size in *sizes* in one pass; returns ``{size: image}``."""
+    return icon_scene().render_sizes(sizes)
+
+
+def create_icon(size):
+    """Create the plugin icon at given size."""
+    return create_icons((size,))[size]
 
 
 # =============================================================================
 # STATIC BANNER
 # =============================================================================
-def create_banner(width, height):
-    """Create the static plugin banner."""
-    img = Image.new('RGBA', (width, height), (*BG_DARK, 255))
-    draw = ImageDraw.Draw(img)
+@lru_cache(maxsize=None)
+def banner_scene(strings=ENGLISH):
+    """Lay out the static plugin banner in a 772x250 design space, in *strings*' language."""
+    width, height = 772, 250
+    scene = Scene(width, height)
 
     # Gradient background
-    draw_gradient(draw, width, height, BG_DARK, BG_MID)
+    scene.add(Gradient((BG_DARK, BG_MID), mode='RGBA'))
 
     # Subtle grid pattern (very faint via alpha compositing)
-    grid = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    gd = ImageDraw.Draw(grid)
-    grid_color = (255, 255, 255, 10)
-    for gx in range(0, width, 60):
-        gd.line([(gx, 0), (gx, height)], fill=grid_color, width=1)
-    for gy in range(0, height, 60):
-        gd.line([(0, gy), (width, gy)], fill=grid_color, width=1)
-    img = Image.alpha_composite(img, grid)
+    scene.add(Grid(60, (255, 255, 255, 10)))
 
     # Radial glow behind anvil area
-    glow = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    cx_glow, cy_glow = int(width * 0.17), height // 2
-    radius = int(height * 0.9)
-    gd2 = ImageDraw.Draw(glow)
-    for r in range(radius, 0, -3):
-        alpha = int(0.15 * 255 * (1 - r / radius) ** 2)
-        alpha = min(alpha, 60)
-        gd2.ellipse([cx_glow - r, cy_glow - r, cx_glow + r, cy_glow + r], fill=(*BLUE, alpha))
-    img = Image.alpha_composite(img, glow)
-    draw = ImageDraw.Draw(img)
-
-    # Scale fonts relative to banner height
-    scale = height / 250
-    font_title = get_font(int(48 * scale), bold=True)
-    font_sub = get_font(int(18 * scale))
-    font_feat = get_font(int(14 * scale), bold=True)
-    font_small = get_font(int(12 * scale))
-    font_badge = get_font(int(13 * scale), bold=True)
+    scene.add(Glow(width * 0.17, height // 2, height * 0.9, BLUE, 0.15, cap=60, rings=3))
 
-    # Anvil on the left
-    anvil_size = int(40 * scale)
-    anvil_cx = int(width * 0.17)
-    anvil_cy = int(height * 0.52)
-    draw_anvil(draw, anvil_cx, anvil_cy, anvil_size)
-
-    # Sparks around anvil
-    sparks = [
-        (anvil_cx - int(30 * scale), anvil_cy - int(50 * scale), int(8 * scale), ORANGE),
-        (anvil_cx + int(50 * scale), anvil_cy - int(55 * scale), int(6 * scale), BLUE),
-        (anvil_cx - int(10 * scale), anvil_cy - int(65 * scale), int(10 * scale), (255, 200, 60)),
-        (anvil_cx + int(30 * scale), anvil_cy - int(40 * scale), int(5 * scale), CYAN),
-    ]
-    for sx, sy, ss, sc in sparks:
-        draw_spark(draw, sx, sy, ss, sc)
+    # Anvil on the left, sparks around it
+    anvil_cx = width * 0.17
+    anvil_cy = height * 0.52
+    scene.add(Shape(draw_anvil, anvil_cx, anvil_cy, 40))
+    for dx, dy, ss, sc in BANNER_SPARKS:
+        scene.add(Shape(draw_spark, anvil_cx + dx, anvil_cy + dy, ss, sc))
+
+    # Everything above is the same in every language
+    scene.mark_shared()
 
     # Title text
-    text_x = int(width * 0.32)
-    draw.text((text_x, int(30 * scale)), "SpamAnvil", font=font_title, fill=WHITE)
+    text_x = width * 0.32
+    title = scene.add(Text(text_x, 30, "SpamAnvil", 48, WHITE, bold=True))
 
     # Accent line under title
-    title_bbox = draw.textbbox((text_x, int(30 * scale)), "SpamAnvil", font=font_title)
-    line_y = title_bbox[3] + int(6 * scale)
-    draw.line(
-        [(text_x, line_y), (text_x + int(280 * scale), line_y)],
-        fill=BLUE, width=max(1, int(2 * scale))
-    )
+    line_y = 30 + title.layout().bbox[3] + 6
+    scene.add(Line([(text_x, line_y), (text_x + 280, line_y)], BLUE, width=2))
 
     # Subtitle
-    draw.text(
-        (text_x, line_y + int(10 * scale)),
-        "AI-Powered Anti-Spam for WordPress",
-        font=font_sub, fill=LIGHT_GRAY
-    )
+    scene.add(Text(text_x, line_y + 10, strings['subtitle'], 18, LIGHT_GRAY))
 
-    # Feature pills with proper alpha compositing
+    # Feature pills with proper alpha compositing, sized from their text at
+    # each scale
     features = [
         ("ChatGPT", BLUE),
         ("Claude", PURPLE),
         ("Gemini", CYAN),
-        ("Free Models", GREEN),
+        (strings['free_models'], GREEN),
     ]
-    pill_y = line_y + int(38 * scale)
-    pill_x = text_x
-    for label, color in features:
-        bbox = draw.textbbox((0, 0), label, font=font_feat)
-        pw = bbox[2] - bbox[0] + int(16 * scale)
-        ph = bbox[3] - bbox[1] + int(10 * scale)
-
-        # Pill background via overlay for proper alpha
-        pill_bg = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        pd = ImageDraw.Draw(pill_bg)
-        pd.rounded_rectangle(
-            [pill_x, pill_y, pill_x + pw, pill_y + ph],
-            radius=int(4 * scale),
-            fill=(*color, 50),
-        )
-        img = Image.alpha_composite(img, pill_bg)
-        draw = ImageDraw.Draw(img)
-
-        # Pill border
-        draw.rounded_rectangle(
-            [pill_x, pill_y, pill_x + pw, pill_y + ph],
-            radius=int(4 * scale),
-            outline=color,
-            width=1,
-        )
-        # Pill text (bright, full opacity)
-        draw.text(
-            (pill_x + int(8 * scale), pill_y + int(4 * scale)),
-            label, font=font_feat, fill=WHITE
-        )
-        pill_x += pw + int(10 * scale)
-
-    # "FREE" badge
-    badge_text = "100% FREE"
-    badge_bbox = draw.textbbox((0, 0), badge_text, font=font_badge)
-    badge_w = badge_bbox[2] - badge_bbox[0] + int(16 * scale)
-    badge_h = badge_bbox[3] - badge_bbox[1] + int(10 * scale)
-    badge_x = int(width * 0.32)
-    badge_y = pill_y + ph + int(14 * scale)
+    pills = scene.add(PillRow(text_x, line_y + 38, [
+        Pill(label, 14, WHITE, fill=(*color, 50), outline=color, bold=True, radius=4)
+        for label, color in features
+    ]))
 
-    draw.rounded_rectangle(
-        [badge_x, badge_y, badge_x + badge_w, badge_y + badge_h],
-        radius=int(3 * scale), fill=GREEN
-    )
-    draw.text(
-        (badge_x + int(8 * scale), badge_y + int(4 * scale)),
-        badge_text, font=font_badge, fill=BG_DARK
-    )
-
-    # "No subscription" text next to badge
-    draw.text(
-        (badge_x + badge_w + int(10 * scale), badge_y + int(4 * scale)),
-        "No subscription. Bring your own API key.",
-        font=font_small, fill=MID_GRAY
-    )
+    # "FREE" badge and the "No subscription" text next to it
+    scene.add(PillRow(text_x, 14, [
+        Pill(strings['free_badge'], 13, BG_DARK, fill=GREEN, bold=True, radius=3),
+        Pill(strings['no_subscription'], 12, MID_GRAY),
+    ], below=pills))
 
     # Decorative dots in bottom-right
     for i in range(5):
-        dx = width - int(40 * scale) - i * int(25 * scale)
-        dy = height - int(20 * scale)
-        r = int(3 * scale)
         c = [BLUE, PURPLE, CYAN, GREEN, ORANGE][i]
-        draw.ellipse([dx - r, dy - r, dx + r, dy + r], fill=c)
+        scene.add(Dot(width - 40 - i * 25, height - 20, 3, c))
+
+    return scene
+
+
+@lru_cache(maxsize=4)
+def banner_backdrop(widths):
+    """Render the banner's language-independent layers at each width; returns ``{width: image}``."""
+    return dict(zip(widths, banner_scene().render_shared([w / 772 for w in widths])))
+
+
+def create_banners(widths=BANNER_WIDTHS, strings=ENGLISH):
+    """Render the banner at every width in *widths* in one pass; returns ``{width: image}``.
+
+    The language-independent backdrop is rendered once per process and
+    the text of *strings* painted over a copy of it.
+    """
+    widths = tuple(widths)
+    return banner_scene(strings).render_sizes(widths, base=banner_backdrop(widths))
+
+
+def create_banner(width, height=None, strings=ENGLISH):
+    """Create the static plugin banner *width* pixels wide.
+
+    The banner keeps its 772x250 aspect ratio; *height*, if given, must be
+    the height that gives, or ValueError is raised.
+    """
+    expected = banner_scene(strings).size(width / 772)[1]
+    if height is not None and height != expected:
+        raise ValueError(f"a {width} px wide banner is {expected} px high, not {height}")
+    return create_banners((width,), strings)[width]
+
+
+def write_banner_tiled(path, width, tile_height=256, jobs=1, strings=ENGLISH):
+    """Render the static banner at *width* in tiles, streaming them into a PNG at *path*.
 
-    return img.convert('RGB')
+    Memory stays at a few tiles however large the banner; tiles render
+    across *jobs* processes. Returns the finished :class:`assetgen.png.PngWriter`.
+    """
+    scale = width / 772
+    scene = banner_scene(strings)
+    return write_png(path, scene.size(scale), scene.tiles(scale, tile_height, jobs=jobs))
 
 
 # =============================================================================
 # ANIMATED BANNER (GIF)
 # =============================================================================
-def create_animated_banner(width, height):
-    """Create animated GIF banner."""
-    FPS = 12
-    DURATION = 6  # seconds
-    TOTAL_FRAMES = FPS * DURATION
-    frames = []
+BANNER_FPS = 12
+BANNER_DURATION = 6  # seconds
+BANNER_FRAMES = BANNER_FPS * BANNER_DURATION
 
-    scale = height / 250
+# The animated banner's scenes by name: (start, end) in seconds
+BANNER_SCENES = {'title': (0, 2), 'features': (2, 4.5), 'cta': (4.5, 6)}
+
+# Very subtle grid color (barely visible against dark bg)
+GRID_COLOR = (26, 28, 46)
+
+# Flat colors the animated banner draws with; always in the GIF palette
+BANNER_COLORS = (
+    BG_DARK, BG_MID, GRID_COLOR, WHITE, LIGHT_GRAY, MID_GRAY,
+    STEEL, STEEL_DARK, STEEL_LIGHT, GREEN, BLUE, ORANGE, CYAN, PURPLE, SPARK_YELLOW,
+) + tuple((c[0] // 5, c[1] // 5, c[2] // 5) for c in (BLUE, PURPLE, CYAN, GREEN))
 
-    font_title = get_font(int(48 * scale), bold=True)
-    font_sub = get_font(int(18 * scale))
-    font_feat = get_font(int(14 * scale), bold=True)
-    font_small = get_font(int(12 * scale))
-    font_badge = get_font(int(13 * scale), bold=True)
-    font_big = get_font(int(56 * scale), bold=True)
 
-    def ease_out(t):
-        return 1 - (1 - min(1, max(0, t))) ** 3
+def banner_fonts(height):
+    """Return the animated banner fonts (loaded once via the font registry)."""
+    scale = height / 250
+    return (
+        get_font(int(48 * scale), bold=True),  # title
+        get_font(int(18 * scale)),  # sub
+        get_font(int(14 * scale), bold=True),  # feat
+        get_font(int(12 * scale)),  # small
+        get_font(int(13 * scale), bold=True),  # badge
+        get_font(int(56 * scale), bold=True),  # big
+    )
 
-    def ease_in_out(t):
-        t = min(1, max(0, t))
-        return 4 * t * t * t if t < 0.5 else 1 - pow(-2 * t + 2, 3) / 2
 
-    # Very subtle grid color (barely visible against dark bg)
-    GRID_COLOR = (26, 28, 46)
+@lru_cache(maxsize=4)
+def banner_timeline(width, height, strings=ENGLISH):
+    """Build the animated banner's timeline (once per size, language and process).
 
-    def draw_base(draw):
-        draw_gradient(draw, width, height, BG_DARK, BG_MID)
-        for gx in range(0, width, 60):
-            draw.line([(gx, 0), (gx, height)], fill=GRID_COLOR, width=1)
-        for gy in range(0, height, 60):
-            draw.line([(0, gy), (width, gy)], fill=GRID_COLOR, width=1)
+    Scene 1 (0-2s) drops the anvil and slides in the title, scene 2
+    (2-4.5s) adds the feature pills and badge, scene 3 (4.5-6s) is the CTA.
+    Tracks animate eased progress from 0 to 1; the painters map it to pixels.
+    """
+    scale = height / 250
+    font_title, font_sub, font_feat, font_small, font_badge, font_big = banner_fonts(height)
 
-    for f in range(TOTAL_FRAMES):
-        img = Image.new('RGB', (width, height), BG_DARK)
+    anvil_cx = int(width * 0.17)
+    anvil_cy = int(height * 0.52)
+    anvil_size = int(40 * scale)
+    text_x = int(width * 0.32)
+    title_y = int(30 * scale)
+    title_bbox = text_bbox((text_x, title_y), "SpamAnvil", font_title)
+    line_y = title_bbox[3] + int(6 * scale)
+    pill_y = line_y + int(38 * scale)
+
+    def paint_plate(img, cx, cy, radius, intensity):
+        # Gradient, grid and glow come from one cached plate per glow setting
+        return background_plate((width, height), (BG_DARK, BG_MID),
+                                grid=(60, GRID_COLOR), glow=(cx, cy, radius, BLUE, intensity))
+
+    def paint_anvil(img, drop):
+        anvil_sprite(anvil_size).paste(img, anvil_cx, anvil_cy + int((1 - drop) * -height * 0.6))
+        return img
+
+    def paint_burst(img, spread):
+        for dx, dy, ss, sc in BANNER_SPARKS:
+            sx = anvil_cx + int(dx * scale * (1 + spread * 0.5))
+            sy = anvil_cy + int(dy * scale * (1 + spread * 0.3))
+            spark_sprite(int(ss * scale * (1 + spread * 0.3)), sc).paste(img, sx, sy)
+        return img
+
+    def paint_sparks(img):
+        for dx, dy, ss, sc in BANNER_SPARKS:
+            spark_sprite(int(ss * scale), sc).paste(img, anvil_cx + int(dx * scale), anvil_cy + int(dy * scale))
+        return img
+
+    def paint_title(img, slide):
+        text_sprite("SpamAnvil", font_title, WHITE).paste(
+            img, text_x + int((1 - slide) * width * 0.3), title_y)
+        return img
+
+    def paint_accent(img, grow):
+        line_w = int(280 * scale * grow)
+        ImageDraw.Draw(img).line([(text_x, line_y), (text_x + line_w, line_y)], fill=BLUE, width=int(2 * scale))
+        return img
+
+    def paint_text(img, text, font, color, x, y):
+        text_sprite(text, font, color).paste(img, x, y)
+        return img
+
+    def paint_pill(img, label, color, x, slide):
+        pill_sprite(label, color, font_feat, scale).paste(img, x, pill_y + int((1 - slide) * 20 * scale))
+        return img
+
+    def paint_badge(img):
+        badge_x = int(width * 0.32)
+        badge_y = pill_y + ph + int(14 * scale)
+        badge_sprite(strings['free_badge'], font_badge, scale).paste(img, badge_x, badge_y)
+        badge_w = badge_size(strings['free_badge'], font_badge, scale)[0]
+        text_sprite(strings['no_subscription'], font_small, MID_GRAY).paste(
+            img, badge_x + badge_w + int(10 * scale), badge_y + int(3 * scale))
+        return img
+
+    def paint_button(img, text, x, y):
+        # Button-like background, anchored at the URL's text origin
+        button_sprite(text, font_feat, scale).paste(img, x, y)
+        return img
+
+    def paint_dots(img):
         draw = ImageDraw.Draw(img)
-        draw_base(draw)
-
-        t = f / TOTAL_FRAMES
-        sec = f / FPS
-
-        anvil_cx = int(width * 0.17)
-        anvil_cy = int(height * 0.52)
-        anvil_size = int(40 * scale)
-        text_x = int(width * 0.32)
-
-        # Scene 1: Anvil drops + title appears (0-2s)
-        if sec < 2.0:
-            # Anvil drops from above
-            drop_t = ease_out(sec / 0.6)
-            anvil_offset_y = int((1 - drop_t) * -height * 0.6)
-
-            draw_radial_glow(img, anvil_cx, anvil_cy, int(height * 0.9), BLUE, intensity=0.15 * drop_t)
-            draw = ImageDraw.Draw(img)
-
-            draw_anvil(draw, anvil_cx, anvil_cy + anvil_offset_y, anvil_size)
-
-            # Impact sparks after landing
-            if sec > 0.5:
-                spark_t = (sec - 0.5) / 0.5
-                if spark_t < 1.0:
-                    spark_spread = ease_out(spark_t)
-                    spark_alpha = 1 - spark_t
-                    spark_data = [
-                        (-30, -50, 8, ORANGE),
-                        (50, -55, 6, BLUE),
-                        (-10, -65, 10, (255, 200, 60)),
-                        (30, -40, 5, CYAN),
-                    ]
-                    for dx, dy, ss, sc in spark_data:
-                        sx = anvil_cx + int(dx * scale * (1 + spark_spread * 0.5))
-                        sy = anvil_cy + int(dy * scale * (1 + spark_spread * 0.3))
-                        if spark_alpha > 0.3:
-                            draw_spark(draw, sx, sy, int(ss * scale * (1 + spark_spread * 0.3)), sc)
-
-                # Keep sparks visible (static) after animation
-                if spark_t >= 1.0 or sec > 1.0:
-                    for dx, dy, ss, sc in [(-30, -50, 8, ORANGE), (50, -55, 6, BLUE),
-                                            (-10, -65, 10, (255, 200, 60)), (30, -40, 5, CYAN)]:
-                        draw_spark(draw, anvil_cx + int(dx * scale), anvil_cy + int(dy * scale),
-                                   int(ss * scale), sc)
-
-            # Title slides in from right
-            title_t = ease_out((sec - 0.3) / 0.6) if sec > 0.3 else 0
-            title_offset = int((1 - title_t) * width * 0.3)
-            draw.text((text_x + title_offset, int(30 * scale)), "SpamAnvil", font=font_title, fill=WHITE)
-
-            # Accent line
-            if sec > 0.6:
-                line_t = ease_out((sec - 0.6) / 0.4)
-                title_bbox = draw.textbbox((text_x, int(30 * scale)), "SpamAnvil", font=font_title)
-                line_y = title_bbox[3] + int(6 * scale)
-                line_w = int(280 * scale * line_t)
-                draw.line([(text_x, line_y), (text_x + line_w, line_y)], fill=BLUE, width=int(2 * scale))
-
-            # Subtitle
-            if sec > 0.9:
-                sub_t = ease_out((sec - 0.9) / 0.4)
-                title_bbox = draw.textbbox((text_x, int(30 * scale)), "SpamAnvil", font=font_title)
-                line_y = title_bbox[3] + int(6 * scale)
-                sub_alpha = int(255 * sub_t)
-                draw.text(
-                    (text_x, line_y + int(10 * scale)),
-                    "AI-Powered Anti-Spam for WordPress",
-                    font=font_sub, fill=(*LIGHT_GRAY[:3],)
-                )
-
-        # Scene 2: Features + badge (2-4.5s)
-        elif sec < 4.5:
-            local = sec - 2.0
-
-            # Static elements
-            draw_radial_glow(img, anvil_cx, anvil_cy, int(height * 0.9), BLUE, intensity=0.15)
-            draw = ImageDraw.Draw(img)
-            draw_anvil(draw, anvil_cx, anvil_cy, anvil_size)
-            for dx, dy, ss, sc in [(-30, -50, 8, ORANGE), (50, -55, 6, BLUE),
-                                    (-10, -65, 10, (255, 200, 60)), (30, -40, 5, CYAN)]:
-                draw_spark(draw, anvil_cx + int(dx * scale), anvil_cy + int(dy * scale),
-                           int(ss * scale), sc)
-
-            draw.text((text_x, int(30 * scale)), "SpamAnvil", font=font_title, fill=WHITE)
-            title_bbox = draw.textbbox((text_x, int(30 * scale)), "SpamAnvil", font=font_title)
-            line_y = title_bbox[3] + int(6 * scale)
-            draw.line([(text_x, line_y), (text_x + int(280 * scale), line_y)], fill=BLUE, width=int(2 * scale))
-            draw.text((text_x, line_y + int(10 * scale)), "AI-Powered Anti-Spam for WordPress",
-                       font=font_sub, fill=LIGHT_GRAY)
-
-            # Feature pills appear one by one
-            features = [
-                ("ChatGPT", BLUE, 0.0),
-                ("Claude", PURPLE, 0.3),
-                ("Gemini", CYAN, 0.6),
-                ("Free Models", GREEN, 0.9),
-            ]
-            pill_y = line_y + int(38 * scale)
-            pill_x = text_x
-            for label, color, delay in features:
-                bbox = draw.textbbox((0, 0), label, font=font_feat)
-                pw = bbox[2] - bbox[0] + int(16 * scale)
-                ph = bbox[3] - bbox[1] + int(10 * scale)
-
-                if local > delay:
-                    pill_t = ease_out((local - delay) / 0.3)
-                    pill_offset = int((1 - pill_t) * 20 * scale)
-                    # Dark fill blended with color (no alpha on RGB)
-                    pill_fill = (color[0] // 5, color[1] // 5, color[2] // 5)
-                    draw.rounded_rectangle(
-                        [pill_x, pill_y + pill_offset, pill_x + pw, pill_y + ph + pill_offset],
-                        radius=int(4 * scale), fill=pill_fill, outline=color, width=1
-                    )
-                    draw.text((pill_x + int(8 * scale), pill_y + int(4 * scale) + pill_offset),
-                              label, font=font_feat, fill=WHITE)
-                pill_x += pw + int(10 * scale)
-
-            # "100% FREE" badge
-            if local > 1.3:
-                badge_t = ease_out((local - 1.3) / 0.3)
-                badge_text = "100% FREE"
-                badge_bbox = draw.textbbox((0, 0), badge_text, font=font_badge)
-                badge_w = badge_bbox[2] - badge_bbox[0] + int(16 * scale)
-                badge_h = badge_bbox[3] - badge_bbox[1] + int(8 * scale)
-                badge_x = int(width * 0.32)
-                badge_y = pill_y + ph + int(14 * scale)
-                badge_scale = 0.5 + 0.5 * badge_t
-
-                draw.rounded_rectangle(
-                    [badge_x, badge_y, badge_x + badge_w, badge_y + badge_h],
-                    radius=int(3 * scale), fill=GREEN
-                )
-                draw.text((badge_x + int(8 * scale), badge_y + int(3 * scale)),
-                           badge_text, font=font_badge, fill=BG_DARK)
-
-                draw.text(
-                    (badge_x + badge_w + int(10 * scale), badge_y + int(3 * scale)),
-                    "No subscription. Bring your own API key.",
-                    font=font_small, fill=MID_GRAY
-                )
-
-        # Scene 3: CTA (4.5-6s)
-        else:
-            local = sec - 4.5
-
-            draw_radial_glow(img, width // 2, height // 2, int(height * 0.8), BLUE, intensity=0.2)
-            draw = ImageDraw.Draw(img)
-
-            # Big centered text
-            cta_t = ease_out(local / 0.5)
-            text = "SpamAnvil"
-            bbox = draw.textbbox((0, 0), text, font=font_big)
-            tw = bbox[2] - bbox[0]
-            draw.text(((width - tw) // 2, int(40 * scale)), text, font=font_big, fill=WHITE)
-
-            if local > 0.3:
-                sub = "Free AI Anti-Spam for WordPress"
-                bbox2 = draw.textbbox((0, 0), sub, font=font_sub)
-                tw2 = bbox2[2] - bbox2[0]
-                draw.text(((width - tw2) // 2, int(110 * scale)), sub, font=font_sub, fill=LIGHT_GRAY)
-
-            if local > 0.6:
-                url = "wordpress.org/plugins/spamanvil"
-                bbox3 = draw.textbbox((0, 0), url, font=font_feat)
-                tw3 = bbox3[2] - bbox3[0]
-                ux = (width - tw3) // 2
-                uy = int(150 * scale)
-
-                # Button-like background
-                pad = int(10 * scale)
-                draw.rounded_rectangle(
-                    [ux - pad * 2, uy - pad, ux + tw3 + pad * 2, uy + (bbox3[3] - bbox3[1]) + pad],
-                    radius=int(6 * scale), fill=BLUE
-                )
-                draw.text((ux, uy), url, font=font_feat, fill=WHITE)
-
-            # Decorative dots
-            if local > 0.5:
-                for i in range(5):
-                    dx = width // 2 - int(100 * scale) + i * int(50 * scale)
-                    dy = int(200 * scale)
-                    r = int(3 * scale)
-                    c = [BLUE, PURPLE, CYAN, GREEN, ORANGE][i]
-                    draw.ellipse([dx - r, dy - r, dx + r, dy + r], fill=c)
-
-        frames.append(img)
-
-        if f % 12 == 0:
-            print(f"  Frame {f}/{TOTAL_FRAMES}")
-
-    return frames, int(1000 / FPS)
+        for i in range(5):
+            dx = width // 2 - int(100 * scale) + i * int(50 * scale)
+            dy = int(200 * scale)
+            r = int(3 * scale)
+            c = [BLUE, PURPLE, CYAN, GREEN, ORANGE][i]
+            draw.ellipse([dx - r, dy - r, dx + r, dy + r], fill=c)
+        return img
+
+    def centered(text, font):
+        return (width - text_layout(text, font).width) // 2
+
+    # Scene 1 + 2: anvil, title and features. The shared layers look the
+    # same in every language.
+    layers = [
+        Layer('plate', paint_plate, stage='background', shared=True, end=4.5, cx=anvil_cx, cy=anvil_cy,
+              radius=int(height * 0.9),
+              intensity=Track((0, 0), (0.6, 0.15, ease_out), cast=quantize_intensity)),
+        Layer('anvil', paint_anvil, shared=True, end=4.5, drop=Track((0, 0), (0.6, 1, ease_out))),
+        # Impact sparks after landing, fading out before they settle
+        Layer('burst', paint_burst, shared=True, after=0.5, end=0.85,
+              spread=Track((0.5, 0), (1.0, 1, ease_out))),
+        Layer('sparks', paint_sparks, shared=True, start=1.0, end=4.5),
+        Layer('title', paint_title, stage='text', end=4.5, slide=Track((0.3, 0), (0.9, 1, ease_out))),
+        Layer('accent', paint_accent, after=0.6, end=4.5, grow=Track((0.6, 0), (1.0, 1, ease_out))),
+        Layer('subtitle', paint_text, stage='text', after=0.9, end=4.5,
+              text=strings['subtitle'], font=font_sub, color=LIGHT_GRAY,
+              x=text_x, y=line_y + int(10 * scale)),
+    ]
+
+    # Feature pills appear one by one
+    features = [
+        ("ChatGPT", BLUE, 0.0),
+        ("Claude", PURPLE, 0.3),
+        ("Gemini", CYAN, 0.6),
+        (strings['free_models'], GREEN, 0.9),
+    ]
+    pill_x = text_x
+    for label, color, delay in features:
+        pw, ph = pill_size(label, font_feat, scale)
+        start = 2.0 + delay
+        layers.append(Layer(f'pill:{label}', paint_pill, after=start, end=4.5, label=label, color=color,
+                            x=pill_x, slide=Track((start, 0), (start + 0.3, 1, ease_out))))
+        pill_x += pw + int(10 * scale)
+
+    # "100% FREE" badge
+    layers.append(Layer('badge', paint_badge, after=3.3, end=4.5))
+
+    # Scene 3: CTA
+    sub = strings['cta_subtitle']
+    url = "wordpress.org/plugins/spamanvil"
+    layers += [
+        Layer('cta_plate', paint_plate, stage='background', shared=True, start=4.5,
+              cx=width // 2, cy=height // 2, radius=int(height * 0.8), intensity=0.2),
+        Layer('cta_title', paint_text, stage='text', start=4.5, text="SpamAnvil", font=font_big, color=WHITE,
+              x=centered("SpamAnvil", font_big), y=int(40 * scale)),
+        Layer('cta_sub', paint_text, stage='text', after=4.8, text=sub, font=font_sub, color=LIGHT_GRAY,
+              x=centered(sub, font_sub), y=int(110 * scale)),
+        Layer('cta_button', paint_button, after=5.1, text=url, x=centered(url, font_feat), y=int(150 * scale)),
+        Layer('cta_dots', paint_dots, after=5.0),
+    ]
+    return Timeline(BANNER_DURATION, BANNER_FPS, layers)
+
+
+# Rendered language-independent layers of animation frames, by size and
+# shared-layer state
+frame_bases = PlateCache(maxsize=32)
+
+
+def render_banner_frame(width, height, f, strings=ENGLISH):
+    """Render frame *f* of the animated banner in *strings*' language.
+
+    Each frame depends only on its index, so frames can be rendered in any
+    order and in any process. The frame's language-independent layers come
+    from a per-process cache shared by every language.
+    """
+    timeline = banner_timeline(width, height, strings)
+    key = timeline.shared_key(f)
+    if not key:
+        return timeline.render(f)
+    base = frame_bases.get((width, height, key), lambda: timeline.render_shared(f))
+    return timeline.render(f, base=base)
+
+
+def create_animated_banner(width, height, jobs=1, strings=ENGLISH):
+    """Create animated banner, rendering frames across *jobs* processes.
+
+    Returns ``(frames, duration)`` where *frames* is a generator, so the
+    frames can be streamed straight into :func:`assetgen.gif.write_gif` or
+    :func:`assetgen.animation.encode_animation` without holding the whole
+    animation in memory. Only frames the timeline reports as changed are
+    rendered; held frames repeat the previous image. Use
+    :func:`animated_banner_palette` for the matching global GIF palette.
+    """
+    def frames():
+        distinct = banner_timeline(width, height, strings).distinct_frames()
+        render = partial(render_banner_frame, width, height, strings=strings)
+        rendered = render_selected(render, distinct, jobs=jobs)
+        changed = set(distinct)
+        img = None
+        for f in range(BANNER_FRAMES):
+            if f % 12 == 0:
+                print(f"  Frame {f}/{BANNER_FRAMES}")
+            if f in changed:
+                img = next(rendered)
+            yield img
+
+    return frames(), 1000 / BANNER_FPS
+
+
+def animated_banner_palette(width, height, jobs=1, strings=ENGLISH):
+    """Build the animated banner's global GIF palette from sample frames."""
+    render = partial(render_banner_frame, width, height, strings=strings)
+    return sample_palette(render, BANNER_FRAMES, BANNER_COLORS, jobs=jobs)
 
 
 # =============================================================================
 # MAIN
 # =============================================================================
-if __name__ == '__main__':
-    print("=== SpamAnvil Asset Generator ===\n")
+def build(manifest, output, write, deps, **params):
+    """Rebuild *output* unless the manifest says it is up to date.
+
+    *deps* are the functions and modules that render the output; together
+    with the script functions and constants they use and *params* they
+    form its fingerprint, so editing one asset's code does not rebuild the
+    others. *output* may be a list of names rendered together by one
+    ``write(tmp_paths)`` call.
+    """
+    deps, constants = code_deps(deps)
+    key = fingerprint(deps, (params, constants))
+    outputs = [output] if isinstance(output, str) else list(output)
+    if all(manifest.is_fresh(name, key) for name in outputs):
+        print(f"{', '.join(outputs)} {'is' if len(outputs) == 1 else 'are'} up to date")
+    else:
+        print(f"Creating {', '.join(outputs)}...")
+    with profiler.asset(outputs[0]):
+        if isinstance(output, str):
+            manifest.build(output, key, write)
+        else:
+            manifest.build_group(outputs, key, write)
+
 
-    # Icon 256x256
-    print("Creating icon-256x256.png...")
-    icon_256 = create_icon(256)
-    icon_256.save(os.path.join(ASSETS_DIR, "icon-256x256.png"), "PNG")
-
-    # Icon 128x128
-    print("Creating icon-128x128.png...")
-    icon_128 = icon_256.resize((128, 128), Image.LANCZOS)
-    icon_128.save(os.path.join(ASSETS_DIR, "icon-128x128.png"), "PNG")
-
-    # Static banner 772x250
-    print("Creating banner-772x250.png...")
-    banner = create_banner(772, 250)
-    banner.save(os.path.join(ASSETS_DIR, "banner-772x250.png"), "PNG")
-
-    # Static banner 1544x500 (retina)
-    print("Creating banner-1544x500.png...")
-    banner_2x = create_banner(1544, 500)
-    banner_2x.save(os.path.join(ASSETS_DIR, "banner-1544x500.png"), "PNG")
-
-    # Animated banner GIF 772x250
-    print("Creating banner-772x250.gif (animated)...")
-    frames, duration = create_animated_banner(772, 250)
-    frames[0].save(
-        os.path.join(ASSETS_DIR, "banner-772x250.gif"),
-        save_all=True,
-        append_images=frames[1:],
-        duration=duration,
-        loop=0,
-        optimize=True,
+def save_png(img, path):
+    """Save *img* as the smallest lossless PNG the optimizer finds.
+
+    Returns ``(bytes, optimized bytes)``: the size Pillow's default
+    settings would have written, and the size written.
+    """
+    png = png_bytes(img)
+    with open(path, 'wb') as fp:
+        fp.write(png.data)
+    print(f"  {png.summary()}")
+    return png.baseline, len(png.data)
+
+
+def png_bytes(img):
+    """Return *img* encoded as PNG by the optimizer, as an :class:`assetgen.pngopt.OptimizedPng`."""
+    with profiler.stage('encoding', 'png'):
+        return optimize_png(img)
+
+
+def animated_banner(formats=('gif',), width=772, height=250, jobs=1, strings=ENGLISH):
+    """Render the animated banner once and return ``{format: bytes}``."""
+    palette = animated_banner_palette(width, height, jobs=jobs, strings=strings)
+    frames, duration = create_animated_banner(width, height, jobs=jobs, strings=strings)
+    return animation_bytes(frames, duration, formats, palette=palette, jobs=jobs)
+
+
+def scene_deps():
+    """Modules and functions every scene-rendered output depends on."""
+    return (draw_anvil, draw_spark, assetgen.scene, assetgen.gradients,
+            assetgen.plates, assetgen.fonts)
+
+
+def png_deps():
+    """Modules the PNG optimization stage encodes with."""
+    return (assetgen.pngopt, assetgen.png)
+
+
+def package_modules():
+    """Every loaded module of the package, for outputs that use nearly all of it."""
+    return tuple(module for name, module in sorted(sys.modules.items()) if name.startswith('assetgen.'))
+
+
+def build_icons(manifest):
+    """Build the icons at every size.
+
+    The scene renders all sizes in one pass, the first time any of them is
+    stale. They carry no translatable text, so every locale shares them.
+    """
+    icons = lru_cache(maxsize=1)(create_icons)
+    for size in ICON_SIZES:
+        build(manifest, f"icon-{size}x{size}.png",
+              partial(lambda size, path: save_png(icons()[size], path), size),
+              (icon_scene, create_icons, save_png) + png_deps() + scene_deps(), size=size)
+
+
+def build_static_banners(manifest, strings=ENGLISH):
+    """Build the static banners, both sizes rendered in one pass."""
+    banners = lru_cache(maxsize=1)(partial(create_banners, strings=strings))
+    for width in BANNER_WIDTHS:
+        height = banner_scene(strings).size(width / 772)[1]
+        build(manifest, f"banner-{width}x{height}.png",
+              partial(lambda width, path: save_png(banners()[width], path), width),
+              (banner_scene, create_banners, save_png) + png_deps() + scene_deps(), size=(width, height),
+              strings=dict(strings))
+
+
+def build_large_banner(manifest, width, strings=ENGLISH, jobs=1):
+    """Build the static banner *width* pixels wide.
+
+    It is rendered in tiles, so memory does not grow with size.
+    """
+    height = banner_scene(strings).size(width / 772)[1]
+
+    def write_large_banner(path):
+        write_banner_tiled(path, width, jobs=jobs, strings=strings)
+
+    build(manifest, f"banner-{width}x{height}.png", write_large_banner,
+          (banner_scene, write_banner_tiled, assetgen.png) + scene_deps(),
+          size=(width, height), strings=dict(strings))
+
+
+def build_animated_banner(manifest, strings=ENGLISH, jobs=1, formats=None):
+    """Build the animated banner 772x250 in *formats* (default: all).
+
+    GIF, APNG and WebP are encoded side by side from one render. It uses
+    nearly everything, so the whole package is among its dependencies.
+    """
+    animated_outputs = output_names("banner-772x250", formats)
+
+    def write_animated_banner(paths):
+        palette = animated_banner_palette(772, 250, jobs=jobs, strings=strings)
+        frames, duration = create_animated_banner(772, 250, jobs=jobs, strings=strings)
+        results = encode_animation(frames, duration, dict(zip(animated_outputs, paths)),
+                                   palette=palette, jobs=jobs)
+        print(f"  {next(iter(results.values()))[0].summary()}")
+        for line in comparison(results):
+            print(f"  {line}")
+
+    build(manifest, animated_outputs.values(), write_animated_banner,
+          (create_animated_banner, animated_banner_palette) + package_modules(),
+          size=(772, 250), strings=dict(strings))
+
+
+def build_banners(manifest, strings=ENGLISH, widths=(), jobs=1, formats=None):
+    """Build the static, large (*widths*) and animated banners in *strings*' language.
+
+    *formats* limits the animated banner to some of its formats (default: all).
+    """
+    build_static_banners(manifest, strings)
+    for width in widths:
+        build_large_banner(manifest, width, strings, jobs=jobs)
+    build_animated_banner(manifest, strings, jobs=jobs, formats=formats)
+
+
+def build_promo(manifest, locale=DEFAULT_LOCALE, jobs=1, formats=None):
+    """Build the promo animation in *locale*, named like ``create_promo_gif.py -L`` names it."""
+    strings = create_promo_gif.promo_strings(locale)
+    stem = "spamanvil-promo" + ("" if locale == DEFAULT_LOCALE else f"-{locale}")
+    outputs = output_names(stem, formats)
+
+    def write_promo(paths):
+        results = create_promo_gif.encode_promo(dict(zip(outputs, paths)), strings, jobs=jobs)
+        print(f"  {next(iter(results.values()))[0].summary()}")
+        for line in comparison(results):
+            print(f"  {line}")
+
+    build(manifest, outputs.values(), write_promo,
+          (create_promo_gif.encode_promo,) + package_modules(),
+          size=(create_promo_gif.WIDTH, create_promo_gif.HEIGHT), strings=dict(strings))
+
+
+def run_task(output, force, builder, *args, **kwargs):
+    """Run ``builder(manifest, *args, **kwargs)`` with *output*'s manifest, without saving it.
+
+    Runs in a worker process; returns ``(log, built, skipped, entries,
+    results)`` for the manifest in the main process to merge, so workers
+    never write the manifest file concurrently.
+    """
+    manifest = Manifest(output, force=force, autosave=False)
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        builder(manifest, *args, **kwargs)
+    return log.getvalue(), manifest.built, manifest.skipped, manifest.new_entries(), manifest.results
+
+
+def build_locale(output, force, widths, formats, locale, jobs=1):
+    """Build *locale*'s banners into ``output/locale``, with that directory's own manifest.
+
+    Runs in a worker process; returns ``(log, built, skipped, entries,
+    results)`` like :func:`run_task`, with names relative to *output* and
+    no entries to merge.
+    """
+    directory = os.path.join(output, locale)
+    os.makedirs(directory, exist_ok=True)
+    manifest = Manifest(directory, force=force)
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        build_banners(manifest, banner_strings(locale), widths, jobs=jobs, formats=formats)
+    return (log.getvalue(), [f"{locale}/{name}" for name in manifest.built],
+            [f"{locale}/{name}" for name in manifest.skipped], {},
+            {f"{locale}/{name}": result for name, result in manifest.results.items()})
+
+
+def asset_tasks(args):
+    """The build graph for *args*: a :class:`Task` per group of outputs rendered together.
+
+    Slow tasks come first so they start first. No asset feeds another:
+    outputs rendered from one pass, like the two icon sizes, share a task.
+    The processes of ``args.jobs`` the graph cannot use are spread over the
+    tasks that render frames or tiles in parallel (see :func:`spread_jobs`).
+    """
+    locales = available_locales() if 'all' in args.locale else args.locale
+    task = partial(run_task, args.output, args.force)
+    tasks = []
+    if args.promo:
+        tasks.append(Task('promo', partial(task, build_promo, DEFAULT_LOCALE, formats=args.format)))
+        tasks += [Task(f'promo {locale}', partial(task, build_promo, locale, formats=args.format))
+                  for locale in locales]
+    tasks.append(Task('animated banner', partial(task, build_animated_banner, ENGLISH, formats=args.format)))
+    # Localized banners go to a directory per locale, each with its own
+    # manifest
+    tasks += [Task(f'banners {locale}', partial(build_locale, args.output, args.force,
+                                                 tuple(args.banner_width), args.format, locale))
+              for locale in locales]
+    tasks += [Task(f'banner {width}', partial(task, build_large_banner, width))
+              for width in args.banner_width]
+    # Every task so far renders frames or tiles across a jobs keyword's processes
+    parallel = {t.name for t in tasks}
+    tasks.append(Task('banners', partial(task, build_static_banners)))
+    tasks.append(Task('icons', partial(task, build_icons)))
+    return spread_jobs(tasks, parallel, args.jobs)
+
+
+def spread_jobs(tasks, parallel, jobs):
+    """Hand the processes the build graph leaves idle to the tasks named in *parallel*.
+
+    The graph runs one task per process, at most *jobs* at once, so with
+    fewer tasks than *jobs* the rest would sit idle while the promo and the
+    animated banner render their frames one by one. The spare processes go
+    one at a time, in task order (slowest first), to the *parallel* tasks,
+    which render across ``1 + share`` processes; the total stays within
+    *jobs*. Returns the tasks, the *parallel* ones with their jobs bound.
+    """
+    jobs = resolve_jobs(jobs)
+    names = [t.name for t in tasks if t.name in parallel]
+    share = dict.fromkeys(names, 0)
+    for i in range(jobs - min(jobs, len(tasks)) if names else 0):
+        share[names[i % len(names)]] += 1
+    return [t._replace(run=partial(t.run, jobs=1 + share[t.name])) if t.name in share else t for t in tasks]
+
+
+def build_assets(args):
+    """Build every output *args* asks for into ``args.output``; returns the manifest.
+
+    The assets build across ``args.jobs`` processes; when there are fewer
+    assets than processes, the slow ones also render their frames or tiles
+    across the processes left over.
+    """
+    os.makedirs(args.output, exist_ok=True)
+    manifest = Manifest(args.output, force=args.force)
+    tasks = asset_tasks(args)
+    seconds = {}
+    start = time.perf_counter()
+    for task, (log, built, skipped, entries, results), elapsed in run_graph(tasks, jobs=args.jobs):
+        print(f"[{task.name}] {elapsed:.2f} s\n{log}", end="")
+        manifest.merge(built, skipped, entries, results)
+        seconds[task.name] = elapsed
+    chain, longest = critical_path(tasks, seconds)
+    print(f"\n{len(tasks)} tasks in {time.perf_counter() - start:.2f} s: {sum(seconds.values()):.2f} s "
+          f"of work, longest chain {longest:.2f} s ({' -> '.join(chain)})")
+    return manifest
+
+
+def watch(args):
+    """Rebuild the outputs affected by each edit until interrupted.
+
+    The script and the package are imported once and then reloaded module
+    by module as their files change, so fonts, text layouts and background
+    plates stay cached between builds, and the manifest limits each build
+    to the outputs whose code, constants or strings changed.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    # Build with the importable copy of this script, which can be reloaded
+    importlib.import_module('create_assets')
+    args.force = False
+    watcher = Watcher([os.path.join(root, name)
+                       for name in ('create_assets.py', 'create_promo_gif.py', 'assetgen', 'locales')])
+    while True:
+        print(f"\nWatching {root} for changes (Ctrl-C to stop)...")
+        try:
+            changed = watcher.wait()
+        except KeyboardInterrupt:
+            print()
+            return
+        print(f"\nChanged: {', '.join(os.path.relpath(path, root) for path in changed)}")
+        start = time.perf_counter()
+        try:
+            reloaded = reload_modules(changed, [root])
+            script = sys.modules['create_assets']
+            # Sprites are keyed by what they show, not by the code that
+            # draws them
+            if reloaded:
+                script.sprites.clear()
+            manifest = script.build_assets(args)
+        except Exception:
+            traceback.print_exc()
+            continue
+        print(f"  {len(manifest.built)} rebuilt in {time.perf_counter() - start:.2f} s")
+
+
+def output_files(output):
+    """Every file under *output* as a sorted '/'-separated relative path, so
+    each locale's outputs list as ``pt_BR/banner-772x250.png``; dot files
+    and directories (the manifest, temporary files) are skipped."""
+    found = []
+    for root, dirs, files in os.walk(output):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        rel = os.path.relpath(root, output)
+        for f in files:
+            if not f.startswith('.'):
+                found.append(f if rel == '.' else '/'.join(rel.split(os.sep) + [f]))
+    return sorted(found)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SpamAnvil WordPress.org assets.")
+    parser.add_argument(
+        '-o', '--output', metavar='DIR', default=ASSETS_DIR,
+        help="directory to write the assets to (default: the plugin's SVN assets directory)",
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="build across N processes: up to N assets at once, and processes left over render "
+             "the slow assets' frames in parallel (0 = one per CPU)",
+    )
+    parser.add_argument(
+        '-w', '--banner-width', type=int, action='append', default=[], metavar='WIDTH',
+        help="also render the static banner WIDTH pixels wide, in tiles streamed to disk "
+             "(for print and other large sizes; repeatable)",
+    )
+    parser.add_argument(
+        '-L', '--locale', action='append', default=[], metavar='LOCALE',
+        help="also build the banners for LOCALE from locales/LOCALE.json into a LOCALE "
+             "subdirectory (repeatable; 'all' for every table)",
+    )
+    parser.add_argument(
+        '-P', '--promo', action='store_true',
+        help="also build the promo animation (and one per -L locale) into the output directory",
+    )
+    parser.add_argument(
+        '-F', '--format', action='append', choices=available_formats(), metavar='FORMAT',
+        help="only write the animations in FORMAT (repeatable; default: all of "
+             f"{', '.join(available_formats())})",
+    )
+    parser.add_argument(
+        '-f', '--force', action='store_true',
+        help="rebuild every output, even if the manifest says it is up to date",
     )
+    parser.add_argument(
+        '-W', '--watch', action='store_true',
+        help="after building, keep running and rebuild what each edit to the script, the "
+             "package or the string tables affects (try with -F gif for sub-second rebuilds)",
+    )
+    parser.add_argument(
+        '-p', '--profile', metavar='DIR',
+        help="time every render stage and write a JSON report and a Chrome trace to DIR "
+             "(renders in-process; combine with --force to profile up-to-date outputs)",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiler.enable()
+        args.jobs = 1
 
-    print("\n=== Assets generated in", ASSETS_DIR, "===")
-    for f in sorted(os.listdir(ASSETS_DIR)):
-        fpath = os.path.join(ASSETS_DIR, f)
-        if os.path.isfile(fpath):
-            size_kb = os.path.getsize(fpath) / 1024
+    print("=== SpamAnvil Asset Generator ===\n")
+    manifest = build_assets(args)
+
+    print("\n=== Assets generated in", args.output, "===")
+    print(f"  {len(manifest.built)} rebuilt, {len(manifest.skipped)} up to date")
+    for f in output_files(args.output):
+        size_kb = os.path.getsize(os.path.join(args.output, f)) / 1024
+        # PNGs optimized in this run, with the size Pillow's defaults gave
+        if f in manifest.results:
+            before, after = manifest.results[f]
+            print(f"  {f}: {size_kb:.0f} KB ({before} -> {after} bytes, {after / before - 1:+.0%})")
+        else:
             print(f"  {f}: {size_kb:.0f} KB")
+    print(f"  Peak RSS: {format_peak_rss()}")
+
+    if args.profile:
+        report, trace = profiler.write(args.profile, "create_assets")
+        print(f"\n=== Profile ({report}, {trace}) ===")
+        for line in profiler.summary():
+            print(f"  {line}")
+
+    if args.watch:
+        watch(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,32 @@
 #!/usr/bin/env python3
 """Generate SpamAnvil promotional GIF."""
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from functools import lru_cache, partial
+import argparse
 import math
 import os
 
+from assetgen.animation import animation_bytes, comparison, encode_animation, output_names
+from assetgen.fonts import get_font, text_layout
+from assetgen.gradients import gradient
+from assetgen.instrument import profiler
+from assetgen.memory import format_peak_rss
+from assetgen.palette import sample_palette
+from assetgen.parallel import render_selected
+from assetgen.sprites import rasterize, sprites, text_sprite
+from assetgen.strings import DEFAULT_LOCALE, Strings, available_locales, load_strings
+from assetgen.timeline import Layer, Procedural, Timeline, Track, ease_out
+
 # Config
 WIDTH, HEIGHT = 800, 400
 FPS = 12
 TOTAL_SECONDS = 8
 TOTAL_FRAMES = FPS * TOTAL_SECONDS
 
+# The promo's scenes by name: (start, end) in seconds
+SCENES = {'title': (0, 2.5), 'features': (2.5, 5.5), 'cta': (5.5, 8)}
+
 # Colors
 BG_DARK = (18, 18, 40)
 BG_GRADIENT_END = (30, 30, 70)
@@ -23,57 +39,61 @@ RED = (220, 50, 60)
 CYAN = (0, 200, 220)
 PURPLE = (160, 80, 255)
 
-# Try system fonts
-def get_font(size, bold=False):
-    font_paths = [
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/System/Library/Fonts/SFNSDisplay.ttf",
-        "/Library/Fonts/Arial Bold.ttf" if bold else "/Library/Fonts/Arial.ttf",
-        "/System/Library/Fonts/SFCompact.ttf",
-    ]
-    for path in font_paths:
-        if os.path.exists(path):
-            try:
-                return ImageFont.truetype(path, size, index=1 if bold and path.endswith('.ttc') else 0)
-            except:
-                try:
-                    return ImageFont.truetype(path, size)
-                except:
-                    continue
-    return ImageFont.load_default()
-
-font_title = get_font(52, bold=True)
-font_subtitle = get_font(22)
-font_feature = get_font(26, bold=True)
-font_feature_desc = get_font(18)
-font_big = get_font(64, bold=True)
-font_medium = get_font(28, bold=True)
-font_small = get_font(16)
-font_cta = get_font(30, bold=True)
-
-def draw_gradient_bg(draw):
-    for y in range(HEIGHT):
-        r = int(BG_DARK[0] + (BG_GRADIENT_END[0] - BG_DARK[0]) * y / HEIGHT)
-        g = int(BG_DARK[1] + (BG_GRADIENT_END[1] - BG_DARK[1]) * y / HEIGHT)
-        b = int(BG_DARK[2] + (BG_GRADIENT_END[2] - BG_DARK[2]) * y / HEIGHT)
-        draw.line([(0, y), (WIDTH, y)], fill=(r, g, b))
-
-def ease_out(t):
-    return 1 - (1 - t) ** 3
-
-def ease_in_out(t):
-    if t < 0.5:
-        return 4 * t * t * t
-    else:
-        return 1 - pow(-2 * t + 2, 3) / 2
-
-def draw_text_centered(draw, y, text, font, fill, alpha=255):
-    bbox = draw.textbbox((0, 0), text, font=font)
-    tw = bbox[2] - bbox[0]
-    x = (WIDTH - tw) // 2
-    if alpha < 255:
-        fill = (*fill[:3], alpha) if len(fill) == 4 else (*fill, alpha)
-    draw.text((x, y), text, font=font, fill=fill)
+# Flat colors the promo draws with; always in the GIF palette
+PROMO_COLORS = (
+    BG_DARK, BG_GRADIENT_END, WHITE, LIGHT_GRAY, GREEN, BLUE_ACCENT, ORANGE, CYAN, PURPLE,
+    (180, 190, 210), (120, 130, 150), (220, 225, 240),  # anvil
+)
+
+# Promo text in English; locales/<locale>.json translates it per locale
+PROMO_STRINGS = {
+    'subtitle': "AI-Powered Anti-Spam for WordPress",
+    'badge': "FREE & OPEN SOURCE",
+    'tagline': "Stop spam with ChatGPT, Claude, Gemini & more",
+    'tagline_free': "No subscription needed. Works with free AI models.",
+    'feature_ai': "AI Spam Detection",
+    'feature_ai_desc': "LLM scores each comment 0-100",
+    'feature_providers': "6+ AI Providers",
+    'feature_providers_desc': "OpenAI, Claude, Gemini, free models",
+    'feature_ip': "Smart IP Blocking",
+    'feature_ip_desc': "Auto-bans repeat offenders",
+    'feature_async': "Async Processing",
+    'feature_async_desc': "Background queue, zero latency",
+    'free': "100% FREE",
+    'no_sub': "No subscription. No premium tier.",
+    'byok': "Bring your own AI key (free options available)",
+    'cta': "Download on WordPress.org",
+    'providers': "Works with OpenAI  |  Claude  |  Gemini  |  Free Models",
+}
+ENGLISH = Strings(DEFAULT_LOCALE, PROMO_STRINGS)
+
+
+def promo_strings(locale=DEFAULT_LOCALE):
+    """Return the promo strings for *locale*."""
+    return load_strings(locale, 'promo', PROMO_STRINGS)
+
+
+# Fonts by role: (size, bold); each is loaded on first use
+FONTS = {
+    'title': (52, True),
+    'subtitle': (22, False),
+    'feature': (26, True),
+    'feature_desc': (18, False),
+    'big': (64, True),
+    'medium': (28, True),
+    'small': (16, False),
+    'cta': (30, True),
+}
+
+
+def font(role):
+    size, bold = FONTS[role]
+    return get_font(size, bold=bold)
+
+
+def draw_text_centered(img, y, text, font, fill):
+    x = (WIDTH - text_layout(text, font).width) // 2
+    text_sprite(text, font, fill).paste(img, x, y)
 
 def draw_anvil_icon(draw, cx, cy, size, alpha=255):
     """Draw a stylized anvil shape."""
@@ -111,6 +131,54 @@ def draw_shield_icon(draw, cx, cy, size, color=GREEN):
     draw.line([(cx - s//3, cy), (cx - s//8, cy + s//3), (cx + s//3, cy - s//3)],
               fill=WHITE, width=2)
 
+def anvil_icon_sprite(size):
+    """Return the cached anvil icon sprite, anchored at its centre."""
+    return sprites.get(('anvil_icon', size), lambda: rasterize(
+        lambda draw, x, y, k: draw_anvil_icon(draw, x, y, size * k),
+        (-2 * size - 2, -size - 2, size + 2, size + 2),
+    ))
+
+
+def badge_sprite(text, font):
+    """Return the cached "FREE & OPEN SOURCE" badge, anchored at its text origin."""
+    def build():
+        bw = text_layout(text, font).width
+
+        def paint(draw, x, y, k):
+            # Alpha is dropped when the frame is flattened to RGB, so the
+            # fill is drawn opaque.
+            draw.rounded_rectangle([x - 4, y - 4, x + bw + 16, y + 26], radius=4, fill=GREEN)
+            draw.text((x + 6, y), text, font=font, fill=BG_DARK)
+
+        return rasterize(paint, (-4, -4, bw + 17, 27))
+
+    return sprites.get(('badge', text, font), build)
+
+
+def cta_sprite(text, font):
+    """Return the cached CTA button with its glow, anchored at the label's text origin."""
+    def build():
+        layout = text_layout(text, font)
+        pad_x, pad_y = 30, 14
+        margin = 4 * 2
+
+        def paint(draw, x, y, k):
+            btn_rect = [x - pad_x, y - pad_y, x + layout.width + pad_x, y + layout.height + pad_y + 4]
+            # Button glow (its alpha is dropped when the frame is flattened)
+            for g in range(4, 0, -1):
+                glow_rect = [btn_rect[0]-g*2, btn_rect[1]-g*2, btn_rect[2]+g*2, btn_rect[3]+g*2]
+                draw.rounded_rectangle(glow_rect, radius=10+g*2, fill=BLUE_ACCENT)
+            draw.rounded_rectangle(btn_rect, radius=10, fill=BLUE_ACCENT)
+            draw.text((x, y), text, font=font, fill=WHITE)
+
+        return rasterize(paint, (
+            -pad_x - margin, -pad_y - margin,
+            layout.width + pad_x + margin + 1, layout.height + pad_y + 4 + margin + 1,
+        ))
+
+    return sprites.get(('cta', text, font), build)
+
+
 def draw_particle(draw, frame, x_base, y_base, speed=1):
     """Draw a floating particle."""
     t = (frame * speed) % TOTAL_FRAMES
@@ -121,195 +189,253 @@ def draw_particle(draw, frame, x_base, y_base, speed=1):
     draw.ellipse([x-size, y-size, x+size, y+size], fill=(*BLUE_ACCENT, min(alpha, 150)))
 
 
-def generate_frame(frame_num):
-    img = Image.new('RGBA', (WIDTH, HEIGHT), BG_DARK)
-    draw = ImageDraw.Draw(img)
-    draw_gradient_bg(draw)
-
-    t = frame_num / TOTAL_FRAMES  # 0.0 to 1.0 through the animation
-    frame_sec = frame_num / FPS
+def paint_background(img):
+    return gradient((WIDTH, HEIGHT), (BG_DARK, BG_GRADIENT_END), mode='RGBA')
 
-    # Floating particles in background
+def paint_particles(img, frame):
+    draw = ImageDraw.Draw(img)
     for i in range(8):
         px = 100 + i * 90
         py = HEIGHT - 20
-        draw_particle(draw, frame_num + i * 10, px, py, speed=0.7 + i * 0.1)
+        draw_particle(draw, frame + i * 10, px, py, speed=0.7 + i * 0.1)
+    return img
 
+def paint_grid(img):
     # Subtle grid lines (very faint)
+    draw = ImageDraw.Draw(img)
     for gx in range(0, WIDTH, 80):
         draw.line([(gx, 0), (gx, HEIGHT)], fill=(255, 255, 255, 5), width=1)
     for gy in range(0, HEIGHT, 80):
         draw.line([(0, gy), (WIDTH, gy)], fill=(255, 255, 255, 5), width=1)
+    return img
+
+def paint_text(img, y, text, font, fill):
+    draw_text_centered(img, y, text, font, fill)
+    return img
+
+def paint_anvil(img, grow):
+    # Anvil icon - to the left of title
+    anvil_scale = int(22 * grow)
+    if anvil_scale > 5:
+        anvil_icon_sprite(anvil_scale).paste(img, WIDTH // 2 - 180, 120)
+    return img
+
+def paint_title(img, grow):
+    scale_offset = int(15 * (1 - grow))
+    draw_text_centered(img, 85 + scale_offset, "SpamAnvil", font('title'), WHITE)
+    return img
+
+def paint_badge(img, text):
+    bw = text_layout(text, font('feature_desc')).width
+    badge_sprite(text, font('feature_desc')).paste(img, (WIDTH - bw) // 2 - 12, 200)
+    return img
+
+def paint_tagline(img, text, free):
+    draw_text_centered(img, 250, text, font('feature_desc'), LIGHT_GRAY)
+    draw_text_centered(img, 278, free, font('small'), LIGHT_GRAY)
+    return img
+
+def paint_line(img, grow):
+    line_w = int(300 * grow)
+    cx = WIDTH // 2
+    ImageDraw.Draw(img).line([(cx - line_w, 145), (cx + line_w, 145)], fill=(*BLUE_ACCENT, 60), width=1)
+    return img
+
+def paint_features_title(img):
+    draw_text_centered(img, 30, "SpamAnvil", font('medium'), (*WHITE[:3],))
+    ImageDraw.Draw(img).line([(200, 65), (600, 65)], fill=(*BLUE_ACCENT, 100), width=1)
+    return img
+
+def paint_feature(img, index, title, desc, color, slide):
+    draw = ImageDraw.Draw(img)
+    y = 90 + index * 72
+    x_offset = int(30 * (1 - slide))
+
+    # Feature indicator dot
+    dot_x = 160 + x_offset
+    draw.ellipse([dot_x, y + 8, dot_x + 16, y + 24], fill=color)
+
+    # Feature text
+    text_sprite(title, font('feature'), WHITE).paste(img, 190 + x_offset, y + 4)
+    text_sprite(desc, font('small'), LIGHT_GRAY).paste(img, 190 + x_offset, y + 34)
+
+    # Score bar for visual flair
+    bar_x = 590
+    bar_width = int(120 * slide)
+    draw.rounded_rectangle(
+        [bar_x, y + 10, bar_x + bar_width, y + 24],
+        radius=3, fill=(*color, 150)
+    )
+    return img
+
+def paint_cta(img, text):
+    cta_x = (WIDTH - text_layout(text, font('cta')).width) // 2
+    cta_sprite(text, font('cta')).paste(img, cta_x, 250)
+    return img
+
+def paint_links(img, providers):
+    draw_text_centered(img, 340, providers, font('small'), LIGHT_GRAY)
+    draw_text_centered(img, 365, "software.amato.com.br/spamanvil",
+                       font('small'), (*BLUE_ACCENT,))
+    return img
+
+
+@lru_cache(maxsize=None)
+def promo_timeline(strings=ENGLISH):
+    """Build the promo's timeline once per language, on first use."""
+    grow = Track((0, 0), (0.8, 1, ease_out))
+    layers = [
+        Layer('background', paint_background, stage='background'),
+        # Floating particles drift on every frame
+        Layer('particles', paint_particles, frame=Procedural(lambda t: round(t * FPS))),
+        Layer('grid', paint_grid, stage='background'),
+
+        # === SCENE 1: Title (0-2.5s) ===
+        Layer('anvil', paint_anvil, end=2.5, grow=grow),
+        Layer('title', paint_title, stage='text', end=2.5, grow=grow),
+        Layer('subtitle', paint_text, stage='text', after=0.5, end=2.5, y=150,
+              text=strings['subtitle'], font=font('subtitle'), fill=LIGHT_GRAY),
+        Layer('badge', paint_badge, after=1.0, end=2.5, text=strings['badge']),
+        Layer('tagline', paint_tagline, stage='text', after=1.4, end=2.5,
+              text=strings['tagline'], free=strings['tagline_free']),
+        Layer('line', paint_line, after=0.3, end=2.5, grow=Track((0.3, 0), (1.1, 1, ease_out))),
+
+        # === SCENE 2: Features (2.5-5.5s) ===
+        Layer('features_title', paint_features_title, stage='text', start=2.5, end=5.5),
+    ]
 
-    # === SCENE 1: Title (0-2.5s) ===
-    if frame_sec < 2.5:
-        progress = min(1.0, frame_sec / 0.8)
-        ep = ease_out(progress)
-
-        # Anvil icon - to the left of title
-        anvil_scale = int(22 * ep)
-        if anvil_scale > 5:
-            draw_anvil_icon(draw, WIDTH // 2 - 180, 120, anvil_scale)
-
-        # Title
-        scale_offset = int(15 * (1 - ep))
-        draw_text_centered(draw, 85 + scale_offset, "SpamAnvil", font_title, WHITE)
-
-        # Subtitle appears after title
-        if frame_sec > 0.5:
-            draw_text_centered(draw, 150, "AI-Powered Anti-Spam for WordPress",
-                             font_subtitle, LIGHT_GRAY)
-
-        # "Free & Open Source" badge
-        if frame_sec > 1.0:
-            badge_progress = min(1.0, (frame_sec - 1.0) / 0.5)
-            badge_ep = ease_out(badge_progress)
-            badge_y = 200
-            badge_text = "FREE & OPEN SOURCE"
-            bbox = draw.textbbox((0, 0), badge_text, font=font_feature_desc)
-            bw = bbox[2] - bbox[0]
-            bx = (WIDTH - bw) // 2 - 12
-            draw.rounded_rectangle(
-                [bx - 4, badge_y - 4, bx + bw + 16, badge_y + 26],
-                radius=4, fill=(*GREEN, int(200 * badge_ep))
-            )
-            draw.text((bx + 6, badge_y), badge_text, font=font_feature_desc,
-                     fill=(*BG_DARK,))
-
-        # Tagline
-        if frame_sec > 1.4:
-            draw_text_centered(draw, 250, "Stop spam with ChatGPT, Claude, Gemini & more",
-                             font_feature_desc, LIGHT_GRAY)
-            draw_text_centered(draw, 278, "No subscription needed. Works with free AI models.",
-                             font_small, LIGHT_GRAY)
-
-        # Decorative line
-        if frame_sec > 0.3:
-            line_progress = min(1.0, (frame_sec - 0.3) / 0.8)
-            line_w = int(300 * ease_out(line_progress))
-            cx = WIDTH // 2
-            draw.line([(cx - line_w, 145), (cx + line_w, 145)], fill=(*BLUE_ACCENT, 60), width=1)
-
-    # === SCENE 2: Features (2.5-5.5s) ===
-    elif frame_sec < 5.5:
-        local_t = frame_sec - 2.5  # 0 to 3
-
-        features = [
-            ("AI Spam Detection", "LLM scores each comment 0-100", BLUE_ACCENT),
-            ("6+ AI Providers", "OpenAI, Claude, Gemini, free models", PURPLE),
-            ("Smart IP Blocking", "Auto-bans repeat offenders", ORANGE),
-            ("Async Processing", "Background queue, zero latency", CYAN),
-        ]
-
-        # Title
-        draw_text_centered(draw, 30, "SpamAnvil", font_medium, (*WHITE[:3],))
-        draw.line([(200, 65), (600, 65)], fill=(*BLUE_ACCENT, 100), width=1)
-
-        for i, (title, desc, color) in enumerate(features):
-            feat_start = i * 0.6
-            if local_t < feat_start:
-                continue
-            feat_progress = min(1.0, (local_t - feat_start) / 0.5)
-            ep = ease_out(feat_progress)
-
-            y = 90 + i * 72
-            x_offset = int(30 * (1 - ep))
-
-            # Feature indicator dot
-            dot_x = 160 + x_offset
-            draw.ellipse([dot_x, y + 8, dot_x + 16, y + 24], fill=color)
-
-            # Feature text
-            draw.text((190 + x_offset, y + 4), title, font=font_feature, fill=WHITE)
-            draw.text((190 + x_offset, y + 34), desc, font=font_small, fill=LIGHT_GRAY)
-
-            # Score bar for visual flair
-            bar_x = 590
-            bar_width = int(120 * ep)
-            draw.rounded_rectangle(
-                [bar_x, y + 10, bar_x + bar_width, y + 24],
-                radius=3, fill=(*color, 150)
-            )
+    features = [
+        ('feature_ai', BLUE_ACCENT),
+        ('feature_providers', PURPLE),
+        ('feature_ip', ORANGE),
+        ('feature_async', CYAN),
+    ]
+    for i, (key, color) in enumerate(features):
+        start = 2.5 + i * 0.6
+        layers.append(Layer(f'feature:{i}', paint_feature, start=start, end=5.5, index=i, title=strings[key],
+                            desc=strings[key + '_desc'], color=color,
+                            slide=Track((start, 0), (start + 0.5, 1, ease_out))))
 
     # === SCENE 3: Value Prop + CTA (5.5-8s) ===
-    else:
-        local_t = frame_sec - 5.5  # 0 to 2.5
-
-        # "100% FREE" big text
-        free_progress = min(1.0, local_t / 0.6)
-        ep = ease_out(free_progress)
-        scale = 0.5 + 0.5 * ep
-
-        draw_text_centered(draw, 60, "100% FREE", font_big, GREEN)
-
-        if local_t > 0.4:
-            draw_text_centered(draw, 140, "No subscription. No premium tier.", font_subtitle, WHITE)
-
-        if local_t > 0.8:
-            draw_text_centered(draw, 175, "Bring your own AI key (free options available)",
-                             font_feature_desc, LIGHT_GRAY)
-
-        # CTA button
-        if local_t > 1.2:
-            cta_progress = min(1.0, (local_t - 1.2) / 0.5)
-            cta_ep = ease_out(cta_progress)
-
-            # Pulsing effect
-            pulse = 1 + 0.03 * math.sin(frame_num * 0.5)
-
-            cta_text = "Download on WordPress.org"
-            bbox = draw.textbbox((0, 0), cta_text, font=font_cta)
-            cta_w = bbox[2] - bbox[0]
-            cta_h = bbox[3] - bbox[1]
-            cta_x = (WIDTH - cta_w) // 2
-            cta_y = 250
-
-            pad_x, pad_y = 30, 14
-            btn_rect = [
-                cta_x - pad_x, cta_y - pad_y,
-                cta_x + cta_w + pad_x, cta_y + cta_h + pad_y + 4
-            ]
-
-            # Button glow
-            for g in range(4, 0, -1):
-                glow_rect = [btn_rect[0]-g*2, btn_rect[1]-g*2, btn_rect[2]+g*2, btn_rect[3]+g*2]
-                draw.rounded_rectangle(glow_rect, radius=10+g*2,
-                                     fill=(*BLUE_ACCENT, int(20 * cta_ep)))
-
-            draw.rounded_rectangle(btn_rect, radius=10, fill=BLUE_ACCENT)
-            draw.text((cta_x, cta_y), cta_text, font=font_cta, fill=WHITE)
-
-        # Bottom tagline
-        if local_t > 1.6:
-            draw_text_centered(draw, 340, "Works with OpenAI  |  Claude  |  Gemini  |  Free Models",
-                             font_small, LIGHT_GRAY)
-            draw_text_centered(draw, 365, "software.amato.com.br/spamanvil",
-                             font_small, (*BLUE_ACCENT,))
-
-    return img.convert('RGB')
-
-
-# Generate all frames
-print("Generating frames...")
-frames = []
-for i in range(TOTAL_FRAMES):
-    frames.append(generate_frame(i))
-    if i % 10 == 0:
-        print(f"  Frame {i}/{TOTAL_FRAMES}")
-
-# Save as GIF
-output_path = "/Users/alexandreamato/Amato Dropbox/Alexandre Amato/Projects/Informatica/Software/llm_anti_spam/spamanvil-promo.gif"
-print(f"Saving GIF to {output_path}...")
-
-frames[0].save(
-    output_path,
-    save_all=True,
-    append_images=frames[1:],
-    duration=int(1000 / FPS),
-    loop=0,
-    optimize=True,
-)
-
-file_size = os.path.getsize(output_path)
-print(f"Done! File size: {file_size / 1024:.0f} KB")
-print(f"Dimensions: {WIDTH}x{HEIGHT}, {TOTAL_FRAMES} frames, {FPS} FPS, {TOTAL_SECONDS}s")
+    layers += [
+        Layer('free', paint_text, stage='text', start=5.5, y=60, text=strings['free'], font=font('big'),
+              fill=GREEN),
+        Layer('no_sub', paint_text, stage='text', after=5.9, y=140, text=strings['no_sub'],
+              font=font('subtitle'), fill=WHITE),
+        Layer('byok', paint_text, stage='text', after=6.3, y=175, text=strings['byok'],
+              font=font('feature_desc'), fill=LIGHT_GRAY),
+        Layer('cta', paint_cta, after=6.7, text=strings['cta']),
+        Layer('links', paint_links, stage='text', after=7.1, providers=strings['providers']),
+    ]
+    return Timeline(TOTAL_SECONDS, FPS, layers)
+
+
+def generate_frame(frame_num, strings=ENGLISH):
+    img = promo_timeline(strings).render(frame_num)
+    with profiler.stage('conversion'):
+        return img.convert('RGB')
+
+
+def promo_frames(jobs=1, strings=ENGLISH):
+    """Yield every promo frame in order, rendering across *jobs* processes.
+
+    Frames the timeline reports as unchanged repeat the previous image.
+    """
+    distinct = promo_timeline(strings).distinct_frames()
+    rendered = render_selected(partial(generate_frame, strings=strings), distinct, jobs=jobs)
+    changed = set(distinct)
+    frame = None
+    for i in range(TOTAL_FRAMES):
+        if i % 10 == 0:
+            print(f"  Frame {i}/{TOTAL_FRAMES}")
+        if i in changed:
+            frame = next(rendered)
+        yield frame
+
+
+def promo_animation(formats=('gif',), jobs=1, strings=ENGLISH):
+    """Render the promo once and return ``{format: bytes}``."""
+    palette = sample_palette(partial(generate_frame, strings=strings), TOTAL_FRAMES, PROMO_COLORS, jobs=jobs)
+    return animation_bytes(promo_frames(jobs=jobs, strings=strings), 1000 / FPS, formats,
+                           palette=palette, jobs=jobs)
+
+
+def encode_promo(outputs, strings=ENGLISH, jobs=1):
+    """Render the promo once and encode it into ``{format: path}`` *outputs*.
+
+    Returns the :func:`assetgen.animation.encode_animation` results.
+    """
+    render = partial(generate_frame, strings=strings)
+    palette = sample_palette(render, TOTAL_FRAMES, PROMO_COLORS, jobs=jobs)
+    return encode_animation(promo_frames(jobs=jobs, strings=strings), 1000 / FPS, outputs,
+                            palette=palette, jobs=jobs)
+
+
+def write_promo(output_path, strings=ENGLISH, jobs=1):
+    """Render the promo into *output_path* and the APNG and WebP files next to it."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    outputs = {fmt: os.path.join(os.path.dirname(output_path), name) for fmt, name in
+               output_names(os.path.splitext(os.path.basename(output_path))[0]).items()}
+    print(f"Rendering frames into {', '.join(outputs.values())}...")
+    with profiler.asset(os.path.basename(output_path)):
+        results = encode_promo(outputs, strings, jobs=jobs)
+    print(results['gif'][0].summary())
+
+    file_size = os.path.getsize(output_path)
+    print(f"Done! File size: {file_size / 1024:.0f} KB")
+    print(f"Dimensions: {WIDTH}x{HEIGHT}, {TOTAL_FRAMES} frames, {FPS} FPS, {TOTAL_SECONDS}s")
+    for line in comparison(results):
+        print(f"  {line}")
+
+
+def locale_path(output_path, locale):
+    """Return *output_path* with ``-locale`` added to the file name."""
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}-{locale}{ext}"
+
+
+OUTPUT_PATH = "/Users/alexandreamato/Amato Dropbox/Alexandre Amato/Projects/Informatica/Software/llm_anti_spam/spamanvil-promo.gif"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the SpamAnvil promotional GIF.")
+    parser.add_argument(
+        '-o', '--output', metavar='PATH', default=OUTPUT_PATH,
+        help="GIF to write; the APNG and WebP versions are written next to it",
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="render frames across N processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        '-L', '--locale', action='append', default=[], metavar='LOCALE',
+        help="also render the promo for LOCALE from locales/LOCALE.json, as PATH-LOCALE.gif etc. "
+             "(repeatable; 'all' for every table)",
+    )
+    parser.add_argument(
+        '-p', '--profile', metavar='DIR',
+        help="time every render stage and write a JSON report and a Chrome trace to DIR "
+             "(renders in-process)",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiler.enable()
+        args.jobs = 1
+
+    write_promo(args.output, jobs=args.jobs)
+    # Each locale's frames are rendered across the same processes in turn
+    locales = available_locales() if 'all' in args.locale else args.locale
+    for locale in locales:
+        print(f"\n[{locale}]")
+        write_promo(locale_path(args.output, locale), promo_strings(locale), jobs=args.jobs)
+    print(f"Peak RSS: {format_peak_rss()}")
+
+    if args.profile:
+        report, trace = profiler.write(args.profile, "create_promo_gif")
+        print(f"Profile: {report}, {trace}")
+        for line in profiler.summary():
+            print(f"  {line}")
+
+
+if __name__ == '__main__':
+    main()
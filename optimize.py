@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Fit SpamAnvil assets into byte budgets at the best quality that fits.
+
+Each budget names a target, optionally a format, and the largest allowed
+size. Every target is rendered once, then re-encoded with every setting in
+the search (frame rate, palette size, dithering, small-change holding and,
+for WebP, lossy quality); each result is scored by PSNR against the
+rendered frames (alpha included), and the size/quality trade-off curve is
+reported with the pick for the budget marked. A summary of every budget
+follows, and the exit status is 1 if any does not fit.
+
+    python3 optimize.py promo=400K                    # best promo GIF under 400 KB
+    python3 optimize.py promo=400K animated-banner=80K icon-256=6K
+    python3 optimize.py promo:webp=300K promo:gif=400K -o fitted/
+    python3 optimize.py -b budgets.json -j 4 -a       # every trial, not just the curve
+
+A budgets file is a JSON object mapping ``"target"`` or ``"target:format"``
+to a size, either in bytes or as a string like ``"400K"``.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+from assetgen.budget import FORMATS, best_within, frontier, search
+
+MARK = "*"
+
+
+# =============================================================================
+# TARGETS
+# =============================================================================
+def target_animated_banner(jobs):
+    from create_assets import BANNER_COLORS, create_animated_banner
+    frames, duration = create_animated_banner(772, 250, jobs=jobs)
+    return list(frames), duration, BANNER_COLORS
+
+
+def target_promo(jobs):
+    from create_promo_gif import FPS, PROMO_COLORS, promo_frames
+    return list(promo_frames(jobs=jobs)), 1000 / FPS, PROMO_COLORS
+
+
+def target_banner(width, jobs):
+    from create_assets import create_banner
+    return [create_banner(width)], None, ()
+
+
+def target_icon(size, jobs):
+    from create_assets import create_icon
+    return [create_icon(size)], None, ()
+
+
+# name -> (function returning (frames, duration, palette constants), formats)
+TARGETS = {
+    'animated-banner': (target_animated_banner, ('gif', 'webp')),
+    'promo': (target_promo, ('gif', 'webp')),
+    'banner-772x250': (lambda jobs: target_banner(772, jobs), ('png',)),
+    'banner-1544x500': (lambda jobs: target_banner(1544, jobs), ('png',)),
+    'icon-256': (lambda jobs: target_icon(256, jobs), ('png',)),
+    'icon-128': (lambda jobs: target_icon(128, jobs), ('png',)),
+}
+
+
+def parse_size(spec):
+    """Parse ``"400K"``, ``"1.5M"`` or a plain byte count."""
+    spec = spec.strip().upper().removesuffix('B')
+    scale = {'K': 1024, 'M': 1024 * 1024}.get(spec[-1:], 1)
+    return int(float(spec.rstrip('KM')) * scale)
+
+
+def parse_budget(spec, size):
+    """Parse ``"target[:format]"`` and a *size* into ``(target, format or None, bytes)``."""
+    target, _, fmt = spec.partition(':')
+    if target not in TARGETS:
+        raise ValueError(f"unknown target {target!r} (choose from {', '.join(TARGETS)})")
+    formats = TARGETS[target][1]
+    if fmt and fmt not in formats:
+        raise ValueError(f"{target} can be written as {', '.join(formats)}")
+    if not isinstance(size, int):
+        try:
+            size = parse_size(str(size))
+        except ValueError:
+            raise ValueError(f"bad size {size!r} for {spec}") from None
+    return target, fmt or None, size
+
+
+def load_budgets(path):
+    """Read a JSON object mapping ``"target[:format]"`` to a size."""
+    with open(path) as fp:
+        budgets = json.load(fp)
+    if not isinstance(budgets, dict):
+        raise ValueError(f"{path}: expected an object mapping targets to sizes")
+    return [parse_budget(spec, size) for spec, size in budgets.items()]
+
+
+def trial_line(t, chosen):
+    mark = MARK if t is chosen else " "
+    return f" {mark} {t.size / 1024:7.1f} KB  {t.psnr:6.2f} dB  {t.setting.describe()}"
+
+
+def fit(target, fmt, budget, frames, duration, constants, jobs=1, show_all=False):
+    """Search *frames* of *target* as *fmt* and print the curve; returns ``(chosen, trials)``."""
+    start = time.perf_counter()
+    trials = list(search(frames, duration, fmt, constants=constants, jobs=jobs))
+    searched = time.perf_counter()
+
+    chosen = best_within(trials, budget)
+    print(f"{target} as {fmt.upper()} within {budget / 1024:.1f} KB: {len(frames)} frame(s), "
+          f"{len(trials)} settings tried in {searched - start:.1f} s")
+    print(f"\n{'All trials' if show_all else 'Size/quality curve'} (PSNR against the rendered frames):")
+    shown = sorted(trials, key=lambda t: t.size) if show_all else frontier(trials)
+    for t in shown:
+        print(trial_line(t, chosen))
+    if chosen is not None and chosen not in shown:
+        print(trial_line(chosen, chosen))
+    return chosen, trials
+
+
+def summary_line(target, fmt, budget, chosen, trials):
+    name = f"{target} ({fmt.upper()})"
+    if chosen is None:
+        smallest = min(trials, key=lambda t: t.size)
+        return (f"  {name:<24} {budget / 1024:6.1f} KB  does not fit; smallest "
+                f"{smallest.size / 1024:.1f} KB ({smallest.setting.describe()})")
+    return (f"  {name:<24} {budget / 1024:6.1f} KB  {chosen.size / 1024:7.1f} KB  "
+            f"{chosen.psnr:6.2f} dB  {chosen.setting.describe()}")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit SpamAnvil assets into byte budgets.")
+    parser.add_argument('budgets', nargs='*', metavar='TARGET[:FORMAT]=SIZE',
+                        help=f"a target ({', '.join(TARGETS)}) and its largest allowed size, "
+                             f"e.g. promo=400K or promo:webp=1.5M")
+    parser.add_argument('-b', '--budgets-file', metavar='PATH',
+                        help="read more budgets from a JSON object mapping TARGET[:FORMAT] to a size")
+    parser.add_argument('-f', '--format', choices=FORMATS,
+                        help="format for budgets that name none (default: each target's first)")
+    parser.add_argument('-o', '--output', metavar='DIR',
+                        help="write each chosen encoding to DIR as TARGET.FORMAT")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="render across N processes and run N trials at a time (0 = one per CPU)")
+    parser.add_argument('-a', '--all', action='store_true', help="list every trial, not only the curve")
+    args = parser.parse_args(argv)
+
+    try:
+        budgets = []
+        for spec in args.budgets:
+            target, sep, size = spec.rpartition('=')
+            if not sep:
+                raise ValueError(f"expected TARGET[:FORMAT]=SIZE, got {spec!r}")
+            budgets.append(parse_budget(target, size))
+        if args.budgets_file:
+            budgets += load_budgets(args.budgets_file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not budgets:
+        parser.error("give at least one TARGET[:FORMAT]=SIZE or a budgets file")
+    fitted = []
+    for target, fmt, budget in budgets:
+        formats = TARGETS[target][1]
+        fmt = fmt or (args.format if args.format in formats else formats[0])
+        fitted.append((target, fmt, budget))
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    # Render each target once, however many budgets name it, in order of first mention
+    results = []
+    for name in dict.fromkeys(target for target, _, _ in fitted):
+        start = time.perf_counter()
+        # The renderers report progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames, duration, constants = TARGETS[name][0](args.jobs)
+        print(f"{name}: {len(frames)} frame(s) rendered in {time.perf_counter() - start:.1f} s")
+        for target, fmt, budget in fitted:
+            if target != name:
+                continue
+            print()
+            chosen, trials = fit(target, fmt, budget, frames, duration, constants, args.jobs, args.all)
+            results.append((target, fmt, budget, chosen, trials))
+            if chosen is not None and args.output:
+                path = os.path.join(args.output, f"{target}.{fmt}")
+                with open(path, 'wb') as fp:
+                    fp.write(chosen.data)
+                print(f"Wrote {path}")
+        del frames
+        print()
+
+    print("Budgets:")
+    for result in results:
+        print(summary_line(*result))
+    return 1 if any(chosen is None for _, _, _, chosen, _ in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Preview frames of the SpamAnvil animations without rendering them all.
+
+Renders only the frames asked for, straight from the animation's timeline,
+and writes them as PNGs or as one contact sheet; nothing is encoded. A
+single frame takes milliseconds once the script is loaded.
+
+    python3 preview.py banner -t 3.3               # the badge pop, at 3.3 s
+    python3 preview.py banner -f 40 --draft        # frame 40 at half resolution
+    python3 preview.py promo -s cta                # every frame of a scene
+    python3 preview.py promo -r 5.5-8 -S -e 2      # contact sheet of every 2nd frame
+    python3 preview.py banner -S -e 6 -L pt_BR     # the whole banner, in Portuguese
+
+Draft quality renders the banner's timeline at half size. The promo is
+laid out in fixed pixels, so its draft frames are full renders scaled
+down, which saves nothing but the file size.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from functools import partial
+
+from assetgen.sheet import contact_sheet
+from assetgen.strings import DEFAULT_LOCALE
+from check_golden import parse_frames
+
+PREVIEW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preview")
+
+# An animation to preview: frame rate, frame count, scenes by name as
+# (start, end) seconds, and render(f) -> image
+Animation = namedtuple('Animation', 'fps frames scenes render')
+
+
+# =============================================================================
+# ANIMATIONS
+# =============================================================================
+def banner_animation(draft=False, locale=DEFAULT_LOCALE):
+    from create_assets import BANNER_FPS, BANNER_FRAMES, BANNER_SCENES, banner_strings, render_banner_frame
+    width, height = (386, 125) if draft else (772, 250)
+    return Animation(BANNER_FPS, BANNER_FRAMES, BANNER_SCENES,
+                     partial(render_banner_frame, width, height, strings=banner_strings(locale)))
+
+
+def _half(render, f):
+    return render(f).reduce(2)
+
+
+def promo_animation(draft=False, locale=DEFAULT_LOCALE):
+    from create_promo_gif import FPS, SCENES, TOTAL_FRAMES, generate_frame, promo_strings
+    render = partial(generate_frame, strings=promo_strings(locale))
+    return Animation(FPS, TOTAL_FRAMES, SCENES, partial(_half, render) if draft else render)
+
+
+ANIMATIONS = {
+    'banner': banner_animation,
+    'promo': promo_animation,
+}
+
+
+def select_frames(animation, frames=None, times=None, span=None, scene=None):
+    """Return the sorted frame indices picked by any of the selectors.
+
+    *frames* are indices, *times* seconds, *span* a ``(start, end)`` pair
+    of seconds (end exclusive) and *scene* one of the animation's scene
+    names. With no selector, every frame is picked. Raises ValueError for
+    frames out of range, for an empty or reversed span and if nothing is
+    picked.
+    """
+    picked = set(frames or ())
+    picked.update(round(t * animation.fps) for t in times or ())
+    spans = [span] if span else []
+    if scene:
+        spans.append(animation.scenes[scene])
+    for start, end in spans:
+        if end <= start:
+            raise ValueError(f"empty range {start:g}-{end:g} s: the end must come after the start")
+        picked.update(range(round(start * animation.fps), round(end * animation.fps)))
+    if not (frames or times or spans):
+        picked = set(range(animation.frames))
+    out_of_range = sorted(f for f in picked if not 0 <= f < animation.frames)
+    if out_of_range:
+        raise ValueError(f"frames out of range 0-{animation.frames - 1}: {out_of_range}")
+    if not picked:
+        raise ValueError("no frames selected")
+    return sorted(picked)
+
+
+def parse_span(spec):
+    """Parse ``"3.0-4.5"`` into a ``(start, end)`` pair of seconds."""
+    start, _, end = spec.partition('-')
+    return float(start), float(end)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preview frames of the SpamAnvil animations.")
+    parser.add_argument('animation', choices=ANIMATIONS)
+    parser.add_argument('-f', '--frames', type=parse_frames, help="frames to render, e.g. 0,5,10-20")
+    parser.add_argument('-t', '--time', type=float, action='append', metavar='SECONDS',
+                        help="render the frame shown at SECONDS (repeatable)")
+    parser.add_argument('-r', '--range', type=parse_span, metavar='START-END',
+                        help="render the frames from START up to END seconds")
+    parser.add_argument('-s', '--scene', help="render every frame of a scene (see --list)")
+    parser.add_argument('-d', '--draft', action='store_true', help="render at half resolution")
+    parser.add_argument('-S', '--sheet', action='store_true',
+                        help="lay the frames out in one contact sheet instead of a PNG each")
+    parser.add_argument('-e', '--every', type=int, default=1, metavar='N',
+                        help="only every Nth of the selected frames")
+    parser.add_argument('-c', '--columns', type=int, default=6, help="contact sheet columns (default 6)")
+    parser.add_argument('-L', '--locale', default=DEFAULT_LOCALE, help="render in LOCALE's strings")
+    parser.add_argument('-o', '--output', default=PREVIEW_DIR, metavar='DIR',
+                        help="directory to write the previews to")
+    parser.add_argument('-l', '--list', action='store_true', help="list the animation's scenes and exit")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    animation = ANIMATIONS[args.animation](args.draft, args.locale)
+    if args.list:
+        for name, (first, last) in animation.scenes.items():
+            print(f"  {name:<10} {first:4.1f}-{last:.1f} s")
+        return 0
+    if args.scene and args.scene not in animation.scenes:
+        parser.error(f"unknown scene {args.scene!r}; choose from {', '.join(animation.scenes)}")
+    try:
+        frames = select_frames(animation, args.frames, args.time, args.range, args.scene)
+    except ValueError as e:
+        parser.error(str(e))
+    frames = frames[::max(1, args.every)]
+    loaded = time.perf_counter()
+
+    images = []
+    for f in frames:
+        frame_start = time.perf_counter()
+        images.append(animation.render(f))
+        if len(frames) <= 10:
+            elapsed = (time.perf_counter() - frame_start) * 1000
+            print(f"  frame {f} ({f / animation.fps:.2f} s): {elapsed:.1f} ms")
+    rendered = time.perf_counter()
+
+    os.makedirs(args.output, exist_ok=True)
+    stem = args.animation + ("" if args.locale == DEFAULT_LOCALE else f"-{args.locale}")
+    stem += "-draft" if args.draft else ""
+    if args.sheet:
+        labels = [f"{f}  {f / animation.fps:.2f}s" for f in frames]
+        path = os.path.join(args.output, f"{stem}-sheet-{frames[0]:03d}-{frames[-1]:03d}.png")
+        contact_sheet(images, args.columns, labels).save(path)
+        paths = [path]
+    else:
+        paths = []
+        for f, img in zip(frames, images):
+            paths.append(os.path.join(args.output, f"{stem}-{f:03d}.png"))
+            img.convert('RGB').save(paths[-1])
+
+    print(f"{len(frames)} frame(s) in {(rendered - loaded) * 1000:.0f} ms "
+          f"(+{(loaded - start) * 1000:.0f} ms loading)")
+    for path in paths[:10]:
+        print(f"  {path}")
+    if len(paths) > 10:
+        print(f"  ... and {len(paths) - 10} more")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""The container walkers of the analyzer: a file cut short must fail with ValueError, not crash."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from assetgen.analyze import analyze, read_gif, read_png, read_webp
+from assetgen.apng import write_apng
+from assetgen.gif import write_gif
+from assetgen.palette import build_palette
+from assetgen.webp import webp_available, write_webp
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+
+def frames():
+    return [Image.new('RGB', (24, 16), color) for color in COLORS]
+
+
+def gif_bytes():
+    buf = io.BytesIO()
+    write_gif(buf, frames(), 100, palette=build_palette(frames()))
+    return buf.getvalue()
+
+
+def apng_bytes():
+    buf = io.BytesIO()
+    write_apng(buf, frames(), 100, palette=build_palette(frames()))
+    return buf.getvalue()
+
+
+def webp_bytes():
+    buf = io.BytesIO()
+    write_webp(buf, frames(), 100)
+    return buf.getvalue()
+
+
+READERS = [(read_gif, gif_bytes), (read_png, apng_bytes)]
+if webp_available():
+    READERS.append((read_webp, webp_bytes))
+
+
+@pytest.mark.parametrize('reader, encode', READERS)
+def test_whole_file_reads(reader, encode):
+    assert len(reader(io.BytesIO(encode())).frames) == len(COLORS)
+
+
+@pytest.mark.parametrize('reader, encode', READERS)
+def test_every_truncation_raises_value_error(reader, encode):
+    data = encode()
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            reader(io.BytesIO(data[:end]))
+
+
+def test_analyze_reports_truncated_gif(tmp_path):
+    path = tmp_path / "cut.gif"
+    path.write_bytes(gif_bytes()[:-20])
+    with pytest.raises(ValueError, match="truncated GIF"):
+        analyze(str(path))
@@ -0,0 +1,85 @@
+"""Round trips through the animation encoders: what they write must decode to the source frames."""
+
+import io
+from functools import partial
+
+import pytest
+from PIL import Image, ImageDraw, ImageSequence
+
+from assetgen.animation import encode_animation
+from assetgen.apng import write_apng
+from assetgen.gif import write_gif
+from assetgen.palette import build_palette
+from assetgen.webp import webp_available, write_webp
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (0, 0, 0), (255, 255, 255)]
+
+
+def decode(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return [frame.convert('RGB') for frame in ImageSequence.Iterator(img)]
+
+
+def corner_frames(count, size=(400, 300)):
+    """Frames that change only in two opposite corners, so each change box
+    covers the whole canvas while most of its pixels stay the same."""
+    width, height = size
+    frames = []
+    for i in range(count):
+        frame = Image.new('RGB', size, (40, 40, 90))
+        draw = ImageDraw.Draw(frame)
+        draw.rectangle([0, 0, 9, 9], fill=COLORS[i % len(COLORS)])
+        draw.rectangle([width - 10, height - 10, width - 1, height - 1], fill=COLORS[(i + 1) % len(COLORS)])
+        frames.append(frame)
+    return frames
+
+
+def assert_same_frames(decoded, frames):
+    assert len(decoded) == len(frames)
+    for i, (got, expected) in enumerate(zip(decoded, frames)):
+        assert got.tobytes() == expected.tobytes(), f"frame {i} differs"
+
+
+def test_full_canvas_change_encodes_every_format_exactly():
+    frames = corner_frames(24)
+    palette = build_palette(frames)
+    outputs = {'gif': io.BytesIO(), 'apng': io.BytesIO()}
+    encode_animation(iter(frames), 100, outputs, palette=palette, jobs=2)
+    for fmt, buf in outputs.items():
+        assert_same_frames(decode(buf.getvalue()), frames)
+
+
+def test_low_color_apng_decodes():
+    # A four-color palette, which Pillow would pack into 2-bit rows
+    frames = [Image.new('RGB', (32, 24), color) for color in COLORS[:4]]
+    palette = build_palette(frames, colors=4)
+    buf = io.BytesIO()
+    write_apng(buf, frames, 100, palette=palette)
+    assert_same_frames(decode(buf.getvalue()), frames)
+
+
+@pytest.mark.parametrize('loop, plays', [(None, 1), (0, 0)])
+def test_loop_none_plays_once_in_every_format(loop, plays):
+    frames = [Image.new('RGB', (16, 16), color) for color in COLORS[:2]]
+    palette = build_palette(frames)
+    writers = [partial(write_gif, palette=palette), partial(write_apng, palette=palette)]
+    if webp_available():
+        writers.append(write_webp)
+    for write in writers:
+        buf = io.BytesIO()
+        write(buf, frames, 100, loop=loop)
+        with Image.open(io.BytesIO(buf.getvalue())) as img:
+            # A GIF without a loop count plays once
+            assert img.info.get('loop', 1) == plays, write
+
+
+@pytest.mark.skipif(not webp_available(), reason="Pillow built without WebP")
+def test_lossy_webp_falls_back_to_smaller_lossless():
+    # Flat fills, which lossless WebP stores in far fewer bytes than VP8
+    frames = corner_frames(6)
+    lossless = write_webp(io.BytesIO(), frames, 100, lossless=True)
+    buf = io.BytesIO()
+    writer = write_webp(buf, frames, 100, lossless=False, fallback=True)
+    assert writer.lossless
+    assert writer.bytes_written == len(buf.getvalue()) <= lossless.bytes_written
+    assert_same_frames(decode(buf.getvalue()), frames)
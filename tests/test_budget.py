@@ -0,0 +1,43 @@
+"""PNG trials of the budget search: they must match what the build writes and keep alpha."""
+
+import io
+
+from PIL import Image, ImageDraw
+
+from assetgen.budget import search
+from assetgen.pngopt import optimize_png
+
+
+def disc(size=64):
+    """An RGBA disc: opaque stripes inside, fully transparent outside."""
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for y in range(0, size, 4):
+        draw.line([(0, y), (size, y)], fill=(255, y * 4 % 256, 40, 255), width=2)
+    mask = Image.new('L', img.size, 0)
+    ImageDraw.Draw(mask).ellipse([4, 4, size - 5, size - 5], fill=255)
+    img.putalpha(mask)
+    return img
+
+
+def glow(size=128):
+    """A radial glow, which a fixed row filter stores smaller than Pillow's default."""
+    ramp = Image.radial_gradient('L').resize((size, size))
+    return Image.merge('RGB', (ramp, ramp.point(lambda v: 255 - v), Image.new('L', ramp.size, 90)))
+
+
+def trials_by_colors(img):
+    return {t.setting.colors: t for t in search([img], None, 'png') if not t.setting.dither}
+
+
+def test_true_color_trial_is_the_optimized_png():
+    img = glow()
+    assert trials_by_colors(img)[None].size == len(optimize_png(img).data)
+
+
+def test_png_trials_keep_alpha():
+    img = disc()
+    for colors, trial in trials_by_colors(img).items():
+        with Image.open(io.BytesIO(trial.data)) as out:
+            assert out.convert('RGBA').getchannel('A').getextrema() == (0, 255), colors
+        assert trial.psnr > 30, colors
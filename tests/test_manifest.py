@@ -0,0 +1,16 @@
+"""The build manifest and the atomic writes behind it."""
+
+import os
+import stat
+
+from assetgen.manifest import atomic_path
+
+
+def test_atomic_path_gives_the_default_file_mode(tmp_path):
+    path = tmp_path / "asset.png"
+    with atomic_path(path) as tmp:
+        with open(tmp, 'wb') as fp:
+            fp.write(b"data")
+    mask = os.umask(0)
+    os.umask(mask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~mask